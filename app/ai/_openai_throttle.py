@@ -0,0 +1,144 @@
+"""
+Controle de vazão compartilhado para chamadas à OpenAI.
+
+Todas as chamadas de chat completion (resumos técnicos e classificação de
+menções) passam por aqui: um limitador de requisições/minuto (RPM) e
+tokens/minuto (TPM) comum ao processo, e retry com backoff exponencial com
+jitter para 429/erros de conexão, em vez de degradar direto para o fallback.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List
+
+import openai
+
+from app.config import settings
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+# Esperas base (segundos) entre tentativas; cada uma recebe jitter
+BACKOFF_SEGUNDOS = (1.0, 2.0, 4.0)
+
+ERROS_RETENTAVEIS = (openai.RateLimitError, openai.APIConnectionError)
+
+
+class _TokenBucket:
+    """Balde de tokens com reposição contínua (capacidade por minuto)."""
+
+    def __init__(self, capacidade_por_minuto: float):
+        self.capacidade = float(capacidade_por_minuto)
+        self.taxa = self.capacidade / 60.0
+        self.nivel = self.capacidade
+        self.atualizado = time.monotonic()
+
+    def reservar(self, quantidade: float, agora: float) -> float:
+        """Consome `quantidade` e retorna quanto esperar (s) até ela estar disponível."""
+        self.nivel = min(self.capacidade, self.nivel + (agora - self.atualizado) * self.taxa)
+        self.atualizado = agora
+        self.nivel -= min(quantidade, self.capacidade)
+        return 0.0 if self.nivel >= 0 else -self.nivel / self.taxa
+
+
+class OpenAIRateLimiter:
+    """
+    Limitador RPM/TPM. A reserva é protegida por lock de thread, pois o mesmo
+    processo pode rodar event loops em threads distintas (ex.: asyncio.run).
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self._lock = threading.Lock()
+        self._rpm = _TokenBucket(rpm)
+        self._tpm = _TokenBucket(tpm)
+
+    def _reservar(self, tokens: int) -> float:
+        with self._lock:
+            agora = time.monotonic()
+            return max(self._rpm.reservar(1, agora), self._tpm.reservar(tokens, agora))
+
+    async def acquire(self, tokens: int) -> None:
+        espera = self._reservar(tokens)
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+
+limiter = OpenAIRateLimiter(settings.openai_rpm, settings.openai_tpm)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """Tokenizer do modelo configurado (carregado uma vez por processo), ou None."""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(settings.openai_model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken indisponível, usando truncamento por caracteres: {e}")
+        return None
+
+
+def truncar_tokens(texto: str, max_tokens: int, max_chars: int) -> str:
+    """
+    Trunca `texto` em no máximo `max_tokens` tokens do modelo. Sem tiktoken,
+    cai para o corte por caracteres (`max_chars`).
+    """
+    if not texto or len(texto.encode("utf-8")) <= max_tokens:
+        # BPE em bytes: cada token cobre ao menos 1 byte, então há no máximo
+        # tantos tokens quanto bytes (um caractere pode virar vários tokens)
+        return texto
+    enc = _encoding()
+    if enc is None:
+        return texto[:max_chars]
+    tokens = enc.encode(texto)
+    if len(tokens) <= max_tokens:
+        return texto
+    return enc.decode(tokens[:max_tokens])
+
+
+def estimar_tokens(kwargs: Dict[str, Any]) -> int:
+    """Custo estimado da requisição em tokens (prompt + max_tokens)."""
+    messages: List[Dict[str, Any]] = kwargs.get("messages") or []
+    enc = _encoding()
+    if enc is not None:
+        prompt = sum(len(enc.encode(str(m.get("content") or ""))) for m in messages)
+    else:
+        # Estimativa barata: ~4 caracteres por token
+        prompt = sum(len(str(m.get("content") or "")) for m in messages) // 4
+    return prompt + int(kwargs.get("max_tokens") or 0)
+
+
+def _espera_backoff(tentativa: int) -> float:
+    base = BACKOFF_SEGUNDOS[tentativa]
+    return base + random.uniform(0, base)
+
+
+async def chat_completions_create(client: Any, **kwargs: Any) -> Any:
+    """
+    Equivalente a `await client.chat.completions.create(**kwargs)` (AsyncOpenAI),
+    respeitando o limitador e com retry para rate limit / falhas de conexão.
+    """
+    tokens = estimar_tokens(kwargs)
+    for tentativa in range(len(BACKOFF_SEGUNDOS) + 1):
+        await limiter.acquire(tokens)
+        try:
+            return await client.chat.completions.create(**kwargs)
+        except ERROS_RETENTAVEIS as e:
+            if tentativa >= len(BACKOFF_SEGUNDOS):
+                raise
+            espera = _espera_backoff(tentativa)
+            logger.warning(f"OpenAI indisponível ({type(e).__name__}); nova tentativa em {espera:.1f}s")
+            await asyncio.sleep(espera)
+
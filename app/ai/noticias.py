@@ -1,11 +1,13 @@
-import json
+import asyncio
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
-from openai import OpenAI
+import orjson
+from openai import AsyncOpenAI
 
+from app.ai._openai_throttle import chat_completions_create, truncar_tokens
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -74,20 +76,50 @@ class AnaliseNoticia:
   alertas: list
 
 
-def gerar_resumo_tecnico(
+_SYSTEM_PROMPT_RESUMO = (
+  "Você é um analista técnico de monitoramento político.\n"
+  "Gere um resumo técnico conciso em pt-BR e explique, tecnicamente, por que essa notícia recebeu essa pontuação.\n"
+  "Responda SOMENTE em JSON válido, com as chaves:\n"
+  '- "resumo_tecnico": string com 4-6 bullets (use \\n- ...), focando em: tema, atores, contexto, possível impacto.\n'
+  '- "porque_pontuou": array de 4-8 strings, explicando o score (recência, menção, fonte, engajamento) e sinais no texto.\n'
+  '- "hipoteses": array de 2-4 strings, hipóteses/testes para validar (ex.: checar fontes adicionais, confirmar menções, etc.).\n'
+  '- "alertas": array de 0-3 strings (ex.: conteúdo incompleto, título genérico, baixa confiabilidade).\n'
+  "Não invente fatos que não estejam no texto fornecido. Se faltarem dados, diga isso nos alertas."
+)
+
+
+# Client compartilhado (reaproveita conexões entre chamadas); criado no primeiro uso
+_client: Optional[AsyncOpenAI] = None
+
+
+def _novo_client() -> AsyncOpenAI:
+  # max_retries=0: quem repete é chat_completions_create, passando pelo limitador RPM/TPM
+  if settings.openai_api_key:
+    return AsyncOpenAI(api_key=settings.openai_api_key, max_retries=0)
+  return AsyncOpenAI(max_retries=0)
+
+
+def _get_client() -> AsyncOpenAI:
+  global _client
+  if _client is None:
+    _client = _novo_client()
+  return _client
+
+
+async def _gerar_resumo(
   noticia: Dict[str, Any],
-  politico_nome: Optional[str] = None,
+  politico_nome: Optional[str],
+  client: AsyncOpenAI,
 ) -> Optional[AnaliseNoticia]:
-  """
-  Gera um resumo técnico via OpenAI.
-  Retorna None se a chave não estiver configurada.
-  """
   titulo = (noticia.get("titulo") or "").strip()
   descricao = (noticia.get("descricao") or "").strip()
   conteudo = (noticia.get("conteudo_completo") or "").strip()
-  conteudo = conteudo[:3500]  # evita payload enorme
+  conteudo = truncar_tokens(conteudo, max_tokens=2500, max_chars=3500)  # evita payload enorme
 
+  # Pesos são constantes e scores zerados não informam nada: ficam fora do prompt
   pontos = calcular_pontos(noticia)
+  pontos.pop("pesos", None)
+  pontos["scores"] = {k: v for k, v in pontos["scores"].items() if v}
   now = datetime.now(timezone.utc).isoformat()
 
   payload = {
@@ -105,30 +137,19 @@ def gerar_resumo_tecnico(
     "pontos": pontos,
   }
 
-  prompt = (
-    "Você é um analista técnico de monitoramento político.\n"
-    "Gere um resumo técnico conciso em pt-BR e explique, tecnicamente, por que essa notícia recebeu essa pontuação.\n"
-    "Responda SOMENTE em JSON válido, com as chaves:\n"
-    '- "resumo_tecnico": string com 4-6 bullets (use \\n- ...), focando em: tema, atores, contexto, possível impacto.\n'
-    '- "porque_pontuou": array de 4-8 strings, explicando o score (recência, menção, fonte, engajamento) e sinais no texto.\n'
-    '- "hipoteses": array de 2-4 strings, hipóteses/testes para validar (ex.: checar fontes adicionais, confirmar menções, etc.).\n'
-    '- "alertas": array de 0-3 strings (ex.: conteúdo incompleto, título genérico, baixa confiabilidade).\n'
-    "Não invente fatos que não estejam no texto fornecido. Se faltarem dados, diga isso nos alertas."
-  )
-
   try:
-    client = OpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else OpenAI()
-    resp = client.with_options(timeout=12.0).chat.completions.create(
+    resp = await chat_completions_create(
+      client.with_options(timeout=12.0),
       model=settings.openai_model,
       messages=[
-        {"role": "system", "content": prompt},
-        {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
+        {"role": "system", "content": _SYSTEM_PROMPT_RESUMO},
+        {"role": "user", "content": orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS).decode()},
       ],
       temperature=0.2,
     )
 
     content = resp.choices[0].message.content or ""
-    data = json.loads(content)
+    data = orjson.loads(content)
     return AnaliseNoticia(
       resumo_tecnico=str(data.get("resumo_tecnico") or "").strip(),
       porque_pontuou=list(data.get("porque_pontuou") or []),
@@ -140,3 +161,53 @@ def gerar_resumo_tecnico(
     logger.warning(f"Falha ao gerar resumo técnico (OpenAI): {e}")
     return None
 
+
+async def gerar_resumo_tecnico_async(
+  noticia: Dict[str, Any],
+  politico_nome: Optional[str] = None,
+) -> Optional[AnaliseNoticia]:
+  """
+  Gera um resumo técnico via OpenAI.
+  Retorna None se a chave não estiver configurada ou a chamada falhar.
+  """
+  try:
+    client = _get_client()
+  except Exception as e:
+    logger.warning(f"Falha ao gerar resumo técnico (OpenAI): {e}")
+    return None
+  return await _gerar_resumo(noticia, politico_nome, client)
+
+
+async def gerar_resumos_tecnicos(
+  noticias: List[Dict[str, Any]],
+  politico_nome: Optional[str] = None,
+  concurrency: int = 20,
+) -> List[Optional[AnaliseNoticia]]:
+  """Gera resumos técnicos de várias notícias em paralelo (na ordem de entrada)."""
+  semaforo = asyncio.Semaphore(concurrency)
+
+  async def _um(noticia: Dict[str, Any]) -> Optional[AnaliseNoticia]:
+    async with semaforo:
+      return await gerar_resumo_tecnico_async(noticia, politico_nome=politico_nome)
+
+  return list(await asyncio.gather(*[_um(n) for n in noticias]))
+
+
+def gerar_resumo_tecnico(
+  noticia: Dict[str, Any],
+  politico_nome: Optional[str] = None,
+) -> Optional[AnaliseNoticia]:
+  """
+  Versão síncrona de `gerar_resumo_tecnico_async`, para uso fora de um event
+  loop (ex.: scripts). Usa um client próprio, fechado ao final.
+  """
+  async def _executar() -> Optional[AnaliseNoticia]:
+    try:
+      client = _novo_client()
+    except Exception as e:
+      logger.warning(f"Falha ao gerar resumo técnico (OpenAI): {e}")
+      return None
+    async with client:
+      return await _gerar_resumo(noticia, politico_nome, client)
+
+  return asyncio.run(_executar())
@@ -1,16 +1,64 @@
 """
 Analisador de tópicos usando OpenAI para classificar menções por assunto.
 """
-import json
+import hashlib
 import logging
+import re
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional
+
 from openai import AsyncOpenAI
+from pydantic import BaseModel
 
+from app.ai._openai_throttle import chat_completions_create, truncar_tokens
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+# Pré-classificação por palavras-chave: casos óbvios não precisam da OpenAI.
+# Uma categoria só é aceita com pelo menos MIN_HITS_REGRA ocorrências e se
+# nenhuma outra categoria também atingir esse mínimo.
+_REGRAS_ASSUNTO = [
+    (re.compile(p, re.IGNORECASE), assunto)
+    for p, assunto in [
+        (r"\b(?:sa[uú]de|sus|hospita\w*|vacin\w*|m[eé]dic\w*|ubs|enfermeir\w*|leitos?|doen[cç]\w*)\b", "Saúde"),
+        (r"\b(?:educa[cç]\w*|escolas?|professor\w*|ensino|alunos?|creches?|universidade\w*|merenda)\b", "Educação"),
+        (r"\b(?:seguran[cç]a|pol[ií]cia\w*|crimes?|criminal\w*|viol[eê]ncia|assalt\w*|homic[ií]dio\w*|tr[aá]fico)\b", "Segurança"),
+        (r"\b(?:economia|infla[cç][aã]o|juros|pib|impostos?|emprego\w*|desemprego|sal[aá]rio\w*|d[oó]lar)\b", "Economia"),
+        (r"\b(?:obras?|estradas?|rodovi\w*|saneamento|asfalt\w*|pontes?|metr[oô]|mobilidade|pavimenta\w*)\b", "Infraestrutura"),
+        (r"\b(?:meio ambiente|ambienta\w*|desmatamento|queimadas?|clima|enchentes?|florestas?|polui[cç][aã]o)\b", "Meio Ambiente"),
+        (r"\b(?:corrup\w*|propinas?|desvios?|lavagem|fraudes?|improbidade|pf|mensal[aã]o|pol[ií]cia federal)\b", "Corrupção"),
+        (r"\b(?:bolsa fam[ií]lia|pobreza|fome|moradia|assist[eê]ncia social|desigualdade|cestas? b[aá]sicas?)\b", "Social"),
+        (r"\b(?:cultura\w*|shows?|festival|carnaval|m[uú]sica|teatro|cinema|artistas?)\b", "Cultura"),
+        (r"\b(?:tecnologia\w*|internet|digital|intelig[eê]ncia artificial|startups?|inova[cç][aã]o|5g)\b", "Tecnologia"),
+        (r"\b(?:agroneg[oó]cio|agro|safras?|agricultur\w*|pecu[aá]ri\w*|produtor\w* rura\w*|soja|milho)\b", "Agronegócio"),
+    ]
+]
+MIN_HITS_REGRA = 2
+
+_POSITIVO = re.compile(
+    r"\b(?:parab[eé]ns|[oó]tim\w*|excelente|apoi\w*|conquista\w*|vit[oó]ria|orgulho|obrigad\w*|avan[cç]o\w*)\b",
+    re.IGNORECASE,
+)
+_NEGATIVO = re.compile(
+    r"\b(?:vergonha\w*|absurd\w*|p[eé]ssim\w*|mentir\w*|lixo|esc[aâ]ndalo\w*|fracass\w*|descaso|rid[ií]cul\w*)\b",
+    re.IGNORECASE,
+)
+
+
+class _Classificacao(BaseModel):
+    """Formato esperado de uma classificação retornada pela OpenAI"""
+    assunto: str = "Outro"
+    assunto_detalhe: str = ""
+    sentimento: str = "neutro"
+
+
+class _ClassificacaoBatch(BaseModel):
+    """Formato esperado da resposta de classificação em batch"""
+    classificacoes: List[_Classificacao] = []
+
+
 class TopicAnalyzer:
     """Classifica menções por assunto usando OpenAI"""
     
@@ -30,16 +78,51 @@ class TopicAnalyzer:
         "Outro"
     ]
     
+    # Conjuntos para validação O(1) em _normalizar_resultado
+    _CATEGORIAS_SET = frozenset(CATEGORIAS)
+    _SENTIMENTOS = frozenset(("positivo", "negativo", "neutro"))
+    
+    # Máximo de classificações mantidas no cache LRU
+    CACHE_MAX = 10000
+    
     def __init__(self):
-        self.client = None
-        if settings.openai_api_key:
-            self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+        self._client: Optional[AsyncOpenAI] = None  # criado no primeiro uso
         self.model = settings.openai_model
+        self._categorias_str = ", ".join(self.CATEGORIAS)
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    
+    @property
+    def client(self) -> Optional[AsyncOpenAI]:
+        """Client OpenAI, criado sob demanda (evita custo em processos que não classificam)"""
+        if self._client is None and settings.openai_api_key:
+            # max_retries=0: quem repete é chat_completions_create, passando pelo limitador RPM/TPM
+            self._client = AsyncOpenAI(api_key=settings.openai_api_key, max_retries=0)
+        return self._client
     
     @property
     def is_available(self) -> bool:
         """Verifica se o analisador está disponível"""
-        return self.client is not None
+        return bool(settings.openai_api_key)
+    
+    def _cache_key(self, conteudo: str, nome_politico: str) -> str:
+        """Chave do cache: hash do político + conteúdo (truncado como no prompt)"""
+        base = f"{nome_politico}|{(conteudo or '')[:500]}"
+        return hashlib.sha1(base.encode("utf-8")).hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retorna uma cópia da classificação em cache (e a marca como recente)"""
+        result = self._cache.get(key)
+        if result is None:
+            return None
+        self._cache.move_to_end(key)
+        return dict(result)
+    
+    def _cache_set(self, key: str, result: Dict[str, Any]) -> None:
+        """Armazena uma classificação, descartando a menos recente se cheio"""
+        self._cache[key] = dict(result)
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.CACHE_MAX:
+            self._cache.popitem(last=False)
     
     async def classificar_mencao(
         self, 
@@ -67,19 +150,31 @@ class TopicAnalyzer:
         if not conteudo or len(conteudo.strip()) < 10:
             return self._classificacao_padrao()
         
+        # Casos óbvios resolvidos por palavras-chave, sem custo de LLM
+        por_regras = self._classificar_por_regras(conteudo)
+        if por_regras is not None:
+            return por_regras
+        
+        # Reposts/cópias: reaproveita classificação já feita
+        cache_key = self._cache_key(conteudo, nome_politico)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             prompt = f"""Analise esta menção sobre o político {nome_politico}:
 
-"{conteudo[:500]}"
+"{truncar_tokens(conteudo, max_tokens=120, max_chars=500)}"
 
 Classifique em:
-1. ASSUNTO: Uma das categorias: {', '.join(self.CATEGORIAS)}
+1. ASSUNTO: Uma das categorias: {self._categorias_str}
 2. DETALHE: Breve descrição do contexto específico (máximo 100 caracteres)
 3. SENTIMENTO: positivo, negativo ou neutro
 
 Responda APENAS em JSON com as chaves: assunto, assunto_detalhe, sentimento"""
 
-            response = await self.client.chat.completions.create(
+            response = await chat_completions_create(
+                self.client,
                 model=self.model,
                 messages=[
                     {
@@ -93,10 +188,13 @@ Responda APENAS em JSON com as chaves: assunto, assunto_detalhe, sentimento"""
                 temperature=0.3
             )
             
-            result = json.loads(response.choices[0].message.content)
+            # Parse + validação do JSON numa única passada (pydantic-core)
+            result = _Classificacao.model_validate_json(response.choices[0].message.content)
             
             # Valida e normaliza resultado
-            return self._normalizar_resultado(result)
+            normalizado = self._normalizar_resultado(result)
+            self._cache_set(cache_key, normalizado)
+            return normalizado
             
         except Exception as e:
             logger.error(f"Erro ao classificar menção: {e}")
@@ -126,9 +224,25 @@ Responda APENAS em JSON com as chaves: assunto, assunto_detalhe, sentimento"""
                 mencao.update(classificacao)
             return mencoes
         
+        # Separa menções resolvidas por regras/cache das que precisam da OpenAI
+        pendentes = []
+        for mencao in mencoes:
+            por_regras = self._classificar_por_regras(mencao.get("conteudo") or "")
+            if por_regras is not None:
+                mencao.update(por_regras)
+                continue
+            
+            cache_key = self._cache_key(mencao.get("conteudo") or "", nome_politico)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                mencao.update(cached)
+            else:
+                pendentes.append((cache_key, mencao))
+        
         # Processa em batches para economizar tokens
-        for i in range(0, len(mencoes), batch_size):
-            batch = mencoes[i:i + batch_size]
+        for i in range(0, len(pendentes), batch_size):
+            chaves = [k for k, _ in pendentes[i:i + batch_size]]
+            batch = [m for _, m in pendentes[i:i + batch_size]]
             
             try:
                 classificacoes = await self._classificar_batch_interno(batch, nome_politico)
@@ -136,6 +250,8 @@ Responda APENAS em JSON com as chaves: assunto, assunto_detalhe, sentimento"""
                 for j, mencao in enumerate(batch):
                     if j < len(classificacoes):
                         mencao.update(classificacoes[j])
+                        if mencao.get("conteudo"):
+                            self._cache_set(chaves[j], classificacoes[j])
                     else:
                         mencao.update(self._classificacao_padrao())
                         
@@ -156,7 +272,7 @@ Responda APENAS em JSON com as chaves: assunto, assunto_detalhe, sentimento"""
         # Monta texto das menções
         mencoes_texto = []
         for idx, m in enumerate(batch):
-            conteudo = (m.get("conteudo") or "")[:300]
+            conteudo = truncar_tokens(m.get("conteudo") or "", max_tokens=80, max_chars=300)
             if conteudo:
                 mencoes_texto.append(f"{idx + 1}. \"{conteudo}\"")
         
@@ -168,13 +284,14 @@ Responda APENAS em JSON com as chaves: assunto, assunto_detalhe, sentimento"""
 {chr(10).join(mencoes_texto)}
 
 Para cada menção, classifique:
-- ASSUNTO: Uma das categorias: {', '.join(self.CATEGORIAS)}
+- ASSUNTO: Uma das categorias: {self._categorias_str}
 - DETALHE: Breve descrição (máx 80 caracteres)
 - SENTIMENTO: positivo, negativo ou neutro
 
 Responda em JSON com array "classificacoes" contendo objetos com: assunto, assunto_detalhe, sentimento"""
 
-        response = await self.client.chat.completions.create(
+        response = await chat_completions_create(
+            self.client,
             model=self.model,
             messages=[
                 {
@@ -188,22 +305,49 @@ Responda em JSON com array "classificacoes" contendo objetos com: assunto, assun
             temperature=0.3
         )
         
-        result = json.loads(response.choices[0].message.content)
-        classificacoes = result.get("classificacoes", [])
+        result = _ClassificacaoBatch.model_validate_json(response.choices[0].message.content)
+        
+        return [self._normalizar_resultado(c) for c in result.classificacoes]
+    
+    def _classificar_por_regras(self, conteudo: str) -> Optional[Dict[str, Any]]:
+        """
+        Classificação por palavras-chave para casos inequívocos: uma única
+        categoria com MIN_HITS_REGRA ocorrências e polaridade clara.
+        Retorna None quando há dúvida (a menção segue para a OpenAI).
+        """
+        if not conteudo:
+            return None
+        
+        texto = conteudo[:500]
+        candidatos = [
+            assunto for pattern, assunto in _REGRAS_ASSUNTO
+            if len(pattern.findall(texto)) >= MIN_HITS_REGRA
+        ]
+        if len(candidatos) != 1:
+            return None
+        
+        positivo = _POSITIVO.search(texto) is not None
+        negativo = _NEGATIVO.search(texto) is not None
+        if positivo == negativo:
+            return None
         
-        return [self._normalizar_resultado(c) for c in classificacoes]
+        return {
+            "assunto": candidatos[0],
+            "assunto_detalhe": "",
+            "sentimento": "positivo" if positivo else "negativo"
+        }
     
-    def _normalizar_resultado(self, result: Dict[str, Any]) -> Dict[str, Any]:
-        """Normaliza e valida o resultado da classificação"""
-        assunto = result.get("assunto", "Outro")
-        if assunto not in self.CATEGORIAS:
+    def _normalizar_resultado(self, result: _Classificacao) -> Dict[str, Any]:
+        """Normaliza o resultado (já validado) para as categorias/sentimentos aceitos"""
+        assunto = result.assunto
+        if assunto not in self._CATEGORIAS_SET:
             assunto = "Outro"
         
-        sentimento = result.get("sentimento", "neutro").lower()
-        if sentimento not in ["positivo", "negativo", "neutro"]:
+        sentimento = result.sentimento.lower()
+        if sentimento not in self._SENTIMENTOS:
             sentimento = "neutro"
         
-        detalhe = result.get("assunto_detalhe", "")
+        detalhe = result.assunto_detalhe
         if len(detalhe) > 150:
             detalhe = detalhe[:147] + "..."
         
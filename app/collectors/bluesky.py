@@ -7,8 +7,17 @@ import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
 import httpx
+import orjson
 
 from app.config import settings
+from app.utils.storage import HTTP2_DISPONIVEL
+
+# ciso8601 (opcional) é um parser ISO 8601 em C, bem mais rápido que o da stdlib
+try:
+    from ciso8601 import parse_datetime as _parse_iso
+except ImportError:
+    # Python 3.11+ aceita o sufixo "Z" diretamente em fromisoformat
+    _parse_iso = datetime.fromisoformat
 
 logger = logging.getLogger(__name__)
 
@@ -20,14 +29,48 @@ class BlueSkyCollector:
     
     SEARCH_ENDPOINT = "https://public.api.bsky.app/xrpc/app.bsky.feed.searchPosts"
     
+    # Headers padrão do client (GET sem corpo: não envia Content-Type)
+    HEADERS = {
+        "Accept": "application/json",
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+    }
+    
     def __init__(self):
         self.delay = settings.delay_entre_requisicoes
         self.max_results = 100  # Limite da API
+        self.max_concorrencia = 5  # Requisições simultâneas em buscar_mencoes_multiplos
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    async def start(self) -> None:
+        """
+        Abre o client HTTP de longa duração (pool de conexões + HTTP/2, se o
+        pacote h2 estiver instalado), reaproveitado por todas as buscas.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                http2=HTTP2_DISPONIVEL,
+                follow_redirects=True,
+                headers=self.HEADERS,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+            )
+    
+    async def aclose(self) -> None:
+        """Fecha o client HTTP (chamado no shutdown da aplicação)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Retorna o client compartilhado, abrindo-o no primeiro uso."""
+        await self.start()
+        return self._client
     
     async def buscar_mencoes(
         self,
         nome_politico: str,
-        limit: int = 50
+        limit: int = 50,
+        client: Optional[httpx.AsyncClient] = None
     ) -> List[Dict[str, Any]]:
         """
         Busca posts no BlueSky que mencionam o político.
@@ -35,6 +78,7 @@ class BlueSkyCollector:
         Args:
             nome_politico: Nome do político para buscar
             limit: Número máximo de resultados
+            client: Client HTTP (opcional; usa o client compartilhado se omitido)
             
         Returns:
             Lista de menções formatadas
@@ -42,36 +86,19 @@ class BlueSkyCollector:
         mencoes = []
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                params = {
-                    "q": nome_politico,
-                    "limit": min(limit, self.max_results)
-                }
-                
-                response = await client.get(
-                    self.SEARCH_ENDPOINT,
-                    params=params,
-                    headers={
-                        "Accept": "application/json",
-                        "Content-Type": "application/json",
-                        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-                    }
+            # Converte à medida que itera, sem manter a lista crua de posts
+            termos = self._termos_nome(nome_politico)
+            mencoes = [
+                mencao
+                for mencao in (
+                    self._parse_post(post, nome_politico, termos)
+                    for post in await self._buscar_posts(nome_politico, limit, client=client)
                 )
-                
-                if response.status_code != 200:
-                    logger.warning(f"BlueSky API retornou status {response.status_code}")
-                    return []
-                
-                data = response.json()
-                posts = data.get("posts", [])
-                
-                for post in posts:
-                    mencao = self._parse_post(post, nome_politico)
-                    if mencao:
-                        mencoes.append(mencao)
-                
-                logger.info(f"BlueSky: {len(mencoes)} menções encontradas para {nome_politico}")
-                
+                if mencao
+            ]
+            
+            logger.info(f"BlueSky: {len(mencoes)} menções encontradas para {nome_politico}")
+            
         except httpx.TimeoutException:
             logger.warning(f"Timeout ao buscar menções no BlueSky para {nome_politico}")
         except Exception as e:
@@ -79,44 +106,90 @@ class BlueSkyCollector:
         
         return mencoes
     
-    def _parse_post(self, post: Dict[str, Any], nome_politico: str) -> Optional[Dict[str, Any]]:
+    async def _buscar_posts(
+        self,
+        query: str,
+        limit: int,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Executa uma busca na API e retorna os posts crus.
+        Exceções de rede são propagadas para o chamador.
+        """
+        if client is None:
+            client = await self._get_client()
+        
+        params = {
+            "q": query,
+            "limit": min(limit, self.max_results)
+        }
+        
+        response = await client.get(self.SEARCH_ENDPOINT, params=params)
+        
+        if response.status_code != 200:
+            logger.warning(f"BlueSky API retornou status {response.status_code}")
+            return []
+        
+        data = orjson.loads(response.content)
+        return data.get("posts", [])
+    
+    @staticmethod
+    def _termos_nome(nome_politico: str) -> tuple:
+        """
+        Termos (minúsculos) que caracterizam uma menção ao político: nome
+        completo e, para nomes compostos, o primeiro e o último nome.
+        """
+        partes_nome = nome_politico.lower().split()
+        if len(partes_nome) >= 2:
+            return (nome_politico.lower(), partes_nome[0], partes_nome[-1])
+        return (nome_politico.lower(),)
+    
+    @staticmethod
+    def _menciona_politico(text_lower: str, termos: tuple) -> bool:
+        """Verifica se o texto (já em minúsculas) contém algum dos termos."""
+        return any(termo in text_lower for termo in termos)
+    
+    def _parse_post(
+        self,
+        post: Dict[str, Any],
+        nome_politico: str,
+        termos: Optional[tuple] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Converte um post do BlueSky para o formato interno.
         
         Args:
             post: Dados do post da API
             nome_politico: Nome do político (para validação)
+            termos: Termos do nome já calculados (`_termos_nome`), para não
+                recalculá-los a cada post
             
         Returns:
             Dict formatado ou None se inválido
         """
         try:
-            # Extrai dados do autor
-            author = post.get("author", {})
-            author_handle = author.get("handle", "")
-            author_name = author.get("displayName", author_handle)
-            
-            # Extrai conteúdo do post
+            # Valida o conteúdo antes de extrair o restante dos campos
             record = post.get("record", {})
             text = record.get("text", "")
             
             if not text:
                 return None
             
-            # Verifica se realmente menciona o político
-            nome_lower = nome_politico.lower()
-            if nome_lower not in text.lower():
-                # Pode ser um match parcial da busca, verifica partes do nome
-                partes_nome = nome_politico.split()
-                if len(partes_nome) >= 2:
-                    # Verifica se pelo menos primeiro e último nome estão presentes
-                    if not (partes_nome[0].lower() in text.lower() or 
-                            partes_nome[-1].lower() in text.lower()):
-                        return None
+            # Verifica se realmente menciona o político (nomes de uma só
+            # palavra confiam no match da própria busca)
+            if termos is None:
+                termos = self._termos_nome(nome_politico)
+            if len(termos) > 1 and not self._menciona_politico(text.lower(), termos):
+                return None
+            
+            # Extrai dados do autor
+            author = post.get("author", {})
+            author_handle = author.get("handle", "")
+            author_name = author.get("displayName", author_handle)
             
             # Extrai URI e constrói URL
             uri = post.get("uri", "")
-            post_id = uri.split("/")[-1] if uri else ""
+            post_id = uri.rsplit("/", 1)[-1] if uri else ""
             post_url = f"https://bsky.app/profile/{author_handle}/post/{post_id}" if post_id else None
             
             # Extrai métricas de engajamento
@@ -132,7 +205,7 @@ class BlueSkyCollector:
             posted_at = None
             if created_at:
                 try:
-                    posted_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+                    posted_at = _parse_iso(created_at)
                 except Exception:
                     posted_at = datetime.now(timezone.utc)
             
@@ -168,6 +241,11 @@ class BlueSkyCollector:
         """
         Busca menções para múltiplos políticos.
         
+        Cada político tem a sua própria busca (`buscar_mencoes`, mesmos
+        resultados da chamada individual); as buscas são disparadas em
+        paralelo (limitadas por `max_concorrencia`) compartilhando o client
+        HTTP da instância.
+        
         Args:
             nomes: Lista de nomes de políticos
             limit_por_nome: Limite de resultados por político
@@ -175,14 +253,16 @@ class BlueSkyCollector:
         Returns:
             Dict com nome -> lista de menções
         """
-        resultados = {}
+        semaforo = asyncio.Semaphore(self.max_concorrencia)
+        client = await self._get_client()
+        unicos = list(dict.fromkeys(nomes))
         
-        for nome in nomes:
-            mencoes = await self.buscar_mencoes(nome, limit_por_nome)
-            resultados[nome] = mencoes
-            await asyncio.sleep(self.delay)
+        async def _buscar_nome(nome: str) -> List[Dict[str, Any]]:
+            async with semaforo:
+                return await self.buscar_mencoes(nome, limit_por_nome, client=client)
         
-        return resultados
+        resultados = await asyncio.gather(*[_buscar_nome(nome) for nome in unicos])
+        return dict(zip(unicos, resultados))
 
 
 # Instância global
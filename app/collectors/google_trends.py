@@ -142,7 +142,7 @@ class GoogleTrendsCollector:
             return {}
         
         try:
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             resultado = await loop.run_in_executor(
                 self.executor,
                 self._buscar_interesse_sync,
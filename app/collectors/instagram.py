@@ -11,7 +11,7 @@ from itertools import islice
 
 from app.config import settings
 from app.database import db
-from app.utils.storage import upload_image_from_url_async
+from app.utils.storage import upload_images_from_urls_async
 
 logger = logging.getLogger(__name__)
 
@@ -123,7 +123,7 @@ class InstagramCollector:
         
         try:
             # Executa em thread separada (instaloader é síncrono)
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             
             def fetch_posts():
                 try:
@@ -202,24 +202,19 @@ class InstagramCollector:
             reverse=True
         )[:top_n]
         
-        # Upload das imagens para o Supabase Storage
-        for post in posts_sorted:
+        # Upload dos thumbnails para o Supabase Storage (em paralelo)
+        thumbnails = await upload_images_from_urls_async(
+            [post.get("thumbnail_url") for post in posts_sorted],
+            folder="instagram",
+            filenames=[
+                f"post_{post['post_shortcode']}" if post.get("post_shortcode") else None
+                for post in posts_sorted
+            ],
+        )
+        for post, thumbnail_url in zip(posts_sorted, thumbnails):
             post["politico_id"] = politico_id
-            
-            # Upload do thumbnail para o storage
-            thumbnail_original = post.get("thumbnail_url")
-            if thumbnail_original:
-                try:
-                    shortcode = post.get("post_shortcode", "")
-                    storage_url = await upload_image_from_url_async(
-                        image_url=thumbnail_original,
-                        folder="instagram",
-                        filename=f"post_{shortcode}" if shortcode else None,
-                        fallback_to_original=True
-                    )
-                    post["thumbnail_url"] = storage_url
-                except Exception as e:
-                    logger.warning(f"Erro ao fazer upload de thumbnail do Instagram: {e}")
+            if thumbnail_url:
+                post["thumbnail_url"] = thumbnail_url
         
         logger.info(f"Coletados {len(posts_sorted)} posts de {username}")
         
@@ -12,7 +12,7 @@ from app.collectors.news_google import GoogleNewsCollector
 from app.collectors.news_api import NewsAPICollector
 from app.relevance.engine import RelevanceEngine
 from app.database import db
-from app.utils.storage import upload_image_from_url_async
+from app.utils.storage import upload_images_from_urls_async
 
 logger = logging.getLogger(__name__)
 
@@ -221,6 +221,20 @@ class NewsAggregator:
 
         results = await asyncio.gather(*[_fetch(url) for _, url in to_fetch], return_exceptions=True)
 
+        # imagem_url: se vier do artigo, salva no storage (uploads em paralelo)
+        # e grava a URL pública
+        uploads: List[tuple[int, str]] = []
+        for (idx, _url), res in zip(to_fetch, results):
+            if isinstance(res, Exception) or not isinstance(res, dict):
+                continue
+            img = (res.get("imagem_url") or "").strip() if isinstance(res.get("imagem_url"), str) else ""
+            if img and not noticias[idx].get("imagem_url"):
+                uploads.append((idx, img))
+        if uploads:
+            urls = await upload_images_from_urls_async([img for _, img in uploads], folder="noticias")
+            for (idx, img), url in zip(uploads, urls):
+                noticias[idx]["imagem_url"] = url or img
+
         for (idx, _url), res in zip(to_fetch, results):
             if isinstance(res, Exception) or not isinstance(res, dict):
                 continue
@@ -233,18 +247,6 @@ class NewsAggregator:
             if not noticias[idx].get("publicado_em") and res.get("publicado_em"):
                 noticias[idx]["publicado_em"] = res.get("publicado_em")
 
-            # imagem_url: se vier do artigo, salva no storage e grava a URL pública
-            img = (res.get("imagem_url") or "").strip() if isinstance(res.get("imagem_url"), str) else ""
-            if img and not noticias[idx].get("imagem_url"):
-                try:
-                    noticias[idx]["imagem_url"] = await upload_image_from_url_async(
-                        image_url=img,
-                        folder="noticias",
-                        fallback_to_original=True,
-                    )
-                except Exception:
-                    noticias[idx]["imagem_url"] = img
-
             # titulo/descricao: preenche se estiver faltando
             if not noticias[idx].get("titulo") and res.get("titulo"):
                 noticias[idx]["titulo"] = res.get("titulo")
@@ -9,7 +9,7 @@ from newsapi import NewsApiClient
 from newsapi.newsapi_exception import NewsAPIException
 
 from app.config import settings
-from app.utils.storage import upload_image_from_url_async
+from app.utils.storage import upload_images_from_urls_async
 
 logger = logging.getLogger(__name__)
 
@@ -61,7 +61,7 @@ class NewsAPICollector:
         
         try:
             # NewsAPI é síncrono, executa em thread
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             
             # Busca dos últimos 7 dias (limite do plano gratuito)
             from_date = (datetime.now(timezone.utc) - timedelta(days=7)).strftime("%Y-%m-%d")
@@ -83,20 +83,13 @@ class NewsAPICollector:
             
             articles = response.get("articles", [])
             
-            for article in articles:
-                # Upload da imagem para o Supabase Storage
-                imagem_original = article.get("urlToImage")
-                imagem_url = imagem_original
-                if imagem_original:
-                    try:
-                        imagem_url = await upload_image_from_url_async(
-                            image_url=imagem_original,
-                            folder="noticias",
-                            fallback_to_original=True
-                        )
-                    except Exception as e:
-                        logger.warning(f"Erro ao fazer upload de imagem de notícia: {e}")
-                
+            # Upload das imagens para o Supabase Storage (em paralelo)
+            imagens = await upload_images_from_urls_async(
+                [article.get("urlToImage") for article in articles],
+                folder="noticias",
+            )
+            
+            for article, imagem_url in zip(articles, imagens):
                 noticia = {
                     "titulo": article.get("title"),
                     "descricao": article.get("description"),
@@ -237,7 +230,7 @@ class NewsAPICollector:
         noticias = []
         
         try:
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             
             response = await loop.run_in_executor(
                 None,
@@ -251,20 +244,15 @@ class NewsAPICollector:
             if response.get("status") != "ok":
                 return []
             
-            for article in response.get("articles", []):
-                # Upload da imagem para o Supabase Storage
-                imagem_original = article.get("urlToImage")
-                imagem_url = imagem_original
-                if imagem_original:
-                    try:
-                        imagem_url = await upload_image_from_url_async(
-                            image_url=imagem_original,
-                            folder="noticias",
-                            fallback_to_original=True
-                        )
-                    except Exception as e:
-                        logger.warning(f"Erro ao fazer upload de imagem de headline: {e}")
-                
+            articles = response.get("articles", [])
+            
+            # Upload das imagens para o Supabase Storage (em paralelo)
+            imagens = await upload_images_from_urls_async(
+                [article.get("urlToImage") for article in articles],
+                folder="noticias",
+            )
+            
+            for article, imagem_url in zip(articles, imagens):
                 noticia = {
                     "titulo": article.get("title"),
                     "descricao": article.get("description"),
@@ -86,7 +86,7 @@ class GoogleNewsCollector:
         
         try:
             # Busca no Google News (síncrono, executado em thread)
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             results = await loop.run_in_executor(
                 None, 
                 self.gnews.get_news, 
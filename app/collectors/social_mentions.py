@@ -41,7 +41,8 @@ class SocialMentionsAggregator:
         self,
         politico_id: int,
         nome_politico: str,
-        classificar: bool = True
+        classificar: bool = True,
+        mencoes_bluesky: Optional[List[Dict[str, Any]]] = None
     ) -> List[Dict[str, Any]]:
         """
         Coleta menções de um político de todas as fontes.
@@ -50,6 +51,8 @@ class SocialMentionsAggregator:
             politico_id: ID do político no banco
             nome_politico: Nome do político
             classificar: Se deve classificar por assunto
+            mencoes_bluesky: Menções do BlueSky já buscadas (ex.: pela busca
+                em paralelo de executar_coleta_completa); se None, busca aqui
             
         Returns:
             Lista de menções processadas
@@ -60,9 +63,10 @@ class SocialMentionsAggregator:
         
         # 1. Coleta do BlueSky
         try:
-            mencoes_bluesky = await self.bluesky.buscar_mencoes(nome_politico, limit=50)
-            for mencao in mencoes_bluesky:
-                mencao["politico_id"] = politico_id
+            if mencoes_bluesky is None:
+                mencoes_bluesky = await self.bluesky.buscar_mencoes(nome_politico, limit=50)
+            # Cópias: políticos homônimos compartilham a mesma lista
+            mencoes_bluesky = [{**mencao, "politico_id": politico_id} for mencao in mencoes_bluesky]
             todas_mencoes.extend(mencoes_bluesky)
             logger.info(f"BlueSky: {len(mencoes_bluesky)} menções para {nome_politico}")
         except Exception as e:
@@ -131,6 +135,16 @@ class SocialMentionsAggregator:
             politicos = db.get_politicos_diretoriaja()
             logger.info(f"Iniciando coleta de menções para {len(politicos)} políticos (usar_diretoriaja=True)")
             
+            # BlueSky de todos os políticos de uma vez (buscas em paralelo)
+            try:
+                bluesky_por_nome = await self.bluesky.buscar_mencoes_multiplos(
+                    [p["name"] for p in politicos if p.get("name")],
+                    limit_por_nome=50
+                )
+            except Exception as e:
+                logger.error(f"Erro na busca em paralelo do BlueSky, buscando por político: {e}")
+                bluesky_por_nome = {}
+            
             for politico in politicos:
                 try:
                     politico_id = politico["id"]
@@ -143,7 +157,8 @@ class SocialMentionsAggregator:
                     mencoes = await self.coletar_mencoes_politico(
                         politico_id,
                         nome,
-                        classificar=True
+                        classificar=True,
+                        mencoes_bluesky=bluesky_por_nome.get(nome)
                     )
                     
                     stats["politicos_processados"] += 1
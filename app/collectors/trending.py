@@ -449,7 +449,7 @@ class TrendingCollector:
         
         todas_noticias = []
         
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         
         for query in queries:
             try:
@@ -711,7 +711,7 @@ class GeneralTrendingCollector:
         ]
         
         todas_noticias = []
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         
         for query in queries:
             try:
@@ -788,7 +788,7 @@ class GeneralTrendingCollector:
         topics = []
         
         try:
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             
             trending_df = await loop.run_in_executor(
                 None,
@@ -1161,7 +1161,7 @@ class GoogleTrendingCollector:
             return []
         
         topics = []
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         
         try:
             # Tenta trending_searches primeiro
@@ -10,6 +10,7 @@ Este módulo consulta a API REST do portal DivulgaCandContas para obter:
 Fonte: https://divulgacandcontas.tse.jus.br/
 """
 
+import asyncio
 import logging
 from datetime import datetime
 from typing import Optional, List, Dict, Any
@@ -35,6 +36,12 @@ ELEICOES = {
     "2014": {"id": "2014", "tipo": "geral"},
 }
 
+# Headers comuns aos clients (sync e async)
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "application/json",
+}
+
 # UFs brasileiras
 UFS = [
     "AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA",
@@ -55,16 +62,32 @@ class DivulgaCandContasCollector:
         self.client = httpx.Client(
             timeout=60.0,
             follow_redirects=True,
-            headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                "Accept": "application/json",
-            }
+            headers=HEADERS
         )
+        # Client async (usado pelos métodos *_async), aberto no primeiro uso
+        self._async_client: Optional[httpx.AsyncClient] = None
         
     def __del__(self):
         if hasattr(self, 'client'):
             self.client.close()
     
+    async def _get_async_client(self) -> httpx.AsyncClient:
+        """Retorna o client async compartilhado, abrindo-o no primeiro uso."""
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(
+                timeout=60.0,
+                follow_redirects=True,
+                headers=HEADERS,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+            )
+        return self._async_client
+    
+    async def aclose(self) -> None:
+        """Fecha o client async (chamado no shutdown da aplicação)."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+    
     def _normalizar_cpf(self, cpf: str) -> str:
         """Remove formatação do CPF."""
         if not cpf:
@@ -133,6 +156,31 @@ class DivulgaCandContasCollector:
         
         return None
     
+    async def _fazer_requisicao_async(self, endpoint: str, params: dict = None) -> Optional[Dict]:
+        """Versão assíncrona de `_fazer_requisicao` (mesmo retry)."""
+        url = f"{API_BASE_URL}/{endpoint}"
+        client = await self._get_async_client()
+        
+        for tentativa in range(3):
+            try:
+                response = await client.get(url, params=params)
+                
+                if response.status_code == 200:
+                    return response.json()
+                elif response.status_code == 429:
+                    # Rate limited, espera e tenta novamente
+                    await asyncio.sleep(5 * (tentativa + 1))
+                    continue
+                else:
+                    logger.warning(f"API retornou {response.status_code}: {url}")
+                    return None
+                    
+            except Exception as e:
+                logger.error(f"Erro na requisição (tentativa {tentativa + 1}): {e}")
+                await asyncio.sleep(2)
+        
+        return None
+    
     def buscar_candidato_por_nome(
         self, 
         nome: str, 
@@ -282,6 +330,49 @@ class DivulgaCandContasCollector:
             for bem in bens
         ]
     
+    def _parse_receitas(self, resultado: Any, sequencial: str, eleicao: str, uf: str) -> List[Dict[str, Any]]:
+        """Converte a resposta de receitas da API para o formato interno."""
+        if not resultado:
+            return []
+        return [
+            {
+                "sequencial_candidato": sequencial,
+                "eleicao": eleicao,
+                "uf": uf,
+                "tipo_receita": item.get("fonteReceita", ""),
+                "origem_receita": item.get("origemReceita", ""),
+                "especie_recurso": item.get("especieRecurso", ""),
+                "valor": item.get("valorReceita", 0),
+                "cpf_cnpj_doador": item.get("cpfCnpjDoador", ""),
+                "nome_doador": item.get("nomeDoador", ""),
+                "data_receita": item.get("dataReceita", ""),
+                "numero_documento": item.get("numeroDocumento", ""),
+                "descricao": item.get("descricaoReceita", ""),
+            }
+            for item in (resultado if isinstance(resultado, list) else [resultado])
+        ]
+    
+    def _parse_despesas(self, resultado: Any, sequencial: str, eleicao: str, uf: str) -> List[Dict[str, Any]]:
+        """Converte a resposta de despesas da API para o formato interno."""
+        if not resultado:
+            return []
+        return [
+            {
+                "sequencial_candidato": sequencial,
+                "eleicao": eleicao,
+                "uf": uf,
+                "tipo_despesa": item.get("tipoDespesa", ""),
+                "origem_despesa": item.get("origemDespesa", ""),
+                "valor": item.get("valorDespesa", 0),
+                "cpf_cnpj_fornecedor": item.get("cpfCnpjFornecedor", ""),
+                "nome_fornecedor": item.get("nomeFornecedor", ""),
+                "data_despesa": item.get("dataDespesa", ""),
+                "numero_documento": item.get("numeroDocumento", ""),
+                "descricao": item.get("descricaoDespesa", ""),
+            }
+            for item in (resultado if isinstance(resultado, list) else [resultado])
+        ]
+    
     def buscar_receitas_candidato(
         self, 
         sequencial: str, 
@@ -308,24 +399,7 @@ class DivulgaCandContasCollector:
         try:
             endpoint = f"prestador/consulta/receitas/2/{eleicao_id}/{uf}/{sequencial}"
             resultado = self._fazer_requisicao(endpoint)
-            
-            if resultado:
-                for item in resultado if isinstance(resultado, list) else [resultado]:
-                    receita = {
-                        "sequencial_candidato": sequencial,
-                        "eleicao": eleicao,
-                        "uf": uf,
-                        "tipo_receita": item.get("fonteReceita", ""),
-                        "origem_receita": item.get("origemReceita", ""),
-                        "especie_recurso": item.get("especieRecurso", ""),
-                        "valor": item.get("valorReceita", 0),
-                        "cpf_cnpj_doador": item.get("cpfCnpjDoador", ""),
-                        "nome_doador": item.get("nomeDoador", ""),
-                        "data_receita": item.get("dataReceita", ""),
-                        "numero_documento": item.get("numeroDocumento", ""),
-                        "descricao": item.get("descricaoReceita", ""),
-                    }
-                    receitas.append(receita)
+            receitas = self._parse_receitas(resultado, sequencial, eleicao, uf)
                     
         except Exception as e:
             logger.error(f"Erro ao buscar receitas {sequencial}: {e}")
@@ -358,23 +432,7 @@ class DivulgaCandContasCollector:
         try:
             endpoint = f"prestador/consulta/despesas/2/{eleicao_id}/{uf}/{sequencial}"
             resultado = self._fazer_requisicao(endpoint)
-            
-            if resultado:
-                for item in resultado if isinstance(resultado, list) else [resultado]:
-                    despesa = {
-                        "sequencial_candidato": sequencial,
-                        "eleicao": eleicao,
-                        "uf": uf,
-                        "tipo_despesa": item.get("tipoDespesa", ""),
-                        "origem_despesa": item.get("origemDespesa", ""),
-                        "valor": item.get("valorDespesa", 0),
-                        "cpf_cnpj_fornecedor": item.get("cpfCnpjFornecedor", ""),
-                        "nome_fornecedor": item.get("nomeFornecedor", ""),
-                        "data_despesa": item.get("dataDespesa", ""),
-                        "numero_documento": item.get("numeroDocumento", ""),
-                        "descricao": item.get("descricaoDespesa", ""),
-                    }
-                    despesas.append(despesa)
+            despesas = self._parse_despesas(resultado, sequencial, eleicao, uf)
                     
         except Exception as e:
             logger.error(f"Erro ao buscar despesas {sequencial}: {e}")
@@ -452,6 +510,89 @@ class DivulgaCandContasCollector:
         
         return resultado
     
+    async def consulta_completa_candidato_async(
+        self, 
+        nome: str = None,
+        sequencial: str = None,
+        eleicao: str = "2024",
+        uf: str = "SP",
+        politico_id: int = None
+    ) -> Dict[str, Any]:
+        """
+        Versão assíncrona de `consulta_completa_candidato` (mesmo resultado).
+        
+        As chamadas à API usam o client async (receitas e despesas em paralelo);
+        o que ainda é síncrono (logs/gravação no Supabase e upload da foto)
+        roda em threads, sem bloquear o event loop.
+        """
+        resultado = {
+            "candidato": None,
+            "receitas": [],
+            "despesas": [],
+            "total_receitas": 0,
+            "total_despesas": 0
+        }
+        
+        log_id = await asyncio.to_thread(self._criar_log, politico_id, "", "candidato_completo")
+        
+        try:
+            if eleicao not in ELEICOES:
+                logger.error(f"Eleição {eleicao} não disponível")
+            else:
+                eleicao_id = ELEICOES[eleicao]["id"]
+                
+                # Se não tiver sequencial, busca por nome primeiro
+                if not sequencial and nome:
+                    endpoint = f"candidatura/listar/{eleicao}/{eleicao_id}/{uf}/2045202024/candidato"
+                    busca = await self._fazer_requisicao_async(endpoint, {"nomeCompleto": nome})
+                    candidatos = (busca or {}).get("candidatos") or []
+                    if candidatos:
+                        sequencial = candidatos[0].get("id")
+                        if not sequencial:
+                            resultado["candidato"] = await asyncio.to_thread(
+                                self._parse_candidato, candidatos[0], eleicao, uf
+                            )
+                
+                if sequencial:
+                    endpoint = f"candidatura/buscar/{eleicao}/{eleicao_id}/{uf}/{sequencial}/candidato"
+                    dados = await self._fazer_requisicao_async(endpoint)
+                    if dados:
+                        resultado["candidato"] = await asyncio.to_thread(
+                            self._parse_candidato_detalhado, dados, eleicao, uf
+                        )
+            
+            # Se encontrou candidato, busca receitas e despesas (em paralelo)
+            if resultado["candidato"]:
+                seq = resultado["candidato"].get("sequencial_candidato")
+                if seq:
+                    eleicao_id = ELEICOES[eleicao]["id"]
+                    dados_receitas, dados_despesas = await asyncio.gather(
+                        self._fazer_requisicao_async(f"prestador/consulta/receitas/2/{eleicao_id}/{uf}/{seq}"),
+                        self._fazer_requisicao_async(f"prestador/consulta/despesas/2/{eleicao_id}/{uf}/{seq}"),
+                    )
+                    resultado["receitas"] = self._parse_receitas(dados_receitas, seq, eleicao, uf)
+                    resultado["despesas"] = self._parse_despesas(dados_despesas, seq, eleicao, uf)
+                    
+                    resultado["total_receitas"] = sum(r.get("valor", 0) for r in resultado["receitas"])
+                    resultado["total_despesas"] = sum(d.get("valor", 0) for d in resultado["despesas"])
+                    
+                    # Salva candidatura e doações recebidas no banco
+                    await asyncio.to_thread(self._salvar_candidatura, resultado["candidato"], politico_id)
+                    await asyncio.to_thread(
+                        self._salvar_receitas_como_doacoes,
+                        resultado["receitas"], resultado["candidato"], politico_id
+                    )
+            
+            await asyncio.to_thread(
+                self._atualizar_log, log_id, "sucesso", 1 if resultado["candidato"] else 0
+            )
+            
+        except Exception as e:
+            logger.error(f"Erro na consulta completa: {e}")
+            await asyncio.to_thread(self._atualizar_log, log_id, "erro", 0, str(e))
+        
+        return resultado
+    
     def _salvar_candidatura(self, candidato: dict, politico_id: int = None):
         """Salva candidatura no banco."""
         try:
@@ -12,6 +12,10 @@ class Settings(BaseSettings):
     # Supabase
     supabase_url: str
     supabase_key: str
+    upsert_batch_size: int = 500  # Linhas por requisição nos upserts em lote
+    
+    # Redis (opcional): cache de respostas dos endpoints de leitura
+    redis_url: Optional[str] = None
     
     # NewsAPI
     newsapi_key: Optional[str] = None
@@ -19,6 +23,8 @@ class Settings(BaseSettings):
     # OpenAI (para resumo técnico de notícias)
     openai_api_key: Optional[str] = None
     openai_model: str = "gpt-4o-mini"
+    openai_rpm: int = 500  # Limite de requisições/minuto compartilhado pelo processo
+    openai_tpm: int = 200000  # Limite de tokens/minuto compartilhado pelo processo
     
     # Instagram (opcional)
     instagram_username: Optional[str] = None
@@ -34,6 +40,9 @@ class Settings(BaseSettings):
     dias_retencao_noticias: int = 7
     dias_retencao_instagram: int = 30
     
+    # Coletas manuais (API) executadas ao mesmo tempo; as demais aguardam
+    max_coletas_simultaneas: int = 2
+    
     # Delays para evitar rate limiting (em segundos)
     delay_entre_requisicoes: float = 2.0
     delay_instagram: float = 5.0
@@ -1,46 +1,217 @@
 """
 Cliente Supabase para operações no banco de dados.
 """
-from supabase import create_client, Client
-from typing import Optional, List, Dict, Any
+from supabase import create_client, Client, acreate_client, AsyncClient
+from supabase.lib.client_options import ClientOptions
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta, timezone
+import asyncio
+import copy
+import functools
 import logging
-from postgrest.types import CountMethod
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from postgrest.types import CountMethod, ReturningMethod
 
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Timeout (s) das requisições ao PostgREST
+POSTGREST_TIMEOUT = 10
+
+# Client Supabase compartilhado por todas as instâncias de Database: o httpx
+# interno mantém o pool de conexões keep-alive (sem novo handshake TLS por instância)
+_CLIENT: Optional[Client] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def _get_or_create_client() -> Client:
+    """Retorna o client Supabase do processo, criando-o no primeiro uso."""
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = create_client(
+                    settings.supabase_url,
+                    settings.supabase_key,
+                    options=ClientOptions(postgrest_client_timeout=POSTGREST_TIMEOUT)
+                )
+    return _CLIENT
+
+
+def _cutoff_iso(dias: int) -> str:
+    """Instante (UTC, ISO 8601 com fuso) de `dias` dias atrás, para filtros de retenção."""
+    return (datetime.now(timezone.utc) - timedelta(days=dias)).isoformat()
+
+
+def ttl_cache(ttl_seconds: float, maxsize: int = 256):
+    """
+    Decorator que memoiza o resultado por (args, kwargs) durante `ttl_seconds`.
+
+    - Thread-safe (RLock); no máximo `maxsize` entradas (descarta a mais antiga).
+    - Listas/dicts são devolvidos como cópia rasa, para o chamador poder
+      alterá-los sem afetar o cache.
+    - `funcao.invalidate()` descarta todas as entradas (usar após escritas).
+    """
+    def decorator(func):
+        cache: "OrderedDict[Any, tuple]" = OrderedDict()
+        lock = threading.RLock()
+
+        def _copia(valor: Any) -> Any:
+            return copy.copy(valor) if isinstance(valor, (list, dict)) else valor
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = (args, tuple(sorted(kwargs.items())))
+            with lock:
+                entrada = cache.get(key)
+                if entrada is not None and entrada[0] > time.monotonic():
+                    return _copia(entrada[1])
+
+            valor = func(*args, **kwargs)
+
+            with lock:
+                cache[key] = (time.monotonic() + ttl_seconds, valor)
+                cache.move_to_end(key)
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return _copia(valor)
+
+        def invalidate() -> None:
+            with lock:
+                cache.clear()
+
+        wrapper.invalidate = invalidate
+        return wrapper
+
+    return decorator
+
+
+def _chunks(items: List[Any], n: int):
+    """Divide `items` em fatias consecutivas de até `n` elementos."""
+    for i in range(0, len(items), n):
+        yield items[i:i + n]
+
+
+# Cache id (int) -> uuid dos políticos. O mapeamento não muda durante a vida
+# do processo, então evita um round trip em cada consulta por político.
+# LRU limitado; aquecido no startup por Database.preload_politico_uuids.
+UUID_CACHE_MAXSIZE = 10_000
+_UUID_CACHE: "OrderedDict[int, str]" = OrderedDict()
+_UUID_CACHE_LOCK = threading.Lock()
+
+
+def _uuid_cache_get(politico_id: int) -> Optional[str]:
+    with _UUID_CACHE_LOCK:
+        politico_uuid = _UUID_CACHE.get(politico_id)
+        if politico_uuid:
+            _UUID_CACHE.move_to_end(politico_id)
+        return politico_uuid
+
+
+def _uuid_cache_set(politico_id: int, politico_uuid: str) -> None:
+    with _UUID_CACHE_LOCK:
+        _UUID_CACHE[politico_id] = politico_uuid
+        _UUID_CACHE.move_to_end(politico_id)
+        while len(_UUID_CACHE) > UUID_CACHE_MAXSIZE:
+            _UUID_CACHE.popitem(last=False)
+
+# RPCs que falharam (ex.: função ainda não criada no banco). Durante
+# RPC_INDISPONIVEL_TTL s os métodos vão direto ao fallback, sem pagar a cada
+# requisição um round trip com erro e um warning.
+RPC_INDISPONIVEL_TTL = 300
+_RPC_INDISPONIVEIS: Dict[str, float] = {}
+_RPC_INDISPONIVEIS_LOCK = threading.Lock()
+
+
+class RpcIndisponivel(Exception):
+    """A RPC falhou há menos de RPC_INDISPONIVEL_TTL s; o chamador deve usar o fallback."""
+
+
+def rpc_disponivel(nome: str) -> bool:
+    """False enquanto a RPC `nome` estiver marcada como indisponível."""
+    with _RPC_INDISPONIVEIS_LOCK:
+        expira = _RPC_INDISPONIVEIS.get(nome)
+        if expira is None:
+            return True
+        if expira <= time.monotonic():
+            del _RPC_INDISPONIVEIS[nome]
+            return True
+        return False
+
+
+def marcar_rpc_indisponivel(nome: str, erro: Exception, fallback: str) -> None:
+    """Marca a RPC `nome` como indisponível por RPC_INDISPONIVEL_TTL s (um warning por marcação)."""
+    with _RPC_INDISPONIVEIS_LOCK:
+        _RPC_INDISPONIVEIS[nome] = time.monotonic() + RPC_INDISPONIVEL_TTL
+    logger.warning(
+        f"RPC {nome} indisponível, {fallback} (nova tentativa em {RPC_INDISPONIVEL_TTL} s): {erro}"
+    )
+
+# TTLs (segundos) das leituras memoizadas com ttl_cache. Escritas que alteram
+# esses dados chamam `<método>.invalidate()`.
+FONTES_CACHE_TTL = 300  # Fontes ativas: tabela pequena, lida a cada notícia processada
+ESTADOS_CACHE_TTL = 300  # Lista de estados com notícias
+TRENDING_CACHE_TTL = 30
+NOTICIAS_GERAIS_CACHE_TTL = 30
+
+# Colunas de notícia usadas nas listagens/cards: tudo menos `conteudo_completo`
+# (texto integral da matéria, de longe a coluna mais larga). O detalhe
+# (get_noticia_by_id) continua trazendo a linha completa.
+FIELDS_NOTICIAS_CARD = (
+    "id,politico_id,tipo,titulo,descricao,url,fonte_id,fonte_nome,imagem_url,"
+    "publicado_em,coletado_em,cidade,estado,score_recencia,score_mencao,"
+    "score_fonte,score_engajamento,relevancia_total,mencao_titulo,mencao_conteudo"
+)
+
+
+@functools.lru_cache(maxsize=32)
+def _colunas_select(fields: str) -> Optional[Tuple[str, ...]]:
+    """Colunas de um `select` do PostgREST ("a,b,c"); None para "*"."""
+    colunas = tuple(c.strip() for c in fields.split(",") if c.strip())
+    return None if "*" in colunas else colunas
+
+
+def _projetar(rows: List[Dict[str, Any]], fields: str) -> List[Dict[str, Any]]:
+    """
+    Reduz as linhas às colunas de `fields`. As RPCs que retornam
+    `setof noticias` trazem a linha inteira (com conteudo_completo e
+    diversity_key), ignorando o `select` do chamador.
+    """
+    colunas = _colunas_select(fields)
+    if colunas is None:
+        return rows
+    return [{c: row[c] for c in colunas if c in row} for row in rows]
+
 
 class Database:
     """Classe para gerenciar conexão e operações com Supabase"""
     
     def __init__(self):
-        self.client: Client = create_client(
-            settings.supabase_url,
-            settings.supabase_key
-        )
+        self.client: Client = _get_or_create_client()
     
     # ==================== POLÍTICOS ====================
     
     def get_politicos_ativos(self) -> List[Dict[str, Any]]:
         """Retorna todos os políticos ativos."""
         # PostgREST costuma impor um limite padrão (~1000 linhas). Paginar garante
-        # que a API retorne todos os políticos.
+        # que a API retorne todos os políticos. Paginação por chave (id > último
+        # id visto) em vez de OFFSET: cada página é um range scan no índice
+        # parcial politico_active_id_idx (scripts/sql/create_politico_indexes.sql).
         page_size = 1000
-        offset = 0
+        last_id = 0
         rows: List[Dict[str, Any]] = []
 
         while True:
-            query = (
+            response = (
                 self.client.table("politico")
                 .select("*")
                 .eq("active", True)
-            )
-            response = (
-                query.order("id", desc=False)
+                .gt("id", last_id)
+                .order("id", desc=False)
                 .limit(page_size)
-                .offset(offset)
                 .execute()
             )
             batch = response.data or []
@@ -48,14 +219,16 @@ class Database:
 
             if len(batch) < page_size:
                 break
-            offset += page_size
+            last_id = batch[-1]["id"]
 
         return rows
 
     def get_politicos_diretoriaja(self) -> List[Dict[str, Any]]:
         """Retorna políticos com usar_diretoriaja = true (sem filtrar por active)."""
+        # Paginação por chave, como em get_politicos_ativos; usa o índice parcial
+        # politico_usar_diretoriaja_id_idx (scripts/sql/create_politico_indexes.sql).
         page_size = 1000
-        offset = 0
+        last_id = 0
         rows: List[Dict[str, Any]] = []
 
         while True:
@@ -63,9 +236,9 @@ class Database:
                 self.client.table("politico")
                 .select("*")
                 .eq("usar_diretoriaja", True)
+                .gt("id", last_id)
                 .order("id", desc=False)
                 .limit(page_size)
-                .offset(offset)
                 .execute()
             )
             batch = response.data or []
@@ -73,22 +246,110 @@ class Database:
 
             if len(batch) < page_size:
                 break
-            offset += page_size
+            last_id = batch[-1]["id"]
 
         return rows
     
     def get_politico_by_id(self, politico_id: int) -> Optional[Dict[str, Any]]:
         """Retorna um político pelo ID"""
-        response = self.client.table("politico").select("*").eq("id", politico_id).single().execute()
-        return response.data
+        response = self.client.table("politico").select("*").eq("id", politico_id).maybe_single().execute()
+        return response.data if response else None
     
+    def get_politicos_by_ids(
+        self,
+        ids: List[Any],
+        chave: str = "id",
+        fields: str = "*"
+    ) -> Dict[Any, Dict[str, Any]]:
+        """
+        Vários políticos de uma vez ({valor da chave: político}), com consultas
+        `in` em lotes em vez de uma por político. `chave`: "id" (inteiro) ou "uuid".
+        """
+        politicos: Dict[Any, Dict[str, Any]] = {}
+        unicos = list(dict.fromkeys(i for i in ids if i is not None))
+        if fields != "*" and chave not in fields.split(","):
+            fields = f"{chave},{fields}"
+        for lote in _chunks(unicos, 200):
+            response = self.client.table("politico").select(fields).in_(chave, lote).execute()
+            for row in response.data or []:
+                politicos[row[chave]] = row
+                if row.get("id") is not None and row.get("uuid"):
+                    _uuid_cache_set(row["id"], row["uuid"])
+        return politicos
+
     def get_politico_uuid(self, politico_id: int) -> Optional[str]:
-        """Retorna o UUID de um político dado o ID inteiro"""
-        politico = self.get_politico_by_id(politico_id)
-        return politico.get("uuid") if politico else None
+        """Retorna o UUID de um político dado o ID inteiro (com cache em memória)"""
+        cached = _uuid_cache_get(politico_id)
+        if cached:
+            return cached
+
+        response = self.client.table("politico").select("uuid").eq("id", politico_id).maybe_single().execute()
+        politico_uuid = response.data.get("uuid") if response and response.data else None
+        if politico_uuid:
+            _uuid_cache_set(politico_id, politico_uuid)
+        return politico_uuid
+
+    def get_politico_uuids(self, politico_ids: List[int]) -> Dict[int, str]:
+        """UUIDs de vários políticos: os ausentes do cache numa única consulta"""
+        resultado = {}
+        faltando = []
+        for politico_id in politico_ids:
+            cached = _uuid_cache_get(politico_id)
+            if cached:
+                resultado[politico_id] = cached
+            else:
+                faltando.append(politico_id)
+        if faltando:
+            response = self.client.table("politico").select("id,uuid").in_("id", faltando).execute()
+            for row in response.data or []:
+                if row.get("uuid"):
+                    _uuid_cache_set(row["id"], row["uuid"])
+                    resultado[row["id"]] = row["uuid"]
+        return resultado
+
+    def preload_politico_uuids(self, page_size: int = 1000) -> int:
+        """
+        Carrega o mapeamento id -> uuid de todos os políticos no cache (startup),
+        em páginas de `page_size` linhas (paginação por chave, como em
+        get_politicos_ativos). Retorna quantos foram carregados.
+        """
+        total = 0
+        last_id = 0
+        while total < UUID_CACHE_MAXSIZE:
+            response = (
+                self.client.table("politico")
+                .select("id,uuid")
+                .gt("id", last_id)
+                .order("id", desc=False)
+                .limit(page_size)
+                .execute()
+            )
+            rows = response.data or []
+            for row in rows:
+                if row.get("uuid"):
+                    _uuid_cache_set(row["id"], row["uuid"])
+                    total += 1
+            if len(rows) < page_size:
+                break
+            last_id = rows[-1]["id"]
+        return total
 
     # ==================== HELPERS ====================
 
+    def _rpc(self, nome: str, params: Dict[str, Any], fallback: str) -> Optional[Any]:
+        """
+        Executa a RPC `nome` e retorna a resposta. Se ela falhar (ou tiver
+        falhado há menos de RPC_INDISPONIVEL_TTL s) retorna None, e o chamador
+        segue pelo `fallback` (descrição usada no log).
+        """
+        if not rpc_disponivel(nome):
+            return None
+        try:
+            return self.client.rpc(nome, params).execute()
+        except Exception as e:
+            marcar_rpc_indisponivel(nome, e, fallback)
+            return None
+    
     def _safe_count(self, response: Any) -> int:
         """
         Extrai o campo `count` de uma resposta do PostgREST/supabase-py.
@@ -160,50 +421,66 @@ class Database:
             return []
 
         cutoff = (datetime.now(timezone.utc) - timedelta(days=int(days_back))).isoformat()
-        out: List[Dict[str, Any]] = []
+        uuids = [(c.get("uuid") or "").strip() for c in concorrentes]
+        uuids_validos = [u for u in uuids if u]
+        if not uuids_validos:
+            return []
 
-        for c in concorrentes:
-            cuuid = (c.get("uuid") or "").strip()
-            if not cuuid:
-                continue
+        # 1) Snapshots de todos os concorrentes numa única consulta; o mais
+        #    recente de cada um é o primeiro que aparece (ordem por computed_at desc)
+        snapshot_by_uuid: Dict[str, Dict[str, Any]] = {}
+        try:
+            snap_resp = (
+                self.client.table("concorrente_twitter_insights")
+                .select("concorrente_politico_id,followers_count,top_mentions,computed_at,computed_date,mentions_window_days,twitter_username")
+                .in_("concorrente_politico_id", uuids_validos)
+                .eq("mentions_window_days", int(days_back))
+                .order("computed_at", desc=True)
+                .execute()
+            )
+            for row in snap_resp.data or []:
+                snapshot_by_uuid.setdefault(row.get("concorrente_politico_id"), row)
+        except Exception:
+            snapshot_by_uuid = {}
 
-            # 1) Tenta usar snapshot (se existir)
-            snapshot = None
+        # 2) Fallback: top mentions direto de social_mentions, numa única consulta
+        #    para todos os concorrentes sem snapshot utilizável
+        sem_top = [
+            u for u in uuids_validos
+            if not isinstance(snapshot_by_uuid.get(u, {}).get("top_mentions"), list)
+            or len(snapshot_by_uuid[u]["top_mentions"]) == 0
+        ]
+        mentions_by_uuid: Dict[str, List[Dict[str, Any]]] = {}
+        if sem_top:
             try:
-                snap_resp = (
-                    self.client.table("concorrente_twitter_insights")
-                    .select("followers_count,top_mentions,computed_at,computed_date,mentions_window_days,twitter_username")
-                    .eq("concorrente_politico_id", cuuid)
-                    .eq("mentions_window_days", int(days_back))
-                    .order("computed_at", desc=True)
-                    .limit(1)
+                mentions_resp = (
+                    self.client.table("social_mentions")
+                    .select("*")
+                    .in_("politico_id", sem_top)
+                    .eq("plataforma", "twitter")
+                    .gte("collected_at", cutoff)
+                    .order("engagement_score", desc=True)
                     .execute()
                 )
-                rows = snap_resp.data or []
-                snapshot = rows[0] if rows else None
+                for row in mentions_resp.data or []:
+                    grupo = mentions_by_uuid.setdefault(row.get("politico_id"), [])
+                    if len(grupo) < int(limit_top_mentions):
+                        grupo.append(row)
             except Exception:
-                snapshot = None
+                mentions_by_uuid = {}
+
+        out: List[Dict[str, Any]] = []
+        for c, cuuid in zip(concorrentes, uuids):
+            if not cuuid:
+                continue
 
+            snapshot = snapshot_by_uuid.get(cuuid)
             followers_count = snapshot.get("followers_count") if isinstance(snapshot, dict) else None
             top_mentions = snapshot.get("top_mentions") if isinstance(snapshot, dict) else None
             snapshot_at = snapshot.get("computed_at") if isinstance(snapshot, dict) else None
 
-            # 2) Fallback: calcula top mentions direto de social_mentions
             if not isinstance(top_mentions, list) or len(top_mentions) == 0:
-                try:
-                    mentions_resp = (
-                        self.client.table("social_mentions")
-                        .select("*")
-                        .eq("politico_id", cuuid)
-                        .eq("plataforma", "twitter")
-                        .gte("collected_at", cutoff)
-                        .order("engagement_score", desc=True)
-                        .limit(int(limit_top_mentions))
-                        .execute()
-                    )
-                    top_mentions = mentions_resp.data or []
-                except Exception:
-                    top_mentions = []
+                top_mentions = mentions_by_uuid.get(cuuid, [])
 
             out.append(
                 {
@@ -232,34 +509,72 @@ class Database:
             return None
     
     def insert_noticias_batch(self, noticias: List[Dict[str, Any]]) -> int:
-        """Insere múltiplas notícias de uma vez"""
+        """Insere múltiplas notícias de uma vez (em lotes de settings.upsert_batch_size)"""
         if not noticias:
             return 0
-        try:
-            response = self.client.table("noticias").upsert(
-                noticias,
-                on_conflict="url"
-            ).execute()
-            return len(response.data) if response.data else 0
-        except Exception as e:
-            logger.error(f"Erro ao inserir notícias em batch: {e}")
-            return 0
+        total = 0
+        for lote in _chunks(noticias, settings.upsert_batch_size):
+            try:
+                response = self.client.table("noticias").upsert(
+                    lote,
+                    on_conflict="url",
+                    count=CountMethod.exact,
+                    returning=ReturningMethod.minimal
+                ).execute()
+                total += self._safe_count(response)
+            except Exception as e:
+                logger.error(f"Erro ao inserir notícias em batch: {e}")
+        return total
 
     def get_noticia_by_id(self, noticia_id: str) -> Optional[Dict[str, Any]]:
         """Retorna uma notícia pelo ID (UUID)"""
         try:
-            response = self.client.table("noticias").select("*").eq("id", noticia_id).single().execute()
-            return response.data
+            response = self.client.table("noticias").select("*").eq("id", noticia_id).maybe_single().execute()
+            return response.data if response else None
         except Exception as e:
+            # Ex.: id que não é um UUID válido
             logger.error(f"Erro ao buscar notícia por id {noticia_id}: {e}")
             return None
     
+    def get_noticia_analise(self, noticia_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Análise técnica já gerada para a notícia (tabela noticia_analises,
+        scripts/sql/create_noticia_analises.sql), ou None.
+        """
+        try:
+            response = self.client.table("noticia_analises")\
+                .select("resumo_tecnico,porque_pontuou,hipoteses,alertas")\
+                .eq("noticia_id", noticia_id)\
+                .maybe_single()\
+                .execute()
+            return response.data if response else None
+        except Exception as e:
+            logger.warning(f"Erro ao buscar análise da notícia {noticia_id}: {e}")
+            return None
+    
+    def upsert_noticia_analise(self, noticia_id: str, analise: Dict[str, Any]) -> None:
+        """Grava a análise técnica gerada para a notícia (falhas só são logadas)."""
+        try:
+            self.client.table("noticia_analises").upsert(
+                {
+                    "noticia_id": noticia_id,
+                    **analise,
+                    "modelo": settings.openai_model,
+                    "gerado_em": datetime.now(timezone.utc).isoformat(),
+                },
+                on_conflict="noticia_id",
+                returning=ReturningMethod.minimal
+            ).execute()
+        except Exception as e:
+            logger.warning(f"Erro ao gravar análise da notícia {noticia_id}: {e}")
+    
     def get_noticias_politico(
         self, 
         politico_id: int, 
         limit: int = 20,
         min_score: float = 0,
-        diversificar_fontes: bool = True
+        diversificar_fontes: bool = True,
+        fields: str = FIELDS_NOTICIAS_CARD
     ) -> List[Dict[str, Any]]:
         """
         Retorna notícias de um político ordenadas por relevância.
@@ -269,17 +584,33 @@ class Database:
             limit: Número máximo de notícias
             min_score: Score mínimo de relevância
             diversificar_fontes: Se True, diversifica as notícias por fonte/canal
+            fields: Colunas retornadas (padrão: FIELDS_NOTICIAS_CARD, sem o conteúdo completo)
         """
+        if limit <= 0:
+            return []
+        
         # Converte ID inteiro para UUID
         politico_uuid = self.get_politico_uuid(politico_id)
         if not politico_uuid:
             return []
-        
+
+        if diversificar_fontes:
+            # Diversificação feita no Postgres (scripts/sql/create_noticias_rpcs.sql):
+            # trafega só as `limit` notícias finais
+            response = self._rpc("get_noticias_diversificadas", {
+                "p_uuid": politico_uuid,
+                "p_min_score": min_score,
+                "p_limit": limit,
+            }, "diversificando em Python")
+            if response is not None:
+                return _projetar(response.data or [], fields)
+
         # Busca mais notícias para poder diversificar
+        # (índice noticias_pol_rel_idx, scripts/sql/create_noticias_indexes.sql)
         fetch_limit = limit * 5 if diversificar_fontes else limit
         
         response = self.client.table("noticias")\
-            .select("*")\
+            .select(fields)\
             .eq("politico_id", politico_uuid)\
             .gte("relevancia_total", min_score)\
             .order("relevancia_total", desc=True)\
@@ -294,6 +625,74 @@ class Database:
         # Diversifica as notícias por fonte
         return self._diversificar_noticias_por_fonte(noticias, limit)
 
+    def get_noticias_politicos_batch(
+        self,
+        politico_ids: List[int],
+        limit_each: int = 10,
+        min_score: float = 0,
+        fields: str = FIELDS_NOTICIAS_CARD
+    ) -> List[Dict[str, Any]]:
+        """
+        Notícias diversificadas de vários políticos (até `limit_each` de cada),
+        ordenadas por relevância, numa única chamada à RPC
+        get_noticias_politicos_batch (scripts/sql/create_noticias_rpcs.sql).
+        Sem a função, consulta político a político. Só as colunas de `fields`.
+        """
+        if not politico_ids or limit_each <= 0:
+            return []
+        response = self._rpc("get_noticias_politicos_batch", {
+            "p_ids": list(politico_ids),
+            "p_limit": limit_each,
+            "p_min_score": min_score,
+        }, "consultando por político")
+        if response is not None:
+            return _projetar(response.data or [], fields)
+        
+        # Resolve os uuids de uma vez (cada get_noticias_politico usa o cache)
+        self.get_politico_uuids(list(politico_ids))
+        noticias = [
+            noticia
+            for politico_id in politico_ids
+            for noticia in self.get_noticias_politico(politico_id, limit_each, min_score, fields=fields)
+        ]
+        noticias.sort(key=lambda n: n.get("relevancia_total") or 0, reverse=True)
+        return noticias
+    
+    def get_noticias_politico_com_total(
+        self,
+        politico_id: int,
+        limit: int = 20,
+        min_score: float = 0,
+        diversificar_fontes: bool = True
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Notícias de um político (como `get_noticias_politico`) e o total com
+        relevância >= min_score (como `count_noticias_politico`), numa única
+        chamada à RPC noticias_politico_page (scripts/sql/create_noticias_rpcs.sql).
+        Sem a função, faz as duas consultas separadas.
+        
+        Returns:
+            (notícias, total)
+        """
+        response = self._rpc("noticias_politico_page", {
+            "p_id": politico_id,
+            "p_min": min_score,
+            "p_limit": max(limit, 0),
+            "p_diversificar": diversificar_fontes,
+        }, "usando consultas separadas")
+        if response is not None:
+            pagina = response.data
+            if not pagina:
+                return [], 0
+            if pagina.get("uuid"):
+                _uuid_cache_set(politico_id, pagina["uuid"])
+            return pagina.get("rows") or [], int(pagina.get("count") or 0)
+        
+        noticias = self.get_noticias_politico(
+            politico_id, limit, min_score, diversificar_fontes=diversificar_fontes
+        )
+        return noticias, self.count_noticias_politico(politico_id, min_score)
+    
     def count_noticias_politico(self, politico_id: int, min_score: float = 0) -> int:
         """
         Retorna a contagem total de notícias de um político (sem carregar os registros).
@@ -314,6 +713,38 @@ class Database:
             logger.error(f"Erro ao contar noticias do politico {politico_id}: {e}")
             return 0
     
+    def get_politicos_com_noticias(self, uuids: List[str]) -> set:
+        """
+        Subconjunto de `uuids` (politico.uuid) que tem ao menos uma notícia.
+        Usa a RPC politicos_com_noticias (scripts/sql/create_noticias_rpcs.sql),
+        uma chamada por lote de 500; sem ela, uma consulta de existência por político.
+        """
+        unicos = list(dict.fromkeys(u for u in uuids if u))
+        com_noticias: set = set()
+        for lote in _chunks(unicos, 500):
+            response = self._rpc("politicos_com_noticias", {"p_uuids": lote}, "usando consulta por político")
+            if response is None:
+                break
+            com_noticias.update(
+                row["politico_id"] if isinstance(row, dict) else row
+                for row in (response.data or [])
+            )
+        else:
+            return com_noticias
+        
+        com_noticias = set()
+        for politico_uuid in unicos:
+            response = (
+                self.client.table("noticias")
+                .select("id")
+                .eq("politico_id", politico_uuid)
+                .limit(1)
+                .execute()
+            )
+            if response.data:
+                com_noticias.add(politico_uuid)
+        return com_noticias
+    
     def _diversificar_noticias_por_fonte(
         self, 
         noticias: List[Dict[str, Any]], 
@@ -328,79 +759,70 @@ class Database:
         if not noticias:
             return []
         
-        # Agrupa notícias por fonte
-        por_fonte: Dict[str, List[Dict[str, Any]]] = {}
+        # Agrupa notícias por fonte, guardando o melhor score de cada uma na mesma passada
+        por_fonte: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        melhor_score: Dict[str, float] = {}
         for noticia in noticias:
             fonte = noticia.get("fonte_nome") or noticia.get("fonte_id") or "desconhecida"
-            if fonte not in por_fonte:
-                por_fonte[fonte] = []
             por_fonte[fonte].append(noticia)
+            score = noticia.get("relevancia_total") or 0
+            if score > melhor_score.get(fonte, -1):
+                melhor_score[fonte] = score
         
         # Se só tem uma fonte, retorna ordenado por relevância
         if len(por_fonte) <= 1:
             return noticias[:limit]
         
         # Ordena fontes pelo melhor score de cada uma (para priorizar fontes relevantes)
-        fontes_ordenadas = sorted(
-            por_fonte.keys(),
-            key=lambda f: max((n.get("relevancia_total") or 0) for n in por_fonte[f]),
-            reverse=True
-        )
+        fontes_ordenadas = sorted(melhor_score, key=melhor_score.get, reverse=True)
         
         # Alterna entre fontes usando round-robin
         resultado: List[Dict[str, Any]] = []
         urls_vistas = set()  # Evita duplicatas
-        indices = {fonte: 0 for fonte in fontes_ordenadas}
+        iteradores = {fonte: iter(por_fonte[fonte]) for fonte in fontes_ordenadas}
         
-        while len(resultado) < limit:
-            adicionou_alguma = False
-            
+        while len(resultado) < limit and iteradores:
             for fonte in fontes_ordenadas:
                 if len(resultado) >= limit:
                     break
                 
-                lista_fonte = por_fonte[fonte]
-                idx = indices[fonte]
+                iterador = iteradores.get(fonte)
+                if iterador is None:
+                    continue
                 
-                # Encontra a próxima notícia válida desta fonte
-                while idx < len(lista_fonte):
-                    noticia = lista_fonte[idx]
+                # Próxima notícia desta fonte com URL ainda não usada
+                for noticia in iterador:
                     url = noticia.get("url")
-                    
                     if url not in urls_vistas:
                         urls_vistas.add(url)
                         resultado.append(noticia)
-                        indices[fonte] = idx + 1
-                        adicionou_alguma = True
                         break
-                    
-                    idx += 1
-                    indices[fonte] = idx
-            
-            # Se não conseguiu adicionar nenhuma notícia, para o loop
-            if not adicionou_alguma:
-                break
+                else:
+                    # Fonte esgotada
+                    del iteradores[fonte]
         
         return resultado
     
     def get_noticias_cidade(
         self, 
         cidade: str, 
-        limit: int = 20
+        limit: int = 20,
+        fields: str = FIELDS_NOTICIAS_CARD
     ) -> List[Dict[str, Any]]:
         """Retorna notícias de uma cidade ordenadas por relevância"""
         response = self.client.table("noticias")\
-            .select("*")\
+            .select(fields)\
             .eq("cidade", cidade)\
             .order("relevancia_total", desc=True)\
             .limit(limit)\
             .execute()
         return response.data
     
-    def get_noticias_gerais(self, limit: int = 30) -> List[Dict[str, Any]]:
+    @ttl_cache(NOTICIAS_GERAIS_CACHE_TTL)
+    def get_noticias_gerais(self, limit: int = 30, fields: str = FIELDS_NOTICIAS_CARD) -> List[Dict[str, Any]]:
         """Retorna notícias políticas gerais ordenadas por relevância"""
         response = self.client.table("noticias")\
-            .select("*")\
+            .select(fields)\
             .eq("tipo", "geral")\
             .order("relevancia_total", desc=True)\
             .limit(limit)\
@@ -410,11 +832,12 @@ class Database:
     def get_noticias_estado(
         self,
         estado: str,
-        limit: int = 30
+        limit: int = 30,
+        fields: str = FIELDS_NOTICIAS_CARD
     ) -> List[Dict[str, Any]]:
         """Retorna notícias de um estado ordenadas por relevância"""
         response = self.client.table("noticias")\
-            .select("*")\
+            .select(fields)\
             .eq("tipo", "estado")\
             .eq("estado", estado)\
             .order("relevancia_total", desc=True)\
@@ -425,7 +848,8 @@ class Database:
     def get_noticias_capital(
         self,
         estado: str,
-        limit: int = 3
+        limit: int = 3,
+        fields: str = FIELDS_NOTICIAS_CARD
     ) -> List[Dict[str, Any]]:
         """
         Retorna notícias da capital/cidade de um estado ordenadas por relevância.
@@ -438,8 +862,9 @@ class Database:
         Returns:
             Lista de notícias da capital/cidade
         """
+        # Índice noticias_tipo_estado_rel_cidade_idx (scripts/sql/create_noticias_indexes.sql)
         response = self.client.table("noticias")\
-            .select("*")\
+            .select(fields)\
             .eq("tipo", "cidade")\
             .eq("estado", estado)\
             .not_.is_("cidade", "null")\
@@ -451,7 +876,8 @@ class Database:
     def get_noticias_nivel_estado(
         self,
         estado: str,
-        limit: int = 3
+        limit: int = 3,
+        fields: str = FIELDS_NOTICIAS_CARD
     ) -> List[Dict[str, Any]]:
         """
         Retorna notícias a nível de estado ordenadas por relevância.
@@ -464,8 +890,9 @@ class Database:
         Returns:
             Lista de notícias do estado
         """
+        # Índice noticias_tipo_estado_rel_idx (scripts/sql/create_noticias_indexes.sql)
         response = self.client.table("noticias")\
-            .select("*")\
+            .select(fields)\
             .eq("tipo", "estado")\
             .eq("estado", estado)\
             .is_("cidade", "null")\
@@ -488,26 +915,7 @@ class Database:
         Returns:
             Dict com estado como chave e lista de notícias como valor
         """
-        # Busca todas as notícias de cidades
-        response = self.client.table("noticias")\
-            .select("*")\
-            .eq("tipo", "cidade")\
-            .not_.is_("cidade", "null")\
-            .order("relevancia_total", desc=True)\
-            .execute()
-        
-        # Agrupa por estado e limita
-        noticias_por_estado: Dict[str, List[Dict[str, Any]]] = {}
-        
-        for noticia in response.data:
-            estado = noticia.get("estado")
-            if estado:
-                if estado not in noticias_por_estado:
-                    noticias_por_estado[estado] = []
-                if len(noticias_por_estado[estado]) < limit_por_capital:
-                    noticias_por_estado[estado].append(noticia)
-        
-        return noticias_por_estado
+        return self._noticias_top_n_por_estado("cidade", False, limit_por_capital)
     
     def get_noticias_todos_estados(
         self,
@@ -523,56 +931,76 @@ class Database:
         Returns:
             Dict com estado como chave e lista de notícias como valor
         """
-        # Busca todas as notícias de estados
-        response = self.client.table("noticias")\
-            .select("*")\
-            .eq("tipo", "estado")\
-            .is_("cidade", "null")\
-            .order("relevancia_total", desc=True)\
-            .execute()
+        return self._noticias_top_n_por_estado("estado", True, limit_por_estado)
+    
+    def _noticias_top_n_por_estado(
+        self,
+        tipo: str,
+        cidade_null: bool,
+        limit: int
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Top `limit` notícias de cada estado, agrupadas por estado.
+        
+        O corte por estado é feito no Postgres (RPC noticias_top_n_por_estado,
+        scripts/sql/create_noticias_rpcs.sql). Se a função não existir, busca
+        todas as notícias do tipo e corta em Python.
+        """
+        response = self._rpc("noticias_top_n_por_estado", {
+            "p_tipo": tipo,
+            "p_cidade_null": cidade_null,
+            "p_limit": limit,
+        }, "agrupando em Python")
+        if response is None:
+            query = self.client.table("noticias").select(FIELDS_NOTICIAS_CARD).eq("tipo", tipo)
+            query = query.is_("cidade", "null") if cidade_null else query.not_.is_("cidade", "null")
+            response = query.order("relevancia_total", desc=True).execute()
         
-        # Agrupa por estado e limita
+        # Agrupa por estado e limita (a RPC retorna a linha inteira: reduz às
+        # colunas de card, as mesmas do fallback)
         noticias_por_estado: Dict[str, List[Dict[str, Any]]] = {}
         
-        for noticia in response.data:
+        for noticia in _projetar(response.data or [], FIELDS_NOTICIAS_CARD):
             estado = noticia.get("estado")
             if estado:
                 if estado not in noticias_por_estado:
                     noticias_por_estado[estado] = []
-                if len(noticias_por_estado[estado]) < limit_por_estado:
+                if len(noticias_por_estado[estado]) < limit:
                     noticias_por_estado[estado].append(noticia)
         
         return noticias_por_estado
     
+    @ttl_cache(ESTADOS_CACHE_TTL)
     def get_estados_com_noticias(self) -> List[str]:
         """
-        Retorna lista de estados que possuem notícias coletadas.
+        Retorna lista de estados que possuem notícias coletadas
+        (cache de ESTADOS_CACHE_TTL s).
         
         Returns:
             Lista de siglas de estados
         """
-        response = self.client.table("noticias")\
-            .select("estado")\
-            .in_("tipo", ["estado", "cidade"])\
-            .not_.is_("estado", "null")\
-            .execute()
-        
-        # Extrai estados únicos
-        estados = set()
-        for row in response.data:
-            if row.get("estado"):
-                estados.add(row["estado"])
+        # DISTINCT no Postgres (scripts/sql/create_noticias_rpcs.sql)
+        response = self._rpc("estados_com_noticias", {}, "calculando em Python")
+        if response is not None:
+            estados = [row["estado"] for row in response.data or [] if row.get("estado")]
+        else:
+            response = self.client.table("noticias")\
+                .select("estado")\
+                .in_("tipo", ["estado", "cidade"])\
+                .not_.is_("estado", "null")\
+                .execute()
+            estados = sorted({row["estado"] for row in response.data if row.get("estado")})
         
-        return sorted(list(estados))
+        return estados
     
     def limpar_noticias_antigas(self, dias: int = 7) -> int:
         """Remove notícias mais antigas que X dias"""
-        data_limite = datetime.utcnow() - timedelta(days=dias)
+        data_limite = _cutoff_iso(dias)
         response = self.client.table("noticias")\
-            .delete()\
-            .lt("coletado_em", data_limite.isoformat())\
+            .delete(count=CountMethod.exact, returning=ReturningMethod.minimal)\
+            .lt("coletado_em", data_limite)\
             .execute()
-        return len(response.data) if response.data else 0
+        return self._safe_count(response)
     
     # ==================== INSTAGRAM ====================
     
@@ -589,18 +1017,22 @@ class Database:
             return None
     
     def insert_instagram_posts_batch(self, posts: List[Dict[str, Any]]) -> int:
-        """Insere múltiplos posts do Instagram"""
+        """Insere múltiplos posts do Instagram (em lotes de settings.upsert_batch_size)"""
         if not posts:
             return 0
-        try:
-            response = self.client.table("instagram_posts").upsert(
-                posts,
-                on_conflict="post_shortcode"
-            ).execute()
-            return len(response.data) if response.data else 0
-        except Exception as e:
-            logger.error(f"Erro ao inserir posts Instagram em batch: {e}")
-            return 0
+        total = 0
+        for lote in _chunks(posts, settings.upsert_batch_size):
+            try:
+                response = self.client.table("instagram_posts").upsert(
+                    lote,
+                    on_conflict="post_shortcode",
+                    count=CountMethod.exact,
+                    returning=ReturningMethod.minimal
+                ).execute()
+                total += self._safe_count(response)
+            except Exception as e:
+                logger.error(f"Erro ao inserir posts Instagram em batch: {e}")
+        return total
     
     def get_instagram_posts(
         self, 
@@ -621,17 +1053,47 @@ class Database:
             .execute()
         return response.data
 
+    def get_instagram_posts_unificado(self, politico_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Posts do Instagram ordenados por engajamento: tabela unificada
+        `social_media_posts` primeiro e, se ela não tiver posts do político, a
+        legada `instagram_posts`. As duas etapas rodam no banco numa única
+        chamada (RPC instagram_posts_politico,
+        scripts/sql/create_instagram_posts_politico.sql); sem a função, consulta aqui.
+        """
+        politico_uuid = self.get_politico_uuid(politico_id)
+        if not politico_uuid:
+            return []
+        
+        response = self._rpc("instagram_posts_politico", {
+            "p_uuid": politico_uuid,
+            "p_limit": limit,
+        }, "consultando tabela a tabela")
+        if response is not None:
+            return response.data or []
+        
+        posts = self.get_social_media_posts(politico_id, "instagram", limit=limit)
+        if not posts:
+            posts = self.get_instagram_posts(politico_id, limit)
+        return posts
+
     def count_instagram_posts(self, politico_id: int) -> int:
         """
         Retorna a contagem total de posts de Instagram para um político.
 
         Prioriza a tabela unificada `social_media_posts` (plataforma='instagram').
         Se estiver vazia, faz fallback para a tabela legada `instagram_posts`.
+        As duas etapas rodam no banco, numa única chamada (RPC count_ig_posts,
+        scripts/sql/create_count_ig_posts.sql); sem a função, conta aqui.
         """
         politico_uuid = self.get_politico_uuid(politico_id)
         if not politico_uuid:
             return 0
 
+        response = self._rpc("count_ig_posts", {"p_uuid": politico_uuid}, "contando tabela a tabela")
+        if response is not None:
+            return int(response.data or 0)
+
         # 1) Tabela unificada
         try:
             unified = (
@@ -684,14 +1146,25 @@ class Database:
             logger.error(f"Erro ao contar social_mentions do politico {politico_id}: {e}")
             return 0
     
+    def refresh_politico_counters(self) -> int:
+        """
+        Recalcula a tabela politico_counters (notícias, posts de Instagram e
+        menções por político) via RPC refresh_politico_counters
+        (scripts/sql/create_politico_counters.sql). Os triggers da tabela já
+        a mantêm a cada escrita; o scheduler chama isto uma vez por dia, como
+        reconciliação. Retorna o total de políticos atualizados.
+        """
+        response = self._rpc("refresh_politico_counters", {}, "contadores não atualizados")
+        return int(response.data or 0) if response is not None else 0
+    
     def limpar_instagram_antigos(self, dias: int = 30) -> int:
         """Remove posts do Instagram mais antigos que X dias"""
-        data_limite = datetime.utcnow() - timedelta(days=dias)
+        data_limite = _cutoff_iso(dias)
         response = self.client.table("instagram_posts")\
-            .delete()\
-            .lt("collected_at", data_limite.isoformat())\
+            .delete(count=CountMethod.exact, returning=ReturningMethod.minimal)\
+            .lt("collected_at", data_limite)\
             .execute()
-        return len(response.data) if response.data else 0
+        return self._safe_count(response)
     
     # ==================== REDES SOCIAIS (UNIFICADO) ====================
     
@@ -708,18 +1181,22 @@ class Database:
             return None
     
     def insert_social_media_posts_batch(self, posts: List[Dict[str, Any]]) -> int:
-        """Insere múltiplos posts de redes sociais"""
+        """Insere múltiplos posts de redes sociais (em lotes de settings.upsert_batch_size)"""
         if not posts:
             return 0
-        try:
-            response = self.client.table("social_media_posts").upsert(
-                posts,
-                on_conflict="politico_id,plataforma,post_id"
-            ).execute()
-            return len(response.data) if response.data else 0
-        except Exception as e:
-            logger.error(f"Erro ao inserir posts sociais em batch: {e}")
-            return 0
+        total = 0
+        for lote in _chunks(posts, settings.upsert_batch_size):
+            try:
+                response = self.client.table("social_media_posts").upsert(
+                    lote,
+                    on_conflict="politico_id,plataforma,post_id",
+                    count=CountMethod.exact,
+                    returning=ReturningMethod.minimal
+                ).execute()
+                total += self._safe_count(response)
+            except Exception as e:
+                logger.error(f"Erro ao inserir posts sociais em batch: {e}")
+        return total
     
     def get_social_media_posts(
         self, 
@@ -748,31 +1225,51 @@ class Database:
     
     def limpar_social_posts_antigos(self, dias: int = 30) -> int:
         """Remove posts de redes sociais mais antigos que X dias"""
-        data_limite = datetime.utcnow() - timedelta(days=dias)
+        data_limite = _cutoff_iso(dias)
         response = self.client.table("social_media_posts")\
-            .delete()\
-            .lt("collected_at", data_limite.isoformat())\
+            .delete(count=CountMethod.exact, returning=ReturningMethod.minimal)\
+            .lt("collected_at", data_limite)\
             .execute()
-        return len(response.data) if response.data else 0
+        return self._safe_count(response)
     
     # ==================== FONTES ====================
     
-    def get_fontes_ativas(self) -> List[Dict[str, Any]]:
-        """Retorna todas as fontes de notícias ativas"""
+    @ttl_cache(FONTES_CACHE_TTL)
+    def _fontes_ativas_cache(self) -> tuple:
+        """
+        Retorna (fontes, fontes_por_dominio) das fontes ativas, recarregando do
+        banco quando o cache passa de FONTES_CACHE_TTL segundos.
+        """
         response = self.client.table("fontes_noticias")\
             .select("*")\
             .eq("ativo", True)\
             .execute()
-        return response.data
+        fontes = response.data or []
+        por_dominio = {f["dominio"]: f for f in fontes if f.get("dominio")}
+        return fontes, por_dominio
+    
+    def invalidar_cache_fontes(self) -> None:
+        """Descarta o cache de fontes (próxima leitura vai ao banco)."""
+        Database._fontes_ativas_cache.invalidate()
+    
+    def get_fontes_ativas(self) -> List[Dict[str, Any]]:
+        """Retorna todas as fontes de notícias ativas (cache de FONTES_CACHE_TTL s)"""
+        fontes, _ = self._fontes_ativas_cache()
+        return list(fontes)
     
     def get_fonte_by_dominio(self, dominio: str) -> Optional[Dict[str, Any]]:
-        """Busca fonte pelo domínio"""
+        """Busca fonte pelo domínio (fontes ativas vêm do cache)"""
+        _, por_dominio = self._fontes_ativas_cache()
+        fonte = por_dominio.get(dominio)
+        if fonte is not None:
+            return fonte
+        
         response = self.client.table("fontes_noticias")\
             .select("*")\
             .eq("dominio", dominio)\
-            .single()\
+            .maybe_single()\
             .execute()
-        return response.data
+        return response.data if response else None
     
     def update_fonte_peso(self, fonte_id: str, novo_peso: float) -> bool:
         """Atualiza o peso de confiabilidade de uma fonte"""
@@ -781,6 +1278,7 @@ class Database:
                 .update({"peso_confiabilidade": novo_peso})\
                 .eq("id", fonte_id)\
                 .execute()
+            self.invalidar_cache_fontes()
             return True
         except Exception as e:
             logger.error(f"Erro ao atualizar peso da fonte: {e}")
@@ -792,28 +1290,41 @@ class Database:
         """
         Atualiza os trending topics de uma categoria específica (substitui todos da categoria).
         
+        A troca é feita pela RPC replace_trending_topics (scripts/sql/create_noticias_rpcs.sql):
+        DELETE + INSERT numa única transação e num único round trip. Sem a
+        função, faz o DELETE e o INSERT separados.
+        
         Args:
             topics: Lista de trending topics
             category: Categoria dos topics ('politica' ou 'geral')
         """
         try:
+            response = self._rpc("replace_trending_topics", {
+                "p_category": category,
+                "p_topics": topics or [],
+            }, "usando DELETE + INSERT")
+            if response is not None:
+                return int(response.data or 0)
+            
             # Limpa os topics existentes da categoria
             self.client.table("portal_trending_topics")\
                 .delete()\
                 .eq("category", category)\
                 .execute()
             
-            # Adiciona category a cada topic e insere os novos
-            if topics:
-                for topic in topics:
-                    topic["category"] = category
-                response = self.client.table("portal_trending_topics").insert(topics).execute()
-                return len(response.data) if response.data else 0
-            return 0
+            if not topics:
+                return 0
+            response = self.client.table("portal_trending_topics")\
+                .insert([{**topic, "category": category} for topic in topics])\
+                .execute()
+            return len(response.data) if response.data else 0
         except Exception as e:
             logger.error(f"Erro ao atualizar trending topics ({category}): {e}")
             return 0
+        finally:
+            Database.get_trending_topics.invalidate()
     
+    @ttl_cache(TRENDING_CACHE_TTL)
     def get_trending_topics(self, category: str = None) -> List[Dict[str, Any]]:
         """
         Retorna os trending topics ordenados por rank.
@@ -836,7 +1347,7 @@ class Database:
         response = self.client.table("coleta_logs").insert({
             "tipo_coleta": tipo_coleta,
             "status": "iniciado",
-            "iniciado_em": datetime.utcnow().isoformat()
+            "iniciado_em": datetime.now(timezone.utc).isoformat()
         }).execute()
         return response.data[0]["id"] if response.data else None
     
@@ -852,7 +1363,7 @@ class Database:
             "status": status,
             "mensagem": mensagem,
             "registros_coletados": registros,
-            "finalizado_em": datetime.utcnow().isoformat()
+            "finalizado_em": datetime.now(timezone.utc).isoformat()
         }).eq("id", log_id).execute()
     
     def get_logs_coleta(self, limit: int = 50) -> List[Dict[str, Any]]:
@@ -879,18 +1390,22 @@ class Database:
             return None
     
     def insert_social_mentions_batch(self, mentions: List[Dict[str, Any]]) -> int:
-        """Insere múltiplas menções sociais de uma vez"""
+        """Insere múltiplas menções sociais de uma vez (em lotes de settings.upsert_batch_size)"""
         if not mentions:
             return 0
-        try:
-            response = self.client.table("social_mentions").upsert(
-                mentions,
-                on_conflict="plataforma,mention_id"
-            ).execute()
-            return len(response.data) if response.data else 0
-        except Exception as e:
-            logger.error(f"Erro ao inserir menções sociais em batch: {e}")
-            return 0
+        total = 0
+        for lote in _chunks(mentions, settings.upsert_batch_size):
+            try:
+                response = self.client.table("social_mentions").upsert(
+                    lote,
+                    on_conflict="plataforma,mention_id",
+                    count=CountMethod.exact,
+                    returning=ReturningMethod.minimal
+                ).execute()
+                total += self._safe_count(response)
+            except Exception as e:
+                logger.error(f"Erro ao inserir menções sociais em batch: {e}")
+        return total
     
     def get_social_mentions_politico(
         self, 
@@ -967,12 +1482,12 @@ class Database:
     
     def limpar_social_mentions_antigas(self, dias: int = 30) -> int:
         """Remove menções sociais mais antigas que X dias"""
-        data_limite = datetime.utcnow() - timedelta(days=dias)
+        data_limite = _cutoff_iso(dias)
         response = self.client.table("social_mentions")\
-            .delete()\
-            .lt("collected_at", data_limite.isoformat())\
+            .delete(count=CountMethod.exact, returning=ReturningMethod.minimal)\
+            .lt("collected_at", data_limite)\
             .execute()
-        return len(response.data) if response.data else 0
+        return self._safe_count(response)
     
     # ==================== MENTION TOPICS (AGREGAÇÃO) ====================
     
@@ -980,7 +1495,7 @@ class Database:
         """Insere ou atualiza um tópico agregado de menções"""
         try:
             # Adiciona timestamp de atualização
-            topic["atualizado_em"] = datetime.utcnow().isoformat()
+            topic["atualizado_em"] = datetime.now(timezone.utc).isoformat()
             
             response = self.client.table("mention_topics").upsert(
                 topic,
@@ -1027,19 +1542,405 @@ class Database:
             .execute()
         return response.data
     
+    def get_top_assuntos_com_exemplo(
+        self,
+        politico_id: int,
+        limite: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Principais assuntos de um político (como `get_top_assuntos_politico`)
+        com `sentimento_predominante` e um `exemplo` (menção mais recente do
+        assunto), numa única chamada à RPC top_assuntos_politico
+        (scripts/sql/create_top_assuntos.sql). Sem a função, busca o exemplo
+        assunto a assunto.
+        """
+        politico_uuid = self.get_politico_uuid(politico_id)
+        if not politico_uuid:
+            return []
+        
+        response = self._rpc("top_assuntos_politico", {
+            "p_uuid": politico_uuid,
+            "p_limite": limite,
+        }, "buscando exemplos por assunto")
+        if response is not None:
+            return response.data or []
+        
+        assuntos = []
+        for t in self.get_top_assuntos_politico(politico_id, limite=limite):
+            pos = int(t.get("mencoes_positivas") or 0)
+            neg = int(t.get("mencoes_negativas") or 0)
+            neu = int(t.get("mencoes_neutras") or 0)
+            
+            sentimento_pred = "neutro"
+            if pos >= neg and pos >= neu:
+                sentimento_pred = "positivo"
+            elif neg >= pos and neg >= neu:
+                sentimento_pred = "negativo"
+            
+            exemplo = None
+            try:
+                m = self.get_social_mentions_by_assunto(politico_id, str(t.get("assunto") or ""), limit=1)
+                if m and m[0].get("assunto_detalhe"):
+                    exemplo = m[0].get("assunto_detalhe")
+                elif m and m[0].get("conteudo"):
+                    exemplo = str(m[0].get("conteudo"))[:120]
+            except Exception:
+                exemplo = None
+            
+            assuntos.append({
+                **t,
+                "sentimento_predominante": sentimento_pred,
+                "exemplo": exemplo,
+            })
+        return assuntos
+    
     def limpar_mention_topics_antigos(self, dias: int = 30) -> int:
         """Remove agregações de tópicos mais antigas que X dias"""
-        data_limite = datetime.utcnow() - timedelta(days=dias)
+        data_limite = _cutoff_iso(dias)
         response = self.client.table("mention_topics")\
-            .delete()\
-            .lt("periodo_fim", data_limite.isoformat())\
+            .delete(count=CountMethod.exact, returning=ReturningMethod.minimal)\
+            .lt("periodo_fim", data_limite)\
             .execute()
-        return len(response.data) if response.data else 0
+        return self._safe_count(response)
+
+
+class AsyncDatabase:
+    """
+    Versão assíncrona (client async do supabase-py) das consultas usadas em
+    endpoints compostos, onde consultas independentes podem rodar em paralelo
+    no event loop em vez de bloqueá-lo uma após a outra.
+    """
+    
+    def __init__(self):
+        self._client: Optional[AsyncClient] = None
+        self._lock = asyncio.Lock()
+    
+    _safe_count = Database._safe_count
+    
+    async def _rpc(self, nome: str, params: Dict[str, Any], fallback: str) -> Optional[Any]:
+        """Versão async de `Database._rpc` (mesmo registro de RPCs indisponíveis)."""
+        if not rpc_disponivel(nome):
+            return None
+        client = await self.get_client()
+        try:
+            return await client.rpc(nome, params).execute()
+        except Exception as e:
+            marcar_rpc_indisponivel(nome, e, fallback)
+            return None
+    
+    async def get_client(self) -> AsyncClient:
+        """Retorna o client async, criando-o no primeiro uso."""
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    self._client = await acreate_client(
+                        settings.supabase_url,
+                        settings.supabase_key
+                    )
+        return self._client
+    
+    async def get_politico_uuid(self, politico_id: int) -> Optional[str]:
+        """Retorna o UUID de um político dado o ID inteiro (mesmo cache de Database)"""
+        cached = _uuid_cache_get(politico_id)
+        if cached:
+            return cached
+        
+        client = await self.get_client()
+        response = await client.table("politico").select("uuid").eq("id", politico_id).maybe_single().execute()
+        politico_uuid = response.data.get("uuid") if response and response.data else None
+        if politico_uuid:
+            _uuid_cache_set(politico_id, politico_uuid)
+        return politico_uuid
+    
+    async def get_politico_by_id(self, politico_id: int) -> Optional[Dict[str, Any]]:
+        """Retorna um político pelo ID"""
+        client = await self.get_client()
+        response = await client.table("politico").select("*").eq("id", politico_id).maybe_single().execute()
+        return response.data if response else None
+    
+    async def get_politico_resumo(self, politico_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Resumo completo do político (mesmo JSON do endpoint /politicos/{id}/resumo)
+        numa única chamada à RPC politico_resumo (scripts/sql/create_politico_resumo.sql).
+        Retorna None se o político não existir; se a RPC falhar (ex.: função
+        ausente) levanta RpcIndisponivel para o chamador usar as consultas separadas.
+        """
+        response = await self._rpc("politico_resumo", {"p_id": politico_id}, "usando consultas separadas")
+        if response is None:
+            raise RpcIndisponivel("politico_resumo")
+        resumo = response.data
+        if not resumo:
+            return None
+        uuid = (resumo.get("politico") or {}).get("uuid")
+        if uuid:
+            _uuid_cache_set(politico_id, uuid)
+        return resumo
+    
+    # ==================== CONSULTA PROCESSUAL ====================
+    
+    async def get_processos(
+        self,
+        politico_uuid: str,
+        tribunal: Optional[str] = None,
+        tipo: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Processos judiciais de um político (mais recentes primeiro)"""
+        client = await self.get_client()
+        query = client.table("processos_judiciais").select("*").eq("politico_id", politico_uuid)
+        if tribunal:
+            query = query.eq("tribunal", tribunal)
+        if tipo:
+            query = query.eq("tipo", tipo)
+        if status:
+            query = query.eq("status", status)
+        response = await query.order("coletado_em", desc=True).limit(limit).execute()
+        return response.data or []
+    
+    async def get_doacoes(
+        self,
+        cpf: str,
+        feitas: bool = True,
+        recebidas: bool = True,
+        eleicao: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Doações eleitorais feitas (cpf_doador) e/ou recebidas (cpf_candidato)
+        por um CPF, até `limit` de cada tipo. As duas consultas rodam em paralelo.
+        """
+        client = await self.get_client()
+        
+        async def _buscar(coluna: str) -> List[Dict[str, Any]]:
+            query = client.table("doacoes_eleitorais").select("*").eq(coluna, cpf)
+            if eleicao:
+                query = query.eq("eleicao", eleicao)
+            response = await query.limit(limit).execute()
+            return response.data or []
+        
+        colunas = []
+        if feitas:
+            colunas.append("cpf_doador")
+        if recebidas:
+            colunas.append("cpf_candidato")
+        resultados = await asyncio.gather(*[_buscar(c) for c in colunas])
+        return [doacao for lista in resultados for doacao in lista]
+    
+    async def _rpc_agregado(self, funcao: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Chama uma RPC de agregação (scripts/sql/create_processual_agregados.sql).
+        Retorna None se a função não existir/falhar, para o chamador agregar
+        as linhas em Python.
+        """
+        response = await self._rpc(funcao, params, "agregando em Python")
+        if response is None:
+            return None
+        return response.data if response.data is not None else {}
+    
+    async def get_processos_agregados(
+        self,
+        politico_uuid: str,
+        tribunal: Optional[str] = None,
+        tipo: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Contagens por tribunal e por tipo ({"por_tribunal", "por_tipo"}) de todos os processos filtrados"""
+        return await self._rpc_agregado("processos_agregados", {
+            "p_uuid": politico_uuid,
+            "p_tribunal": tribunal,
+            "p_tipo": tipo,
+            "p_status": status,
+        })
+    
+    async def get_doacoes_agregados(
+        self,
+        cpf: str,
+        feitas: bool = True,
+        recebidas: bool = True,
+        eleicao: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Contagem por eleição e valor total ({"por_eleicao", "valor_total"}) das doações do CPF"""
+        return await self._rpc_agregado("doacoes_agregados", {
+            "p_cpf": cpf,
+            "p_feitas": feitas,
+            "p_recebidas": recebidas,
+            "p_eleicao": eleicao,
+        })
+    
+    async def get_candidaturas_por_eleicao(
+        self,
+        politico_uuid: str,
+        eleicao: Optional[str] = None
+    ) -> Optional[Dict[str, int]]:
+        """Contagem de candidaturas por eleição"""
+        return await self._rpc_agregado("candidaturas_por_eleicao", {
+            "p_uuid": politico_uuid,
+            "p_eleicao": eleicao,
+        })
+    
+    async def get_filiacoes(self, politico_uuid: str) -> List[Dict[str, Any]]:
+        """Histórico de filiações partidárias (mais recentes primeiro)"""
+        client = await self.get_client()
+        response = await client.table("filiacoes_partidarias")\
+            .select("*")\
+            .eq("politico_id", politico_uuid)\
+            .order("data_filiacao", desc=True)\
+            .execute()
+        return response.data or []
+    
+    async def get_candidaturas(self, politico_uuid: str, eleicao: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Histórico de candidaturas (eleições mais recentes primeiro)"""
+        client = await self.get_client()
+        query = client.table("candidaturas").select("*").eq("politico_id", politico_uuid)
+        if eleicao:
+            query = query.eq("eleicao", eleicao)
+        response = await query.order("eleicao", desc=True).execute()
+        return response.data or []
+    
+    # ==================== CONTADORES ====================
+    
+    async def get_contagens_politico(self, politico_id: int) -> Dict[str, int]:
+        """
+        Totais de notícias, posts de Instagram e menções sociais de um político.
+        
+        Lê uma linha de politico_counters (mantida por triggers,
+        scripts/sql/create_politico_counters.sql); sem ela, faz as três
+        contagens em paralelo.
+        """
+        politico_uuid = await self.get_politico_uuid(politico_id)
+        if not politico_uuid:
+            return {"noticias": 0, "instagram_posts": 0, "social_mentions": 0}
+        
+        client = await self.get_client()
+        try:
+            response = await client.table("politico_counters")\
+                .select("noticias,instagram_posts,social_mentions")\
+                .eq("politico_id", politico_uuid)\
+                .maybe_single()\
+                .execute()
+            if response and response.data:
+                return {k: int(v or 0) for k, v in response.data.items()}
+        except Exception as e:
+            logger.warning(f"Contadores indisponíveis para o politico {politico_id}, contando: {e}")
+        
+        noticias, instagram_posts, social_mentions = await asyncio.gather(
+            client.table("noticias")
+            .select("id", count=CountMethod.exact)
+            .eq("politico_id", politico_uuid)
+            .gte("relevancia_total", 0)
+            .limit(1)
+            .execute(),
+            self.count_instagram_posts(politico_id),
+            client.table("social_mentions")
+            .select("id", count=CountMethod.exact)
+            .eq("politico_id", politico_uuid)
+            .limit(1)
+            .execute(),
+            return_exceptions=True,
+        )
+        for nome, resultado in (("noticias", noticias), ("social_mentions", social_mentions)):
+            if isinstance(resultado, Exception):
+                logger.error(f"Erro ao contar {nome} do politico {politico_id}: {resultado}")
+        return {
+            "noticias": 0 if isinstance(noticias, Exception) else self._safe_count(noticias),
+            "instagram_posts": 0 if isinstance(instagram_posts, Exception) else instagram_posts,
+            "social_mentions": 0 if isinstance(social_mentions, Exception) else self._safe_count(social_mentions),
+        }
+    
+    # ==================== INSTAGRAM ====================
+    
+    async def get_instagram_stats(self, politico_id: int, limit: int = 100) -> Dict[str, Any]:
+        """
+        Totais de posts/likes/comentários dos `limit` posts de maior engajamento
+        (tabela legada instagram_posts) + o post de maior engajamento.
+        
+        Agregado no banco pela RPC instagram_stats
+        (scripts/sql/create_instagram_stats.sql); sem ela, busca só as colunas
+        somadas e o post do topo, em paralelo.
+        """
+        stats = {"total_posts": 0, "total_likes": 0, "total_comments": 0, "top_post": None}
+        politico_uuid = await self.get_politico_uuid(politico_id)
+        if not politico_uuid:
+            return stats
+        
+        response = await self._rpc(
+            "instagram_stats", {"p_uuid": politico_uuid, "p_limit": limit}, "agregando em Python"
+        )
+        if response is not None:
+            if response.data:
+                stats.update(response.data)
+            return stats
+        
+        client = await self.get_client()
+        somas, topo = await asyncio.gather(
+            client.table("instagram_posts")
+            .select("likes,comments")
+            .eq("politico_id", politico_uuid)
+            .order("engagement_score", desc=True)
+            .limit(limit)
+            .execute(),
+            client.table("instagram_posts")
+            .select("*")
+            .eq("politico_id", politico_uuid)
+            .order("engagement_score", desc=True)
+            .limit(1)
+            .execute(),
+        )
+        posts = somas.data or []
+        stats["total_posts"] = len(posts)
+        stats["total_likes"] = sum(p.get("likes") or 0 for p in posts)
+        stats["total_comments"] = sum(p.get("comments") or 0 for p in posts)
+        stats["top_post"] = topo.data[0] if topo.data else None
+        return stats
+    
+    async def count_instagram_posts(self, politico_id: int) -> int:
+        """
+        Mesmo resultado de `Database.count_instagram_posts`: uma chamada à RPC
+        count_ig_posts ou, sem ela, as contagens da tabela unificada e da
+        legada feitas em paralelo.
+        """
+        politico_uuid = await self.get_politico_uuid(politico_id)
+        if not politico_uuid:
+            return 0
+        
+        response = await self._rpc("count_ig_posts", {"p_uuid": politico_uuid}, "contando tabela a tabela")
+        if response is not None:
+            return int(response.data or 0)
+        
+        client = await self.get_client()
+        unified, legacy = await asyncio.gather(
+            client.table("social_media_posts")
+            .select("id", count=CountMethod.exact)
+            .eq("politico_id", politico_uuid)
+            .eq("plataforma", "instagram")
+            .execute(),
+            client.table("instagram_posts")
+            .select("id", count=CountMethod.exact)
+            .eq("politico_id", politico_uuid)
+            .execute(),
+            return_exceptions=True,
+        )
+        
+        if isinstance(unified, Exception):
+            logger.error(f"Erro ao contar posts (unificado) do politico {politico_id}: {unified}")
+        else:
+            unified_count = self._safe_count(unified)
+            if unified_count > 0:
+                return unified_count
+        
+        if isinstance(legacy, Exception):
+            logger.error(f"Erro ao contar posts (legado) do politico {politico_id}: {legacy}")
+            return 0
+        return self._safe_count(legacy)
 
 
 # Instância global do banco
 db = Database()
 
+# Instância global assíncrona (para endpoints async)
+adb = AsyncDatabase()
+
 
 def get_supabase() -> Client:
     """Retorna o cliente Supabase para uso em outros módulos."""
@@ -1,21 +1,26 @@
 """
 API FastAPI para o Portal de Dados Políticos.
 """
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Optional, List
+from typing import Literal, Optional, List
 
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 import httpx
 from io import BytesIO
 import base64
 
 from app import __version__
 from app.config import settings
-from app.database import db
+from app.database import db, adb, RpcIndisponivel
+from app.utils import response_cache, storage
+from app.utils.response_cache import cached
+from app.utils.etag import ETagMiddleware
 from app.scheduler.jobs import (
     start_scheduler, 
     shutdown_scheduler, 
@@ -40,7 +45,8 @@ from app.models.schemas import (
     ConsultaProcessualResponse,
     PoliticoResumoProcessual
 )
-from app.ai.noticias import calcular_pontos, gerar_resumo_tecnico
+from app.ai.noticias import calcular_pontos, gerar_resumo_tecnico_async
+from app.collectors.bluesky import bluesky_collector
 
 # Importa collectors de consulta processual
 from app.collectors.tse_dados_abertos import tse_collector
@@ -57,16 +63,59 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+async def _aquecer_caches() -> None:
+    """
+    Leituras quentes feitas no startup (em background), para que os primeiros
+    usuários não paguem pool de conexões frio e caches vazios: mapa id -> uuid
+    dos políticos e as respostas de /politicos, /fontes e /trending (cache em
+    Redis, quando configurado, e caches em memória do Database).
+    """
+    try:
+        carregados = await asyncio.to_thread(db.preload_politico_uuids)
+        logger.info(f"Cache de uuids aquecido: {carregados} políticos")
+    except Exception as e:
+        logger.warning(f"Falha ao aquecer cache de uuids: {e}")
+    
+    # Mesmos kwargs que o FastAPI passa aos handlers (mesma chave de cache)
+    aquecimentos = {
+        "/politicos": get_politicos(),
+        "/fontes": get_fontes(),
+        "/trending": get_trending_topics(category=None),
+        "client async": adb.get_client(),
+    }
+    resultados = await asyncio.gather(*aquecimentos.values(), return_exceptions=True)
+    for nome, resultado in zip(aquecimentos, resultados):
+        if isinstance(resultado, Exception):
+            logger.warning(f"Falha ao aquecer {nome}: {resultado}")
+    logger.info("Caches aquecidos")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gerencia ciclo de vida da aplicação"""
     # Startup
     logger.info("Iniciando Portal de Dados Políticos...")
+    # Client HTTP compartilhado (pool de conexões + HTTP/2, se o pacote h2
+    # estiver instalado) para chamadas externas
+    app.state.http = httpx.AsyncClient(
+        http2=storage.HTTP2_DISPONIVEL,
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+        timeout=httpx.Timeout(10.0, connect=5.0),
+    )
+    await response_cache.iniciar()
     start_scheduler()
+    aquecimento = asyncio.create_task(_aquecer_caches())
     yield
     # Shutdown
     logger.info("Encerrando aplicação...")
+    aquecimento.cancel()
     shutdown_scheduler()
+    await bluesky_collector.aclose()
+    await divulgacand_collector.aclose()
+    await response_cache.fechar()
+    await storage.close_async_client()
+    storage.close_client()
+    await app.state.http.aclose()
 
 
 # Cria aplicação FastAPI
@@ -74,7 +123,9 @@ app = FastAPI(
     title="Portal de Dados Políticos",
     description="API para coleta e consulta de dados de políticos brasileiros",
     version=__version__,
-    lifespan=lifespan
+    lifespan=lifespan,
+    # Serialização com orjson (datetime/UUID/numpy nativos), bem mais barata que json.dumps
+    default_response_class=ORJSONResponse
 )
 
 # Configura CORS
@@ -86,6 +137,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ETag + 304 Not Modified para listagens consultadas em polling pelos dashboards
+app.add_middleware(
+    ETagMiddleware,
+    paths=["/fontes", "/trending", "/politicos", "/coleta/jobs"],
+    max_age=30,
+)
+
+# Compressão das respostas (JSON de listas/resumos comprime 5-10x). Adicionado
+# por último = mais externo: o ETag (fraco) é calculado sobre o corpo sem compressão
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 
 # ==================== HEALTH ====================
 
@@ -108,7 +170,7 @@ async def health():
 # ==================== NOTÍCIAS ====================
 
 @app.get("/politicos/{politico_id}/noticias", response_model=List[dict])
-async def get_noticias_politico(
+def get_noticias_politico(
     politico_id: int,
     limit: int = Query(default=20, ge=1, le=100),
     min_score: float = Query(default=0, ge=0, le=100),
@@ -127,7 +189,7 @@ async def get_noticias_politico(
 
 
 @app.get("/politicos/{politico_id}/noticias/top", response_model=List[dict])
-async def get_top_noticias_politico(
+def get_top_noticias_politico(
     politico_id: int,
     limit: int = Query(default=5, ge=1, le=20)
 ):
@@ -141,7 +203,7 @@ async def get_top_noticias_politico(
     return noticias
 
 
-@app.get("/politicos/{politico_id}/concorrentes/noticias", response_model=List[dict])
+@app.get("/politicos/{politico_id}/concorrentes/noticias", response_model=None)
 async def get_noticias_concorrentes(
     politico_id: int,
     limit: int = Query(default=10, ge=1, le=50)
@@ -157,18 +219,15 @@ async def get_noticias_concorrentes(
     if not concorrentes:
         return []
     
-    todas_noticias = []
-    for concorrente in concorrentes:
-        noticias = db.get_noticias_politico(concorrente["id"], limit, diversificar_fontes=True)
-        todas_noticias.extend(noticias)
-    
-    # Ordena por relevância
-    todas_noticias.sort(key=lambda x: x.get("relevancia_total", 0), reverse=True)
+    # Notícias de todos os concorrentes numa única consulta, já ordenadas por relevância
+    todas_noticias = await asyncio.to_thread(
+        db.get_noticias_politicos_batch, [c["id"] for c in concorrentes], limit
+    )
     
     return todas_noticias[:limit * len(concorrentes)]
 
 
-@app.get("/politicos/{politico_id}/concorrentes/resumo", response_model=List[dict])
+@app.get("/politicos/{politico_id}/concorrentes/resumo", response_model=None)
 async def get_resumo_concorrentes(
     politico_id: int,
     limit_noticias: int = Query(default=5, ge=1, le=20)
@@ -185,39 +244,36 @@ async def get_resumo_concorrentes(
     if not concorrentes:
         return []
     
-    resultado = []
-    for concorrente in concorrentes:
+    async def _resumo(concorrente: dict) -> dict:
         concorrente_id = concorrente["id"]
         
-        # Busca notícias diversificadas do concorrente
-        noticias = db.get_noticias_politico(
-            concorrente_id, 
-            limit=limit_noticias, 
-            min_score=0,
-            diversificar_fontes=True
+        # Notícias diversificadas (e o total, na mesma chamada), posts e contagem do
+        # Instagram (politico_counters) em paralelo
+        (noticias, total_noticias), instagram, contagens = await asyncio.gather(
+            asyncio.to_thread(
+                db.get_noticias_politico_com_total,
+                concorrente_id,
+                limit=limit_noticias,
+                min_score=0,
+                diversificar_fontes=True
+            ),
+            asyncio.to_thread(db.get_instagram_posts_unificado, concorrente_id, 3),
+            adb.get_contagens_politico(concorrente_id),
         )
         
-        # Busca posts do Instagram (tabela unificada primeiro, fallback para legada)
-        instagram = db.get_social_media_posts(concorrente_id, "instagram", limit=3)
-        if not instagram:
-            instagram = db.get_instagram_posts(concorrente_id, limit=3)
-        
-        # Monta resumo do concorrente
-        resumo_concorrente = {
+        return {
             "politico": concorrente,
             "noticias": noticias,
-            "total_noticias": db.count_noticias_politico(concorrente_id),
+            "total_noticias": total_noticias,
             "instagram": instagram,
-            "total_instagram": db.count_instagram_posts(concorrente_id),
+            "total_instagram": contagens["instagram_posts"],
         }
-        
-        resultado.append(resumo_concorrente)
     
-    return resultado
+    return list(await asyncio.gather(*[_resumo(c) for c in concorrentes]))
 
 
 @app.get("/politicos/{politico_id}/concorrentes/twitter_insights", response_model=List[dict])
-async def get_concorrentes_twitter_insights(
+def get_concorrentes_twitter_insights(
     politico_id: int,
     days_back: int = Query(default=7, ge=1, le=30),
 ):
@@ -230,7 +286,7 @@ async def get_concorrentes_twitter_insights(
 
 
 @app.get("/noticias/cidade/{cidade}", response_model=List[dict])
-async def get_noticias_cidade(
+def get_noticias_cidade(
     cidade: str,
     limit: int = Query(default=20, ge=1, le=100)
 ):
@@ -245,7 +301,8 @@ async def get_noticias_cidade(
 
 
 @app.get("/noticias/politica", response_model=List[dict])
-async def get_noticias_politicas():
+@cached(ttl=30, namespace="noticias")
+def get_noticias_politicas():
     """
     Retorna notícias políticas gerais ordenadas por relevância.
     """
@@ -254,7 +311,7 @@ async def get_noticias_politicas():
 
 
 @app.get("/noticias/estado/{estado}", response_model=List[dict])
-async def get_noticias_estado(
+def get_noticias_estado(
     estado: str,
     limit: int = Query(default=30, ge=1, le=100)
 ):
@@ -269,7 +326,7 @@ async def get_noticias_estado(
 
 
 @app.get("/noticias/capital/{estado}", response_model=List[dict])
-async def get_noticias_capital(
+def get_noticias_capital(
     estado: str,
     limit: int = Query(default=3, ge=1, le=20)
 ):
@@ -284,7 +341,8 @@ async def get_noticias_capital(
 
 
 @app.get("/noticias/capitais", response_model=dict)
-async def get_noticias_todas_capitais(
+@cached(ttl=30, namespace="noticias")
+def get_noticias_todas_capitais(
     limit_por_capital: int = Query(default=3, ge=1, le=10)
 ):
     """
@@ -300,41 +358,74 @@ async def get_noticias_todas_capitais(
     }
 
 
+# Análises geradas ficam 24h no Redis (e sem prazo em noticia_analises)
+ANALISE_CACHE_TTL = 24 * 60 * 60
+
+
 @app.get("/noticias/{noticia_id}/analise", response_model=dict)
-async def get_noticia_analise(noticia_id: str):
+async def get_noticia_analise(noticia_id: str, response: Response):
     """
     Retorna análise técnica de uma notícia:
     - breakdown de scores/pontos
     - resumo técnico (quando OpenAI estiver configurado)
+    
+    O resumo é gerado uma vez por notícia; o header X-Cache indica se veio
+    do cache (HIT) ou foi gerado agora (MISS).
     """
-    noticia = db.get_noticia_by_id(noticia_id)
+    chave = f"analise:{noticia_id}"
+    cached_resp = await response_cache.obter(chave)
+    if cached_resp is not None:
+        response.headers["X-Cache"] = "HIT"
+        return cached_resp
+
+    noticia = await asyncio.to_thread(db.get_noticia_by_id, noticia_id)
     if not noticia:
         raise HTTPException(status_code=404, detail="Notícia não encontrada")
 
-    politico_nome = None
-    if noticia.get("politico_id"):
-        p = db.get_politico_by_id(int(noticia["politico_id"]))
-        politico_nome = p.get("name") if p else None
-
     pontos = calcular_pontos(noticia)
-    analise = gerar_resumo_tecnico(noticia, politico_nome=politico_nome)
 
-    return {
+    analise = await asyncio.to_thread(db.get_noticia_analise, noticia_id)
+    response.headers["X-Cache"] = "HIT" if analise else "MISS"
+    if not analise:
+        politico_nome = None
+        if noticia.get("politico_id"):
+            # noticias.politico_id guarda o uuid do político
+            politicos = await asyncio.to_thread(
+                db.get_politicos_by_ids, [noticia["politico_id"]], chave="uuid", fields="name"
+            )
+            p = politicos.get(noticia["politico_id"])
+            politico_nome = p.get("name") if p else None
+
+        gerada = await gerar_resumo_tecnico_async(noticia, politico_nome=politico_nome)
+        if gerada:
+            analise = {
+                "resumo_tecnico": gerada.resumo_tecnico,
+                "porque_pontuou": gerada.porque_pontuou,
+                "hipoteses": gerada.hipoteses,
+                "alertas": gerada.alertas,
+            }
+            await asyncio.to_thread(db.upsert_noticia_analise, noticia_id, analise)
+
+    resultado = {
         "noticia_id": noticia_id,
         "pontos": pontos,
-        "resumo_tecnico": analise.resumo_tecnico if analise else None,
-        "porque_pontuou": analise.porque_pontuou if analise else [],
-        "hipoteses": analise.hipoteses if analise else [],
-        "alertas": analise.alertas if analise else (["OpenAI não configurado ou falhou; exibindo apenas breakdown de pontos."] if not analise else []),
+        "resumo_tecnico": analise["resumo_tecnico"] if analise else None,
+        "porque_pontuou": analise["porque_pontuou"] if analise else [],
+        "hipoteses": analise["hipoteses"] if analise else [],
+        "alertas": analise["alertas"] if analise else ["OpenAI não configurado ou falhou; exibindo apenas breakdown de pontos."],
     }
+    # Falhas da OpenAI não entram no cache: a próxima requisição tenta de novo
+    if analise:
+        await response_cache.guardar(chave, resultado, ANALISE_CACHE_TTL)
+    return resultado
 
 
 # ==================== REDES SOCIAIS ====================
 
 @app.get("/politicos/{politico_id}/social", response_model=List[dict])
-async def get_social_posts(
+def get_social_posts(
     politico_id: int,
-    plataforma: Optional[str] = Query(default=None, regex="^(instagram|twitter|facebook|tiktok|youtube)$"),
+    plataforma: Optional[Literal["instagram", "twitter", "facebook", "tiktok", "youtube"]] = Query(default=None),
     limit: int = Query(default=10, ge=1, le=50)
 ):
     """
@@ -349,9 +440,9 @@ async def get_social_posts(
 
 
 @app.get("/politicos/{politico_id}/social_mentions", response_model=List[dict])
-async def get_social_mentions(
+def get_social_mentions(
     politico_id: int,
-    plataforma: Optional[str] = Query(default=None, regex="^(bluesky|twitter|google_trends|google_search)$"),
+    plataforma: Optional[Literal["bluesky", "twitter", "google_trends", "google_search"]] = Query(default=None),
     limit: int = Query(default=8, ge=1, le=8),
 ):
     """
@@ -369,7 +460,7 @@ async def get_social_mentions(
 
 
 @app.get("/politicos/{politico_id}/mention_topics", response_model=List[dict])
-async def get_mention_topics(politico_id: int):
+def get_mention_topics(politico_id: int):
     """
     Retorna agregações de tópicos (assuntos) de menções para um político.
     """
@@ -378,7 +469,7 @@ async def get_mention_topics(politico_id: int):
 
 
 @app.get("/politicos/{politico_id}/assuntos", response_model=dict)
-async def get_assuntos_politico(
+def get_assuntos_politico(
     politico_id: int,
     limite: int = Query(default=10, ge=1, le=50),
 ):
@@ -389,44 +480,21 @@ async def get_assuntos_politico(
     if not politico:
         raise HTTPException(status_code=404, detail="Político não encontrado")
 
-    topics = db.get_top_assuntos_politico(politico_id, limite=limite)
-
-    assuntos = []
-    for t in topics:
-        total = int(t.get("total_mencoes") or 0)
-        pos = int(t.get("mencoes_positivas") or 0)
-        neg = int(t.get("mencoes_negativas") or 0)
-        neu = int(t.get("mencoes_neutras") or 0)
-        eng = float(t.get("engagement_total") or 0)
-
-        sentimento_pred = "neutro"
-        if pos >= neg and pos >= neu:
-            sentimento_pred = "positivo"
-        elif neg >= pos and neg >= neu:
-            sentimento_pred = "negativo"
-
-        exemplo = None
-        try:
-            m = db.get_social_mentions_by_assunto(politico_id, str(t.get("assunto") or ""), limit=1)
-            if m and m[0].get("assunto_detalhe"):
-                exemplo = m[0].get("assunto_detalhe")
-            elif m and m[0].get("conteudo"):
-                exemplo = str(m[0].get("conteudo"))[:120]
-        except Exception:
-            exemplo = None
-
-        assuntos.append(
-            {
-                "assunto": t.get("assunto"),
-                "total_mencoes": total,
-                "mencoes_positivas": pos,
-                "mencoes_negativas": neg,
-                "mencoes_neutras": neu,
-                "sentimento_predominante": sentimento_pred,
-                "engagement_total": eng,
-                "exemplo": exemplo,
-            }
-        )
+    topics = db.get_top_assuntos_com_exemplo(politico_id, limite=limite)
+
+    assuntos = [
+        {
+            "assunto": t.get("assunto"),
+            "total_mencoes": int(t.get("total_mencoes") or 0),
+            "mencoes_positivas": int(t.get("mencoes_positivas") or 0),
+            "mencoes_negativas": int(t.get("mencoes_negativas") or 0),
+            "mencoes_neutras": int(t.get("mencoes_neutras") or 0),
+            "sentimento_predominante": t.get("sentimento_predominante"),
+            "engagement_total": float(t.get("engagement_total") or 0),
+            "exemplo": t.get("exemplo"),
+        }
+        for t in topics
+    ]
 
     return {
         "politico_id": politico_id,
@@ -437,7 +505,7 @@ async def get_assuntos_politico(
 
 
 @app.get("/politicos/{politico_id}/instagram", response_model=List[dict])
-async def get_instagram_posts(
+def get_instagram_posts(
     politico_id: int,
     limit: int = Query(default=10, ge=1, le=50)
 ):
@@ -448,11 +516,8 @@ async def get_instagram_posts(
     - **politico_id**: ID do político
     - **limit**: Número máximo de posts
     """
-    # Tenta nova tabela primeiro, fallback para antiga
-    posts = db.get_social_media_posts(politico_id, "instagram", limit)
-    if not posts:
-        posts = db.get_instagram_posts(politico_id, limit)
-    return posts
+    # Tabela nova primeiro, fallback para a antiga (numa única consulta)
+    return db.get_instagram_posts_unificado(politico_id, limit)
 
 
 @app.get("/politicos/{politico_id}/instagram/stats", response_model=dict)
@@ -462,21 +527,10 @@ async def get_instagram_stats(politico_id: int):
     
     - **politico_id**: ID do político
     """
-    posts = db.get_instagram_posts(politico_id, limit=100)
-    
-    if not posts:
-        return {
-            "politico_id": politico_id,
-            "total_posts": 0,
-            "total_likes": 0,
-            "total_comments": 0,
-            "media_engagement": 0,
-            "top_post": None
-        }
-    
-    total_likes = sum(p.get("likes", 0) for p in posts)
-    total_comments = sum(p.get("comments", 0) for p in posts)
-    total_posts = len(posts)
+    stats = await adb.get_instagram_stats(politico_id, limit=100)
+    total_posts = stats["total_posts"]
+    total_likes = stats["total_likes"]
+    total_comments = stats["total_comments"]
     
     return {
         "politico_id": politico_id,
@@ -484,17 +538,17 @@ async def get_instagram_stats(politico_id: int):
         "total_likes": total_likes,
         "total_comments": total_comments,
         "media_engagement": round((total_likes + total_comments) / total_posts, 2) if total_posts > 0 else 0,
-        "top_post": posts[0] if posts else None
+        "top_post": stats["top_post"]
     }
 
 
 # ==================== TRENDING ====================
 
 @app.get("/trending", response_model=List[dict])
-async def get_trending_topics(
-    category: Optional[str] = Query(
+@cached(ttl=60, namespace="trending")
+def get_trending_topics(
+    category: Optional[Literal["politica", "twitter", "google"]] = Query(
         default=None, 
-        regex="^(politica|twitter|google)$",
         description="Filtrar por categoria: 'politica', 'twitter', 'google', ou vazio para todos"
     )
 ):
@@ -514,7 +568,8 @@ async def get_trending_topics(
 # ==================== FONTES ====================
 
 @app.get("/fontes", response_model=List[dict])
-async def get_fontes():
+@cached(ttl=60, namespace="fontes")
+def get_fontes():
     """
     Retorna todas as fontes de notícias com seus pesos.
     """
@@ -535,15 +590,19 @@ async def update_fonte_peso(fonte_id: str, update: FonteUpdate):
     if not success:
         raise HTTPException(status_code=404, detail="Fonte não encontrada")
     
+    await response_cache.invalidar("fontes")
     return {"status": "ok", "mensagem": f"Peso atualizado para {update.peso_confiabilidade}"}
 
 
 # ==================== COLETA ====================
 
 @app.post("/coleta/executar", response_model=ColetaExecutarResponse)
-async def executar_coleta(
+def executar_coleta(
     background_tasks: BackgroundTasks,
-    tipo: str = Query(default="completa", regex="^(completa|noticias|instagram|trending|trending_twitter|trending_google|socials|social_mentions)$"),
+    tipo: Literal[
+        "completa", "noticias", "instagram", "trending", "trending_twitter",
+        "trending_google", "socials", "social_mentions"
+    ] = Query(default="completa"),
     dry_run: bool = Query(default=False)
 ):
     """
@@ -565,7 +624,7 @@ async def executar_coleta(
 
 
 @app.get("/coleta/logs", response_model=List[dict])
-async def get_coleta_logs(limit: int = Query(default=50, ge=1, le=200)):
+def get_coleta_logs(limit: int = Query(default=50, ge=1, le=200)):
     """
     Retorna os logs das coletas mais recentes.
     
@@ -587,7 +646,8 @@ async def get_jobs_agendados():
 # ==================== POLÍTICOS ====================
 
 @app.get("/politicos", response_model=List[dict])
-async def get_politicos():
+@cached(ttl=60, namespace="politicos")
+def get_politicos():
     """
     Retorna apenas políticos com usar_diretoriaja = true.
     """
@@ -596,7 +656,7 @@ async def get_politicos():
 
 
 @app.get("/politicos/{politico_id}", response_model=dict)
-async def get_politico(politico_id: int):
+def get_politico(politico_id: int):
     """
     Retorna dados de um político específico.
     
@@ -611,7 +671,7 @@ async def get_politico(politico_id: int):
 
 
 @app.get("/politicos/{politico_id}/concorrentes", response_model=List[dict])
-async def get_concorrentes(politico_id: int):
+def get_concorrentes(politico_id: int):
     """
     Retorna os concorrentes de um político.
     
@@ -621,40 +681,41 @@ async def get_concorrentes(politico_id: int):
     return concorrentes
 
 
-@app.get("/politicos/{politico_id}/resumo", response_model=dict)
-async def get_politico_resumo(politico_id: int):
-    """
-    Retorna um resumo completo de um político com todas as informações.
-    
-    - **politico_id**: ID do político
-    """
-    politico = db.get_politico_by_id(politico_id)
+async def _montar_resumo_politico(politico_id: int) -> Optional[dict]:
+    """Resumo do político a partir das consultas separadas (em paralelo)."""
+    politico = await adb.get_politico_by_id(politico_id)
     
     if not politico:
-        raise HTTPException(status_code=404, detail="Político não encontrado")
-    
-    # Coleta todos os dados
-    noticias = db.get_noticias_politico(politico_id, limit=5, min_score=30)
-    # Instagram: tabela unificada primeiro (compatível com endpoint /instagram)
-    instagram = db.get_social_media_posts(politico_id, "instagram", limit=5)
-    if not instagram:
-        instagram = db.get_instagram_posts(politico_id, limit=5)
-    concorrentes = db.get_concorrentes(politico_id)
-    
-    # Notícias da cidade do político (tipo='cidade' - busca genérica por nome da cidade)
-    noticias_cidade = []
-    if politico.get("cidade"):
-        noticias_cidade = db.get_noticias_cidade(politico["cidade"], limit=5)
+        return None
     
-    # Notícias a nível de ESTADO (tipo='estado' sem cidade - governo, assembleia)
-    noticias_estado = []
-    if politico.get("estado"):
-        noticias_estado = db.get_noticias_nivel_estado(politico["estado"], limit=3)
+    # Coleta todos os dados (consultas independentes, em paralelo)
+    async def _vazio() -> list:
+        return []
     
-    # Notícias a nível de CIDADE/CAPITAL (tipo='cidade' com cidade preenchida - prefeitura, câmara)
-    noticias_capital = []
-    if politico.get("estado"):
-        noticias_capital = db.get_noticias_capital(politico["estado"], limit=3)
+    cidade = politico.get("cidade")
+    estado = politico.get("estado")
+    (
+        noticias,
+        instagram,
+        concorrentes,
+        noticias_cidade,
+        noticias_estado,
+        noticias_capital,
+        contagens,
+    ) = await asyncio.gather(
+        asyncio.to_thread(db.get_noticias_politico, politico_id, limit=5, min_score=30),
+        # Instagram: tabela unificada primeiro (compatível com endpoint /instagram)
+        asyncio.to_thread(db.get_instagram_posts_unificado, politico_id, 5),
+        asyncio.to_thread(db.get_concorrentes, politico_id),
+        # Notícias da cidade do político (tipo='cidade' - busca genérica por nome da cidade)
+        asyncio.to_thread(db.get_noticias_cidade, cidade, limit=5) if cidade else _vazio(),
+        # Notícias a nível de ESTADO (tipo='estado' sem cidade - governo, assembleia)
+        asyncio.to_thread(db.get_noticias_nivel_estado, estado, limit=3) if estado else _vazio(),
+        # Notícias a nível de CIDADE/CAPITAL (tipo='cidade' com cidade preenchida - prefeitura, câmara)
+        asyncio.to_thread(db.get_noticias_capital, estado, limit=3) if estado else _vazio(),
+        # Totais: uma linha de politico_counters (ou as três contagens)
+        adb.get_contagens_politico(politico_id),
+    )
     
     return {
         "politico": politico,
@@ -664,15 +725,34 @@ async def get_politico_resumo(politico_id: int):
         "noticias_cidade": noticias_cidade,
         "noticias_estado": noticias_estado,
         "noticias_capital": noticias_capital,
-        "total_noticias": db.count_noticias_politico(politico_id),
-        "total_posts_instagram": db.count_instagram_posts(politico_id),
-        "total_mencoes": db.count_social_mentions_politico(politico_id),
+        "total_noticias": contagens["noticias"],
+        "total_posts_instagram": contagens["instagram_posts"],
+        "total_mencoes": contagens["social_mentions"],
     }
 
 
+@app.get("/politicos/{politico_id}/resumo", response_model=None)
+async def get_politico_resumo(politico_id: int):
+    """
+    Retorna um resumo completo de um político com todas as informações.
+    
+    - **politico_id**: ID do político
+    """
+    # Uma única chamada ao banco (RPC politico_resumo); sem ela, consultas separadas
+    try:
+        resumo = await adb.get_politico_resumo(politico_id)
+    except RpcIndisponivel:
+        resumo = await _montar_resumo_politico(politico_id)
+    
+    if not resumo:
+        raise HTTPException(status_code=404, detail="Político não encontrado")
+    
+    return resumo
+
+
 # ==================== CONSULTA PROCESSUAL ====================
 
-@app.get("/politicos/{politico_id}/processos", response_model=dict)
+@app.get("/politicos/{politico_id}/processos", response_model=None)
 async def get_processos_politico(
     politico_id: int,
     tribunal: Optional[str] = Query(default=None, description="Filtrar por tribunal (TJSP, TRF3, TSE)"),
@@ -690,30 +770,29 @@ async def get_processos_politico(
     - **limit**: Número máximo de resultados
     """
     # Converte ID inteiro para UUID
-    politico_uuid = db.get_politico_uuid(politico_id)
+    politico_uuid = await adb.get_politico_uuid(politico_id)
     if not politico_uuid:
         raise HTTPException(status_code=404, detail="Político não encontrado")
     
-    query = db.client.table("processos_judiciais").select("*").eq("politico_id", politico_uuid)
-    
-    if tribunal:
-        query = query.eq("tribunal", tribunal.upper())
-    if tipo:
-        query = query.eq("tipo", tipo)
-    if status:
-        query = query.eq("status", status)
-    
-    result = query.order("coletado_em", desc=True).limit(limit).execute()
-    processos = result.data if result.data else []
+    tribunal = tribunal.upper() if tribunal else None
+    # Linhas da página e contagens (GROUP BY no banco) em paralelo
+    processos, agregados = await asyncio.gather(
+        adb.get_processos(politico_uuid, tribunal=tribunal, tipo=tipo, status=status, limit=limit),
+        adb.get_processos_agregados(politico_uuid, tribunal=tribunal, tipo=tipo, status=status),
+    )
     
-    # Agrupa por tribunal e tipo
-    por_tribunal = {}
-    por_tipo = {}
-    for p in processos:
-        t = p.get("tribunal", "outros")
-        por_tribunal[t] = por_tribunal.get(t, 0) + 1
-        tp = p.get("tipo", "outros")
-        por_tipo[tp] = por_tipo.get(tp, 0) + 1
+    if agregados is not None:
+        por_tribunal = agregados.get("por_tribunal") or {}
+        por_tipo = agregados.get("por_tipo") or {}
+    else:
+        # Sem a RPC: agrupa as linhas retornadas
+        por_tribunal = {}
+        por_tipo = {}
+        for p in processos:
+            t = p.get("tribunal", "outros")
+            por_tribunal[t] = por_tribunal.get(t, 0) + 1
+            tp = p.get("tipo", "outros")
+            por_tipo[tp] = por_tipo.get(tp, 0) + 1
     
     return {
         "processos": processos,
@@ -723,10 +802,10 @@ async def get_processos_politico(
     }
 
 
-@app.get("/politicos/{politico_id}/doacoes", response_model=dict)
+@app.get("/politicos/{politico_id}/doacoes", response_model=None)
 async def get_doacoes_politico(
     politico_id: int,
-    tipo: str = Query(default="todas", regex="^(feitas|recebidas|todas)$"),
+    tipo: Literal["feitas", "recebidas", "todas"] = Query(default="todas"),
     eleicao: Optional[str] = Query(default=None, description="Filtrar por eleição (ex: 2024)"),
     limit: int = Query(default=100, ge=1, le=500)
 ):
@@ -739,34 +818,34 @@ async def get_doacoes_politico(
     - **limit**: Número máximo de resultados
     """
     # Busca CPF do político
-    politico = db.get_politico_by_id(politico_id)
+    politico = await adb.get_politico_by_id(politico_id)
     if not politico:
         raise HTTPException(status_code=404, detail="Político não encontrado")
     
     cpf = politico.get("cpf")
     doacoes = []
+    agregados = {}
+    
+    if cpf:
+        feitas = tipo in ["feitas", "todas"]
+        recebidas = tipo in ["recebidas", "todas"]
+        # Linhas e contagens (GROUP BY no banco) em paralelo
+        doacoes, agregados = await asyncio.gather(
+            adb.get_doacoes(cpf, feitas=feitas, recebidas=recebidas, eleicao=eleicao, limit=limit),
+            adb.get_doacoes_agregados(cpf, feitas=feitas, recebidas=recebidas, eleicao=eleicao),
+        )
     
-    if tipo in ["feitas", "todas"] and cpf:
-        query = db.client.table("doacoes_eleitorais").select("*").eq("cpf_doador", cpf)
-        if eleicao:
-            query = query.eq("eleicao", eleicao)
-        result = query.limit(limit).execute()
-        doacoes.extend(result.data if result.data else [])
-    
-    if tipo in ["recebidas", "todas"] and cpf:
-        query = db.client.table("doacoes_eleitorais").select("*").eq("cpf_candidato", cpf)
-        if eleicao:
-            query = query.eq("eleicao", eleicao)
-        result = query.limit(limit).execute()
-        doacoes.extend(result.data if result.data else [])
-    
-    # Agrupa por eleição
-    por_eleicao = {}
-    valor_total = 0
-    for d in doacoes:
-        e = d.get("eleicao", "outros")
-        por_eleicao[e] = por_eleicao.get(e, 0) + 1
-        valor_total += float(d.get("valor", 0) or 0)
+    if agregados is not None:
+        por_eleicao = agregados.get("por_eleicao") or {}
+        valor_total = float(agregados.get("valor_total") or 0)
+    else:
+        # Sem a RPC: agrupa as linhas retornadas
+        por_eleicao = {}
+        valor_total = 0
+        for d in doacoes:
+            e = d.get("eleicao", "outros")
+            por_eleicao[e] = por_eleicao.get(e, 0) + 1
+            valor_total += float(d.get("valor", 0) or 0)
     
     return {
         "doacoes": doacoes,
@@ -784,12 +863,11 @@ async def get_filiacoes_politico(politico_id: int):
     - **politico_id**: ID do político
     """
     # Converte ID inteiro para UUID
-    politico_uuid = db.get_politico_uuid(politico_id)
+    politico_uuid = await adb.get_politico_uuid(politico_id)
     if not politico_uuid:
         raise HTTPException(status_code=404, detail="Político não encontrado")
     
-    result = db.client.table("filiacoes_partidarias").select("*").eq("politico_id", politico_uuid).order("data_filiacao", desc=True).execute()
-    filiacoes = result.data if result.data else []
+    filiacoes = await adb.get_filiacoes(politico_uuid)
     
     # Lista de partidos
     partidos = list(set(f.get("sigla_partido") or f.get("partido") for f in filiacoes if f.get("sigla_partido") or f.get("partido")))
@@ -813,23 +891,21 @@ async def get_candidaturas_politico(
     - **eleicao**: Filtrar por eleição
     """
     # Converte ID inteiro para UUID
-    politico_uuid = db.get_politico_uuid(politico_id)
+    politico_uuid = await adb.get_politico_uuid(politico_id)
     if not politico_uuid:
         raise HTTPException(status_code=404, detail="Político não encontrado")
     
-    query = db.client.table("candidaturas").select("*").eq("politico_id", politico_uuid)
-    
-    if eleicao:
-        query = query.eq("eleicao", eleicao)
-    
-    result = query.order("eleicao", desc=True).execute()
-    candidaturas = result.data if result.data else []
+    candidaturas, por_eleicao = await asyncio.gather(
+        adb.get_candidaturas(politico_uuid, eleicao=eleicao),
+        adb.get_candidaturas_por_eleicao(politico_uuid, eleicao=eleicao),
+    )
     
-    # Agrupa por eleição
-    por_eleicao = {}
-    for c in candidaturas:
-        e = c.get("eleicao", "outros")
-        por_eleicao[e] = por_eleicao.get(e, 0) + 1
+    if por_eleicao is None:
+        # Sem a RPC: agrupa as linhas retornadas
+        por_eleicao = {}
+        for c in candidaturas:
+            e = c.get("eleicao", "outros")
+            por_eleicao[e] = por_eleicao.get(e, 0) + 1
     
     return {
         "candidaturas": candidaturas,
@@ -852,7 +928,7 @@ async def executar_consulta_processual(
     
     NOTA: Consultas em TJSP, TRF3 e DOE requerem CAPTCHA e retornam URLs para consulta manual.
     """
-    politico = db.get_politico_by_id(politico_id)
+    politico = await adb.get_politico_by_id(politico_id)
     if not politico:
         raise HTTPException(status_code=404, detail="Político não encontrado")
     
@@ -868,71 +944,72 @@ async def executar_consulta_processual(
         "dados_coletados": {}
     }
     
-    # TSE - Dados Abertos (automático)
+    # Todas as fontes rodam em paralelo (DivulgaCand no client async; as demais,
+    # síncronas, uma thread cada) e o resultado é montado na ordem fixa abaixo
+    uf = politico.get("estado", "SP")
+    tarefas = {}
     if "TSE" in fontes and cpf:
-        try:
-            dados_tse = tse_collector.consulta_completa_cpf(cpf, politico_id)
-            resultado["dados_coletados"]["TSE"] = dados_tse.get("resumo", {})
-            resultado["fontes_consultadas"].append("TSE")
-        except Exception as e:
-            logger.error(f"Erro na consulta TSE: {e}")
-            resultado["dados_coletados"]["TSE"] = {"erro": str(e)}
-    
-    # TSE DivulgaCandContas (automático)
+        # TSE - Dados Abertos (automático)
+        tarefas["TSE"] = asyncio.to_thread(tse_collector.consulta_completa_cpf, cpf, politico_id)
     if "TSE" in fontes and nome:
-        try:
-            dados_divulga = divulgacand_collector.consulta_completa_candidato(
-                nome=nome, uf=politico.get("estado", "SP"), politico_id=politico_id
-            )
-            if dados_divulga.get("candidato"):
-                resultado["dados_coletados"]["TSE_DIVULGACAND"] = {
-                    "candidato_encontrado": True,
-                    "total_receitas": dados_divulga.get("total_receitas", 0),
-                    "total_despesas": dados_divulga.get("total_despesas", 0)
-                }
-            resultado["fontes_consultadas"].append("TSE_DIVULGACAND")
-        except Exception as e:
-            logger.error(f"Erro na consulta DivulgaCandContas: {e}")
-    
-    # TJSP (semi-automatizado - requer CAPTCHA)
+        # TSE DivulgaCandContas (automático)
+        tarefas["TSE_DIVULGACAND"] = divulgacand_collector.consulta_completa_candidato_async(
+            nome=nome, uf=uf, politico_id=politico_id
+        )
     if "TJSP" in fontes and cpf:
-        dados_tjsp = tjsp_collector.buscar_todos_processos(cpf, politico_id)
-        resultado["urls_pendentes"].append({
-            "fonte": "TJSP",
-            "urls": [
-                dados_tjsp["primeiro_grau"]["url_consulta"],
-                dados_tjsp["segundo_grau"]["url_consulta"]
-            ],
-            "instrucoes": dados_tjsp["instrucoes_gerais"]
-        })
-        resultado["fontes_consultadas"].append("TJSP")
-    
-    # TRF-3 (semi-automatizado - requer CAPTCHA)
+        # TJSP (semi-automatizado - requer CAPTCHA)
+        tarefas["TJSP"] = asyncio.to_thread(tjsp_collector.buscar_todos_processos, cpf, politico_id)
     if "TRF3" in fontes and cpf:
-        dados_trf3 = trf3_collector.consultar_por_cpf_semi_auto(cpf, politico_id)
-        resultado["urls_pendentes"].append({
-            "fonte": "TRF3",
-            "url": dados_trf3["url_consulta"],
-            "instrucoes": dados_trf3["instrucoes"]
-        })
-        resultado["fontes_consultadas"].append("TRF3")
-    
-    # DOE-SP (semi-automatizado - busca por nome)
+        # TRF-3 (semi-automatizado - requer CAPTCHA)
+        tarefas["TRF3"] = asyncio.to_thread(trf3_collector.consultar_por_cpf_semi_auto, cpf, politico_id)
     if "DOE" in fontes and nome:
-        dados_doe = doe_sp_collector.buscar_por_nome_semi_auto(nome, politico_id)
-        resultado["urls_pendentes"].append({
-            "fonte": "DOE_SP",
-            "url": dados_doe["url_consulta"],
-            "instrucoes": dados_doe["instrucoes"]
-        })
-        resultado["fontes_consultadas"].append("DOE_SP")
+        # DOE-SP (semi-automatizado - busca por nome)
+        tarefas["DOE_SP"] = asyncio.to_thread(doe_sp_collector.buscar_por_nome_semi_auto, nome, politico_id)
+    
+    respostas = dict(zip(
+        tarefas.keys(),
+        await asyncio.gather(*tarefas.values(), return_exceptions=True)
+    ))
+    
+    for fonte, resposta in respostas.items():
+        if isinstance(resposta, Exception):
+            logger.error(f"Erro na consulta {fonte}: {resposta}")
+            if fonte == "TSE":
+                resultado["dados_coletados"]["TSE"] = {"erro": str(resposta)}
+            continue
+        
+        if fonte == "TSE":
+            resultado["dados_coletados"]["TSE"] = resposta.get("resumo", {})
+        elif fonte == "TSE_DIVULGACAND":
+            if resposta.get("candidato"):
+                resultado["dados_coletados"]["TSE_DIVULGACAND"] = {
+                    "candidato_encontrado": True,
+                    "total_receitas": resposta.get("total_receitas", 0),
+                    "total_despesas": resposta.get("total_despesas", 0)
+                }
+        elif fonte == "TJSP":
+            resultado["urls_pendentes"].append({
+                "fonte": "TJSP",
+                "urls": [
+                    resposta["primeiro_grau"]["url_consulta"],
+                    resposta["segundo_grau"]["url_consulta"]
+                ],
+                "instrucoes": resposta["instrucoes_gerais"]
+            })
+        else:
+            resultado["urls_pendentes"].append({
+                "fonte": fonte,
+                "url": resposta["url_consulta"],
+                "instrucoes": resposta["instrucoes"]
+            })
+        resultado["fontes_consultadas"].append(fonte)
     
     return resultado
 
 
 @app.post("/processos/importar-html")
-async def importar_html_resultado(
-    fonte: str = Query(..., regex="^(TJSP|TRF3|DOE)$"),
+def importar_html_resultado(
+    fonte: Literal["TJSP", "TRF3", "DOE"] = Query(...),
     html: str = Query(..., description="HTML da página de resultado"),
     cpf: Optional[str] = Query(default=None),
     nome: Optional[str] = Query(default=None),
@@ -966,8 +1043,8 @@ async def importar_html_resultado(
     }
 
 
-@app.get("/politicos/{politico_id}/resumo-processual", response_model=dict)
-async def get_resumo_processual(politico_id: int):
+@app.get("/politicos/{politico_id}/resumo-processual", response_model=None)
+def get_resumo_processual(politico_id: int):
     """
     Retorna resumo processual completo de um político.
     
@@ -1039,7 +1116,7 @@ async def get_resumo_processual(politico_id: int):
 
 
 @app.get("/consulta-processual/logs", response_model=List[dict])
-async def get_logs_consulta_processual(
+def get_logs_consulta_processual(
     politico_id: Optional[int] = Query(default=None),
     fonte: Optional[str] = Query(default=None),
     limit: int = Query(default=50, ge=1, le=200)
@@ -1069,7 +1146,7 @@ async def get_logs_consulta_processual(
 
 
 @app.put("/politicos/{politico_id}/cpf")
-async def atualizar_cpf_politico(
+def atualizar_cpf_politico(
     politico_id: int,
     cpf: str = Query(..., min_length=11, max_length=14, description="CPF do político")
 ):
@@ -1095,7 +1172,7 @@ async def atualizar_cpf_politico(
 # ==================== PROXY DE IMAGENS ====================
 
 @app.get("/proxy/image")
-async def proxy_image(url: str = Query(..., description="URL da imagem a ser carregada")):
+async def proxy_image(request: Request, url: str = Query(..., description="URL da imagem a ser carregada")):
     """
     Proxy para carregar imagens de CDNs externos (Instagram, etc.)
     Contorna proteção de hotlinking retornando a imagem diretamente.
@@ -1116,31 +1193,32 @@ async def proxy_image(url: str = Query(..., description="URL da imagem a ser car
         raise HTTPException(status_code=403, detail="Domínio não permitido")
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                url,
-                headers={
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                    "Accept": "image/webp,image/apng,image/*,*/*;q=0.8",
-                    "Accept-Language": "en-US,en;q=0.9",
-                    "Referer": "https://www.instagram.com/",
-                },
-                follow_redirects=True
-            )
-            
-            if response.status_code != 200:
-                raise HTTPException(status_code=response.status_code, detail="Falha ao carregar imagem")
-            
-            content_type = response.headers.get("content-type", "image/jpeg")
-            
-            return StreamingResponse(
-                BytesIO(response.content),
-                media_type=content_type,
-                headers={
-                    "Cache-Control": "public, max-age=86400",
-                    "Access-Control-Allow-Origin": "*"
-                }
-            )
+        client: httpx.AsyncClient = request.app.state.http
+        response = await client.get(
+            url,
+            headers={
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+                "Accept": "image/webp,image/apng,image/*,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.9",
+                "Referer": "https://www.instagram.com/",
+            },
+            follow_redirects=True,
+            timeout=30.0
+        )
+        
+        if response.status_code != 200:
+            raise HTTPException(status_code=response.status_code, detail="Falha ao carregar imagem")
+        
+        content_type = response.headers.get("content-type", "image/jpeg")
+        
+        return StreamingResponse(
+            BytesIO(response.content),
+            media_type=content_type,
+            headers={
+                "Cache-Control": "public, max-age=86400",
+                "Access-Control-Allow-Origin": "*"
+            }
+        )
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Timeout ao carregar imagem")
     except Exception as e:
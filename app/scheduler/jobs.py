@@ -10,6 +10,7 @@ from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED
 
 from app.config import settings
 from app.database import db
+from app.utils import response_cache
 from app.collectors.news_aggregator import news_aggregator
 from app.collectors.instagram import instagram_collector
 from app.collectors.socials import socials_collector
@@ -28,6 +29,20 @@ logger = logging.getLogger(__name__)
 # Scheduler global
 scheduler = AsyncIOScheduler(timezone=settings.coleta_timezone)
 
+# Limita as coletas manuais simultâneas (disparadas pela API): as excedentes
+# esperam na fila em vez de disputar o event loop com as requisições
+coleta_semaforo = asyncio.Semaphore(settings.max_coletas_simultaneas)
+
+
+async def _atualizar_contadores() -> None:
+    """
+    Recalcula todos os contadores por político (politico_counters). Os
+    triggers já os mantêm a cada escrita; isto é a reconciliação diária,
+    rodada uma vez, ao fim da limpeza.
+    """
+    atualizados = await asyncio.to_thread(db.refresh_politico_counters)
+    logger.info(f"Contadores atualizados para {atualizados} políticos")
+
 
 def job_listener(event):
     """Listener para eventos do scheduler"""
@@ -59,6 +74,7 @@ async def job_coleta_noticias():
         mensagem = f"Coletadas: {total} notícias. Erros: {stats.get('erros', 0)}"
         
         db.log_coleta_fim(log_id, status, mensagem, total)
+        await response_cache.invalidar("noticias")
         logger.info(f"Coleta de notícias finalizada: {mensagem}")
         
     except Exception as e:
@@ -115,6 +131,7 @@ async def job_coleta_trending():
         mensagem = f"Atualizados: {count_politica} política, {count_twitter} Twitter, {count_google} Google"
         
         db.log_coleta_fim(log_id, "sucesso", mensagem, total)
+        await response_cache.invalidar("trending")
         logger.info(f"Coleta trending finalizada: {mensagem}")
         
     except Exception as e:
@@ -133,6 +150,7 @@ async def job_coleta_trending_twitter():
         count = await twitter_trending_collector.executar_coleta()
         
         db.log_coleta_fim(log_id, "sucesso", f"Atualizados {count} trending Twitter", count)
+        await response_cache.invalidar("trending")
         logger.info(f"Coleta trending Twitter finalizada: {count} topics")
         
     except Exception as e:
@@ -151,6 +169,7 @@ async def job_coleta_trending_google():
         count = await google_trending_collector.executar_coleta()
         
         db.log_coleta_fim(log_id, "sucesso", f"Atualizados {count} trending Google", count)
+        await response_cache.invalidar("trending")
         logger.info(f"Coleta trending Google finalizada: {count} topics")
         
     except Exception as e:
@@ -180,6 +199,7 @@ async def job_coleta_socials(dry_run: bool = False):
             status = "sucesso" if erros == 0 else "parcial"
             mensagem = f"Aplicadas {total_aplicadas} atualizações. Erros: {erros}"
             db.log_coleta_fim(log_id, status, mensagem, total_aplicadas)
+            await response_cache.invalidar("politicos")
 
         logger.info(f"Preenchimento de redes sociais finalizado: {mensagem}")
 
@@ -241,6 +261,8 @@ async def job_limpeza():
         )
         
         db.log_coleta_fim(log_id, "sucesso", mensagem, total)
+        await response_cache.invalidar("noticias")
+        await _atualizar_contadores()
         logger.info(f"Limpeza finalizada: {mensagem}")
         
     except Exception as e:
@@ -341,6 +363,13 @@ async def executar_coleta_manual(tipo: str = "completa", dry_run: bool = False)
     Returns:
         Dict com resultado da execução
     """
+    if coleta_semaforo.locked():
+        logger.info(f"Coleta manual '{tipo}' aguardando: limite de coletas simultâneas atingido")
+    async with coleta_semaforo:
+        return await _executar_coleta_manual(tipo, dry_run)
+
+
+async def _executar_coleta_manual(tipo: str, dry_run: bool) -> dict:
     resultado = {"status": "iniciado", "tipo": tipo, "inicio": datetime.now().isoformat()}
     
     try:
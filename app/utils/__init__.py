@@ -3,14 +3,18 @@ Módulo de utilitários da aplicação.
 """
 from app.utils.storage import (
     upload_image_to_storage,
+    upload_image_to_storage_async,
     upload_image_from_url,
     upload_image_from_url_async,
+    upload_images_from_urls_async,
     get_storage_url,
 )
 
 __all__ = [
     "upload_image_to_storage",
+    "upload_image_to_storage_async",
     "upload_image_from_url",
     "upload_image_from_url_async",
+    "upload_images_from_urls_async",
     "get_storage_url",
 ]
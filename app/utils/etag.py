@@ -0,0 +1,103 @@
+"""
+Requisições condicionais (ETag / If-None-Match) para endpoints de listagem.
+
+Os dashboards consultam periodicamente endpoints cujo conteúdo muda pouco
+(fontes, trending, políticos, jobs). O middleware calcula um ETag do corpo da
+resposta e, se o cliente já tem essa versão, responde 304 sem corpo.
+
+O ETag é fraco (W/"..."): é calculado sobre o corpo sem compressão e o
+GZipMiddleware (mais externo) pode comprimir depois, então as representações
+gzip e identity compartilham o validador — o que um ETag forte não permite
+(RFC 9110, 8.8.3).
+"""
+import hashlib
+from typing import Iterable, List, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+def calcular_etag(corpo: bytes) -> str:
+    """ETag fraco do corpo (blake2b de 128 bits, bem mais rápido que sha256)."""
+    return 'W/"' + hashlib.blake2b(corpo, digest_size=16).hexdigest() + '"'
+
+
+def _etag_confere(if_none_match: str, etag: str) -> bool:
+    """Compara (comparação fraca) o header If-None-Match com o ETag."""
+    if etag.startswith("W/"):
+        etag = etag[2:]
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*":
+            return True
+        if candidato.startswith("W/"):
+            candidato = candidato[2:]
+        if candidato == etag:
+            return True
+    return False
+
+
+class ETagMiddleware:
+    """
+    Adiciona ETag e Cache-Control às respostas 200 de GET nos caminhos
+    informados e responde 304 Not Modified quando o If-None-Match confere.
+    """
+
+    def __init__(self, app: ASGIApp, paths: Iterable[str], max_age: int = 30):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.cache_control = f"public, max-age={max_age}".encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = ""
+        for nome, valor in scope["headers"]:
+            if nome == b"if-none-match":
+                if_none_match = valor.decode("latin-1")
+                break
+
+        inicio: Message = {}
+        partes: List[bytes] = []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal inicio
+            if message["type"] == "http.response.start":
+                # Segura o início até ter o corpo completo (para calcular o ETag)
+                inicio = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            partes.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            corpo = b"".join(partes)
+            if inicio.get("status") != 200:
+                await send(inicio)
+                await send({"type": "http.response.body", "body": corpo})
+                return
+
+            etag = calcular_etag(corpo)
+            headers: List[Tuple[bytes, bytes]] = [
+                (nome, valor) for nome, valor in inicio.get("headers", [])
+                if nome not in (b"etag", b"cache-control")
+            ]
+            headers += [(b"etag", etag.encode()), (b"cache-control", self.cache_control)]
+
+            if if_none_match and _etag_confere(if_none_match, etag):
+                headers = [
+                    (nome, valor) for nome, valor in headers
+                    if nome not in (b"content-length", b"content-type")
+                ]
+                await send({"type": "http.response.start", "status": 304, "headers": headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send({**inicio, "headers": headers})
+            await send({"type": "http.response.body", "body": corpo})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,148 @@
+"""
+Cache de respostas HTTP em Redis para endpoints de leitura "quentes".
+
+Os dados desses endpoints (trending, fontes, listas de notícias, políticos)
+só mudam quando o scheduler roda; com Redis configurado (REDIS_URL), a
+resposta serializada fica em cache por alguns segundos e é compartilhada
+entre workers. Sem Redis (ou com o pacote ausente), o decorator é
+transparente e os endpoints consultam o Supabase como antes.
+"""
+import asyncio
+import functools
+import inspect
+import logging
+from typing import Any, Callable, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+
+from app.config import settings
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+PREFIXO = "resp"
+
+# Client global; criado em iniciar() (lifespan) quando REDIS_URL está definido
+_redis: Optional["aioredis.Redis"] = None
+
+
+async def iniciar() -> None:
+    """Abre o client Redis (chamado no startup da aplicação)."""
+    global _redis
+    if not settings.redis_url:
+        return
+    if not REDIS_AVAILABLE:
+        logger.warning("REDIS_URL definido, mas o pacote redis não está instalado; cache de respostas desativado")
+        return
+    try:
+        client = aioredis.from_url(settings.redis_url)
+        await client.ping()
+        _redis = client
+        logger.info("Cache de respostas em Redis ativo")
+    except Exception as e:
+        logger.warning(f"Redis indisponível, cache de respostas desativado: {e}")
+
+
+async def fechar() -> None:
+    """Fecha o client Redis (chamado no shutdown da aplicação)."""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+def _chave(namespace: str, nome: str, kwargs: dict) -> str:
+    # Parâmetros de path e query chegam como kwargs do handler
+    params = orjson.dumps(kwargs, option=orjson.OPT_SORT_KEYS, default=str).decode()
+    return f"{PREFIXO}:{namespace}:{nome}:{params}"
+
+
+def cached(ttl: int, namespace: str) -> Callable:
+    """
+    Decorator para endpoints GET: guarda o JSON da resposta por `ttl` segundos.
+
+    A chave combina o handler e seus parâmetros (path + query). `namespace`
+    agrupa as chaves para invalidação em `invalidar` (ex.: "noticias").
+    Deve ficar abaixo do `@app.get(...)`. Handlers síncronos (`def`) rodam no
+    threadpool, como o FastAPI faria sem o decorator.
+    """
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            chamar = func
+        else:
+            async def chamar(**kwargs: Any) -> Any:
+                return await run_in_threadpool(func, **kwargs)
+
+        async def wrapper(**kwargs: Any) -> Any:
+            if _redis is None:
+                return await chamar(**kwargs)
+
+            chave = _chave(namespace, func.__name__, kwargs)
+            try:
+                conteudo = await _redis.get(chave)
+                if conteudo is not None:
+                    return Response(content=conteudo, media_type="application/json")
+            except Exception as e:
+                logger.warning(f"Erro ao ler cache de resposta {chave}: {e}")
+
+            resultado = await chamar(**kwargs)
+            conteudo = orjson.dumps(jsonable_encoder(resultado))
+            try:
+                await _redis.setex(chave, ttl, conteudo)
+            except Exception as e:
+                logger.warning(f"Erro ao gravar cache de resposta {chave}: {e}")
+            return Response(content=conteudo, media_type="application/json")
+
+        # Metadados e assinatura do handler (parâmetros de path/query para o
+        # FastAPI), sem __wrapped__: o FastAPI poderia seguir até o handler
+        # síncrono e chamar o wrapper async fora do event loop
+        functools.update_wrapper(wrapper, func, updated=())
+        del wrapper.__wrapped__
+        wrapper.__signature__ = inspect.signature(func)
+        return wrapper
+
+    return decorator
+
+
+async def obter(chave: str) -> Optional[Any]:
+    """Valor JSON guardado em `chave` (None sem Redis, em miss ou erro)."""
+    if _redis is None:
+        return None
+    try:
+        conteudo = await _redis.get(chave)
+        return orjson.loads(conteudo) if conteudo is not None else None
+    except Exception as e:
+        logger.warning(f"Erro ao ler cache {chave}: {e}")
+        return None
+
+
+async def guardar(chave: str, valor: Any, ttl: int) -> None:
+    """Guarda `valor` (serializável em JSON) em `chave` por `ttl` segundos."""
+    if _redis is None:
+        return
+    try:
+        await _redis.setex(chave, ttl, orjson.dumps(jsonable_encoder(valor)))
+    except Exception as e:
+        logger.warning(f"Erro ao gravar cache {chave}: {e}")
+
+
+async def invalidar(*namespaces: str) -> None:
+    """Remove as respostas em cache dos namespaces (ex.: ao fim de uma coleta)."""
+    if _redis is None:
+        return
+    for namespace in namespaces:
+        try:
+            chaves = [chave async for chave in _redis.scan_iter(match=f"{PREFIXO}:{namespace}:*", count=500)]
+            if chaves:
+                await _redis.delete(*chaves)
+        except Exception as e:
+            logger.warning(f"Erro ao invalidar cache de respostas '{namespace}': {e}")
@@ -25,16 +25,21 @@ Uso:
 """
 
 import asyncio
+import functools
 import hashlib
+import importlib.util
 import logging
-import tempfile
+import socket
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Sequence, Tuple, Union
 from urllib.parse import urlparse
 
 import httpx
 
-from app.database import get_supabase
+from app.database import adb, get_supabase
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +55,117 @@ DEFAULT_HEADERS = {
     "Accept": "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8",
 }
 
+# Extensão da URL -> content-type (fallback quando o servidor não informa)
+_EXT_TO_CONTENT_TYPE = {
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+    ".svg": "image/svg+xml",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+}
+
+# Content-type -> extensão do arquivo no bucket (default: jpg)
+_CONTENT_TYPE_TO_EXT = {
+    "image/png": "png",
+    "image/x-png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+    "image/svg+xml": "svg",
+}
+
+# HTTP/2 exige o pacote h2 (httpx[http2], em requirements.txt); sem ele
+# (ex.: scripts em ambientes enxutos) os clients ficam em HTTP/1.1
+HTTP2_DISPONIVEL = importlib.util.find_spec("h2") is not None
+
+# Pool de conexões dos clients de download (reaproveita TCP/TLS entre imagens)
+DOWNLOAD_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=30, keepalive_expiry=90)
+
+# Novas tentativas de conexão (falha de connect/DNS) feitas pelo transport
+DOWNLOAD_CONNECT_RETRIES = 2
+
+# TCP keepalive nas conexões do pool (TCP_KEEPIDLE não existe em todas as plataformas)
+DOWNLOAD_SOCKET_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+if hasattr(socket, "TCP_KEEPIDLE"):
+    DOWNLOAD_SOCKET_OPTIONS.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60))
+
+
+def _transport_kwargs() -> dict:
+    # Com transport explícito, http2/limits precisam ir nele (o client os ignora)
+    return {
+        "http2": HTTP2_DISPONIVEL,
+        "limits": DOWNLOAD_LIMITS,
+        "retries": DOWNLOAD_CONNECT_RETRIES,
+        "socket_options": DOWNLOAD_SOCKET_OPTIONS,
+    }
+
+# Download em streaming: tamanho dos blocos e limite por imagem
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+MAX_IMAGE_BYTES = 15 * 1024 * 1024
+
+# URLs já processadas neste processo: URL no storage (sucesso) ou None (falha),
+# por (bucket, folder, filename, url) — o mesmo URL pedido com outro destino
+# (ex.: noticia_{id}, post_{shortcode}) é um novo upload.
+# Sucessos ficam até saírem do LRU; falhas expiram (podem ser transitórias).
+URL_CACHE_MAXSIZE = 10_000
+URL_FALHA_TTL = 600
+_URL_CACHE: "OrderedDict[Tuple[str, str, Optional[str], str], Tuple[Optional[str], float]]" = OrderedDict()
+_URL_CACHE_LOCK = threading.Lock()
+_NAO_CACHEADO = object()
+
+# Uploads simultâneos por lote em upload_images_from_urls_async
+UPLOAD_LOTE_CONCORRENCIA = 10
+
+# Clients compartilhados, criados no primeiro uso
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.Client:
+    """Client síncrono compartilhado para downloads (thread-safe)."""
+    global _client
+    if _client is None or _client.is_closed:
+        with _client_lock:
+            if _client is None or _client.is_closed:
+                _client = httpx.Client(
+                    timeout=httpx.Timeout(DOWNLOAD_TIMEOUT),
+                    follow_redirects=True,
+                    headers=DEFAULT_HEADERS,
+                    transport=httpx.HTTPTransport(**_transport_kwargs()),
+                )
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Client assíncrono compartilhado para downloads."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(DOWNLOAD_TIMEOUT),
+            follow_redirects=True,
+            headers=DEFAULT_HEADERS,
+            transport=httpx.AsyncHTTPTransport(**_transport_kwargs()),
+        )
+    return _async_client
+
+
+def close_client() -> None:
+    """Fecha o client síncrono compartilhado."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+async def close_async_client() -> None:
+    """Fecha o client assíncrono compartilhado (chamado no shutdown da aplicação)."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
 
 def _guess_content_type(url: str, response: httpx.Response) -> str:
     """
@@ -61,41 +177,30 @@ def _guess_content_type(url: str, response: httpx.Response) -> str:
     if ct.startswith("image/"):
         return ct
     
-    # Fallback baseado na URL
-    url_lower = url.lower()
-    if ".png" in url_lower:
-        return "image/png"
-    if ".webp" in url_lower:
-        return "image/webp"
-    if ".gif" in url_lower:
-        return "image/gif"
-    if ".svg" in url_lower:
-        return "image/svg+xml"
-    
-    return "image/jpeg"  # Default
+    # Fallback baseado na extensão do path da URL
+    ext = Path(urlparse(url).path).suffix.lower()
+    return _EXT_TO_CONTENT_TYPE.get(ext, "image/jpeg")
 
 
 def _ext_from_content_type(content_type: str) -> str:
     """Retorna extensão de arquivo baseada no content-type."""
-    ct = content_type.lower()
-    if "png" in ct:
-        return "png"
-    if "webp" in ct:
-        return "webp"
-    if "gif" in ct:
-        return "gif"
-    if "svg" in ct:
-        return "svg"
-    return "jpg"
+    ct = content_type.split(";")[0].strip().lower()
+    return _CONTENT_TYPE_TO_EXT.get(ct, "jpg")
+
+
+@functools.lru_cache(maxsize=8192)
+def _url_hash(url: str) -> str:
+    """Hash BLAKE2b (48 bits, 12 caracteres hex) da URL, memoizado por URL."""
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=6).hexdigest()
 
 
 def _generate_filename(original_url: str, prefix: str, content_type: str) -> str:
     """
     Gera um nome de arquivo único baseado na URL original.
     
-    Usa hash MD5 da URL para evitar duplicatas e garantir unicidade.
+    Usa o hash da URL (_url_hash) para evitar duplicatas e garantir unicidade.
     """
-    url_hash = hashlib.md5(original_url.encode()).hexdigest()[:12]
+    url_hash = _url_hash(original_url)
     ext = _ext_from_content_type(content_type)
     return f"{prefix}_{url_hash}.{ext}"
 
@@ -107,6 +212,40 @@ def _is_already_in_storage(url: str, bucket: str = DEFAULT_BUCKET) -> bool:
     return f"/storage/v1/object/public/{bucket}/" in url
 
 
+@functools.lru_cache(maxsize=None)
+def _storage_bucket(bucket: str):
+    """Handle do bucket no Storage, criado uma vez por bucket (o client é o singleton de app.database)."""
+    return get_supabase().storage.from_(bucket)
+
+
+def _url_cache_get(
+    image_url: str, bucket: str, folder: str, filename: Optional[str]
+) -> Union[str, None, object]:
+    """URL no storage, None (falha recente) ou _NAO_CACHEADO."""
+    chave = (bucket, folder, filename, image_url)
+    with _URL_CACHE_LOCK:
+        item = _URL_CACHE.get(chave)
+        if item is None:
+            return _NAO_CACHEADO
+        storage_url, expira_em = item
+        if storage_url is None and expira_em <= time.monotonic():
+            del _URL_CACHE[chave]
+            return _NAO_CACHEADO
+        _URL_CACHE.move_to_end(chave)
+        return storage_url
+
+
+def _url_cache_set(
+    image_url: str, bucket: str, folder: str, filename: Optional[str], storage_url: Optional[str]
+) -> None:
+    chave = (bucket, folder, filename, image_url)
+    with _URL_CACHE_LOCK:
+        _URL_CACHE[chave] = (storage_url, time.monotonic() + URL_FALHA_TTL)
+        _URL_CACHE.move_to_end(chave)
+        while len(_URL_CACHE) > URL_CACHE_MAXSIZE:
+            _URL_CACHE.popitem(last=False)
+
+
 def get_storage_url(bucket: str, path: str) -> str:
     """
     Retorna a URL pública completa do Supabase Storage.
@@ -118,8 +257,7 @@ def get_storage_url(bucket: str, path: str) -> str:
     Returns:
         URL pública do arquivo
     """
-    supabase = get_supabase()
-    return supabase.storage.from_(bucket).get_public_url(path)
+    return _storage_bucket(bucket).get_public_url(path)
 
 
 def upload_image_to_storage(
@@ -145,22 +283,52 @@ def upload_image_to_storage(
         return None
     
     try:
-        supabase = get_supabase()
+        storage_bucket = _storage_bucket(bucket)
         
-        # Usa arquivo temporário para o upload (API do supabase-py espera caminho)
-        with tempfile.NamedTemporaryFile(delete=True, suffix=f".{_ext_from_content_type(content_type)}") as tmp:
-            tmp.write(image_data)
-            tmp.flush()
-            
-            # Upload com upsert (sobrescreve se existir)
-            supabase.storage.from_(bucket).upload(
-                path,
-                tmp.name,
-                {"content-type": content_type, "upsert": "true"},
-            )
+        # Upload direto dos bytes em memória, com upsert (sobrescreve se existir)
+        storage_bucket.upload(
+            path=path,
+            file=image_data,
+            file_options={"content-type": content_type, "upsert": "true"},
+        )
         
         # Retorna URL pública
-        public_url = supabase.storage.from_(bucket).get_public_url(path)
+        public_url = storage_bucket.get_public_url(path)
+        logger.debug(f"Upload bem-sucedido: {path}")
+        return public_url
+        
+    except Exception as e:
+        logger.error(f"Erro ao fazer upload para storage: {e}")
+        return None
+
+
+async def upload_image_to_storage_async(
+    image_data: bytes,
+    path: str,
+    content_type: str = "image/jpeg",
+    bucket: str = DEFAULT_BUCKET,
+) -> Optional[str]:
+    """
+    Versão assíncrona de upload_image_to_storage, com o client async do
+    supabase-py (sem ocupar uma thread por upload).
+    
+    Returns:
+        URL pública da imagem ou None em caso de erro
+    """
+    if not image_data:
+        logger.warning("upload_image_to_storage_async: dados vazios")
+        return None
+    
+    try:
+        client = await adb.get_client()
+        await client.storage.from_(bucket).upload(
+            path=path,
+            file=image_data,
+            file_options={"content-type": content_type, "upsert": "true"},
+        )
+        
+        # A URL pública só depende do bucket/path (sem I/O)
+        public_url = _storage_bucket(bucket).get_public_url(path)
         logger.debug(f"Upload bem-sucedido: {path}")
         return public_url
         
@@ -184,16 +352,11 @@ def download_image(url: str, timeout: float = DOWNLOAD_TIMEOUT) -> Tuple[Optiona
         return None, ""
     
     try:
-        with httpx.Client(
-            timeout=timeout,
-            follow_redirects=True,
-            headers=DEFAULT_HEADERS,
-        ) as client:
-            response = client.get(url)
-            response.raise_for_status()
-            
-            content_type = _guess_content_type(url, response)
-            return response.content, content_type
+        response = get_client().get(url, timeout=timeout)
+        response.raise_for_status()
+        
+        content_type = _guess_content_type(url, response)
+        return response.content, content_type
             
     except httpx.TimeoutException:
         logger.warning(f"Timeout ao baixar imagem: {url}")
@@ -220,16 +383,25 @@ async def download_image_async(url: str, timeout: float = DOWNLOAD_TIMEOUT) -> T
         return None, ""
     
     try:
-        async with httpx.AsyncClient(
-            timeout=timeout,
-            follow_redirects=True,
-            headers=DEFAULT_HEADERS,
-        ) as client:
-            response = await client.get(url)
+        async with get_async_client().stream("GET", url, timeout=timeout) as response:
             response.raise_for_status()
             
+            # content-length pode ser do corpo comprimido; serve só para recusar cedo
+            content_length = int(response.headers.get("content-length") or 0)
+            if content_length > MAX_IMAGE_BYTES:
+                logger.warning(f"Imagem grande demais ({content_length} bytes): {url}")
+                return None, ""
+            
+            # Lê em blocos, abortando se passar do limite (sem carregar o corpo inteiro antes)
+            buf = bytearray()
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                buf += chunk
+                if len(buf) > MAX_IMAGE_BYTES:
+                    logger.warning(f"Imagem grande demais (> {MAX_IMAGE_BYTES} bytes): {url}")
+                    return None, ""
+            
             content_type = _guess_content_type(url, response)
-            return response.content, content_type
+            return bytes(buf), content_type
             
     except httpx.TimeoutException:
         logger.warning(f"Timeout ao baixar imagem: {url}")
@@ -282,12 +454,20 @@ def upload_image_from_url(
         logger.debug(f"Imagem já está no storage: {image_url}")
         return image_url
     
+    # Já processada neste processo (sucesso ou falha recente)
+    cached = _url_cache_get(image_url, bucket, folder, filename)
+    if cached is not _NAO_CACHEADO:
+        if cached:
+            return cached
+        return image_url if fallback_to_original else None
+    
     try:
         # Download da imagem
         image_data, content_type = download_image(image_url)
         
         if not image_data:
             logger.warning(f"Não foi possível baixar imagem: {image_url}")
+            _url_cache_set(image_url, bucket, folder, filename, None)
             return image_url if fallback_to_original else None
         
         # Gera nome do arquivo
@@ -308,6 +488,7 @@ def upload_image_from_url(
             bucket=bucket,
         )
         
+        _url_cache_set(image_url, bucket, folder, filename, storage_url)
         if storage_url:
             logger.info(f"Imagem migrada para storage: {path}")
             return storage_url
@@ -316,6 +497,7 @@ def upload_image_from_url(
         
     except Exception as e:
         logger.error(f"Erro ao processar imagem {image_url}: {e}")
+        _url_cache_set(image_url, bucket, folder, filename, None)
         return image_url if fallback_to_original else None
 
 
@@ -330,8 +512,7 @@ async def upload_image_from_url_async(
     Versão assíncrona de upload_image_from_url.
     
     Baixa uma imagem de URL externa e faz upload para o Supabase Storage.
-    O download é feito de forma assíncrona, mas o upload ainda é síncrono
-    (limitação da biblioteca supabase-py).
+    Download e upload são assíncronos (httpx + client async do supabase-py).
     
     Args:
         image_url: URL da imagem a ser baixada
@@ -352,12 +533,20 @@ async def upload_image_from_url_async(
         logger.debug(f"Imagem já está no storage: {image_url}")
         return image_url
     
+    # Já processada neste processo (sucesso ou falha recente)
+    cached = _url_cache_get(image_url, bucket, folder, filename)
+    if cached is not _NAO_CACHEADO:
+        if cached:
+            return cached
+        return image_url if fallback_to_original else None
+    
     try:
         # Download assíncrono da imagem
         image_data, content_type = await download_image_async(image_url)
         
         if not image_data:
             logger.warning(f"Não foi possível baixar imagem: {image_url}")
+            _url_cache_set(image_url, bucket, folder, filename, None)
             return image_url if fallback_to_original else None
         
         # Gera nome do arquivo
@@ -370,18 +559,15 @@ async def upload_image_from_url_async(
         # Caminho completo no bucket
         path = f"{folder}/{safe_filename}"
         
-        # Upload (síncrono, executado em thread)
-        loop = asyncio.get_event_loop()
-        storage_url = await loop.run_in_executor(
-            None,
-            lambda: upload_image_to_storage(
-                image_data=image_data,
-                path=path,
-                content_type=content_type,
-                bucket=bucket,
-            )
+        # Upload assíncrono
+        storage_url = await upload_image_to_storage_async(
+            image_data=image_data,
+            path=path,
+            content_type=content_type,
+            bucket=bucket,
         )
         
+        _url_cache_set(image_url, bucket, folder, filename, storage_url)
         if storage_url:
             logger.info(f"Imagem migrada para storage: {path}")
             return storage_url
@@ -390,9 +576,55 @@ async def upload_image_from_url_async(
         
     except Exception as e:
         logger.error(f"Erro ao processar imagem {image_url}: {e}")
+        _url_cache_set(image_url, bucket, folder, filename, None)
         return image_url if fallback_to_original else None
 
 
+async def upload_images_from_urls_async(
+    image_urls: Sequence[Optional[str]],
+    folder: str,
+    filenames: Optional[Sequence[Optional[str]]] = None,
+    bucket: str = DEFAULT_BUCKET,
+    fallback_to_original: bool = True,
+    max_concorrencia: int = UPLOAD_LOTE_CONCORRENCIA,
+) -> List[Optional[str]]:
+    """
+    Upload em lote: processa as imagens em paralelo (no máximo
+    `max_concorrencia` por vez) em vez de uma a uma.
+    
+    Args:
+        image_urls: URLs das imagens (entradas vazias são devolvidas como estão)
+        folder: Pasta no bucket
+        filenames: Nomes dos arquivos (sem extensão), alinhados com image_urls
+        bucket: Nome do bucket (default: "portal")
+        fallback_to_original: Se True, devolve a URL original em caso de erro
+        max_concorrencia: Máximo de uploads simultâneos
+        
+    Returns:
+        Lista de URLs na mesma ordem de image_urls
+    """
+    semaforo = asyncio.Semaphore(max_concorrencia)
+    
+    async def enviar(image_url: Optional[str], filename: Optional[str]) -> Optional[str]:
+        if not image_url:
+            return image_url
+        async with semaforo:
+            try:
+                return await upload_image_from_url_async(
+                    image_url,
+                    folder=folder,
+                    filename=filename,
+                    bucket=bucket,
+                    fallback_to_original=fallback_to_original,
+                )
+            except Exception as e:
+                logger.warning(f"Erro ao fazer upload de imagem {image_url}: {e}")
+                return image_url if fallback_to_original else None
+    
+    nomes = filenames if filenames is not None else [None] * len(image_urls)
+    return list(await asyncio.gather(*(enviar(url, nome) for url, nome in zip(image_urls, nomes))))
+
+
 # Funções de conveniência para diferentes tipos de conteúdo
 
 async def upload_noticia_image_async(image_url: str, noticia_id: Optional[str] = None) -> Optional[str]:
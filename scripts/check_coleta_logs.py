@@ -4,6 +4,7 @@ Mostra as últimas execuções e identifica erros.
 """
 import os
 import sys
+from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
 
@@ -91,15 +92,22 @@ def main():
     print("TRENDING TOPICS NO BANCO")
     print("=" * 70)
     
-    for category in ["politica", "twitter", "google"]:
-        response = supabase.table("portal_trending_topics")\
-            .select("*")\
-            .eq("category", category)\
-            .order("rank")\
-            .limit(5)\
-            .execute()
-        
-        topics = response.data or []
+    categorias = ["politica", "twitter", "google"]
+    
+    # Uma consulta para as três categorias, agrupada aqui
+    response = supabase.table("portal_trending_topics")\
+        .select("category, rank, title")\
+        .in_("category", categorias)\
+        .order("category")\
+        .order("rank")\
+        .execute()
+    
+    por_categoria = defaultdict(list)
+    for topic in response.data or []:
+        por_categoria[topic["category"]].append(topic)
+    
+    for category in categorias:
+        topics = por_categoria[category][:5]
         print(f"\n📊 {category.upper()}: {len(topics)} topics")
         for topic in topics[:3]:
             print(f"   #{topic.get('rank', '?')} {topic.get('title', 'N/A')}")
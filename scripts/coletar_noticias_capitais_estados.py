@@ -5,10 +5,12 @@ Script para coletar notícias dos estados e capitais dos políticos com usar_dir
 - Busca as 3 notícias mais importantes a nível de CIDADE/CAPITAL (prefeitura, câmara)
 """
 import asyncio
+import heapq
 import logging
 import sys
+import time
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 # Adiciona o diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -67,58 +69,142 @@ NOMES_ESTADOS: Dict[str, str] = {
     "SP": "São Paulo", "SE": "Sergipe", "TO": "Tocantins"
 }
 
+# (sigla, nome, capital) de cada estado, em ordem de sigla
+TABELA_ESTADOS: Tuple[Tuple[str, str, str], ...] = tuple(
+    (sigla, NOMES_ESTADOS[sigla], capital)
+    for sigla, capital in sorted(CAPITAIS_ESTADOS.items())
+)
+
+# Taxa máxima de buscas no Google News (inícios por segundo, somando todos os estados)
+BUSCAS_GOOGLE_POR_SEGUNDO = 10
+
+# Estados processados ao mesmo tempo (cada um faz buscas no Google News e inserts)
+MAX_ESTADOS_SIMULTANEOS = 5
 
-def get_estados_unicos_diretoriaja() -> Set[str]:
+
+def get_estados_unicos_diretoriaja() -> List[Tuple[str, str, str]]:
     """
     Busca todos os políticos com usar_diretoriaja = TRUE e retorna
     os estados únicos (agrupados).
     
     Returns:
-        Set de siglas de estados únicos
+        Linhas (sigla, nome, capital) de TABELA_ESTADOS, ordenadas por sigla
     """
     politicos = db.get_politicos_diretoriaja()
     
     logger.info(f"Total de políticos com usar_diretoriaja=TRUE: {len(politicos)}")
     
-    estados = set()
-    for politico in politicos:
-        estado = politico.get("estado")
-        if estado and estado.strip():
-            # Normaliza para maiúsculo
-            estados.add(estado.strip().upper())
+    # Normaliza para maiúsculo
+    siglas = {
+        estado.strip().upper()
+        for estado in (politico.get("estado") for politico in politicos)
+        if estado and estado.strip()
+    }
+    
+    for sigla in sorted(siglas - CAPITAIS_ESTADOS.keys()):
+        logger.warning(f"Capital não encontrada para o estado: {sigla}")
     
-    return estados
+    return [linha for linha in TABELA_ESTADOS if linha[0] in siglas]
 
 
 def _serialize_for_db(noticia: Dict) -> Dict:
-    """Converte objetos datetime para string ISO para inserção no banco"""
-    serialized = {}
-    for key, value in noticia.items():
-        if isinstance(value, datetime):
-            serialized[key] = value.isoformat()
-        elif value is not None:
-            serialized[key] = value
-    return serialized
+    """Converte objetos datetime para string ISO para inserção no banco (omite valores None)"""
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in noticia.items()
+        if value is not None
+    }
+
+
+def _deduplicar(noticias: List[Dict]) -> List[Dict]:
+    """Remove duplicatas por URL (mantém a última ocorrência)."""
+    return list({n["url"]: n for n in noticias if n.get("url")}.values())
+
+
+def _selecionar(candidatas: List[Dict], limite: int, selecionadas: Set[str]) -> List[Dict]:
+    """
+    Top `limite` candidatas por relevância, ignorando as URLs já selecionadas
+    por outro estado/cidade nesta execução (o upsert é por URL: a repetida só
+    sobrescreveria a anterior). Registra as escolhidas em `selecionadas`.
+    """
+    top = heapq.nlargest(
+        limite,
+        (n for n in candidatas if n["url"] not in selecionadas),
+        key=lambda x: x.get("relevancia_total", 0)
+    )
+    selecionadas.update(n["url"] for n in top)
+    return top
+
+
+class _LimiteTaxa:
+    """
+    Leaky bucket: espaça os inícios das chamadas em 1/`por_segundo` s, sem
+    serializar as chamadas em si. Uso apenas no event loop (sem lock).
+    """
+
+    def __init__(self, por_segundo: float):
+        self.intervalo = 1.0 / por_segundo
+        self.proximo = 0.0
+
+    async def aguardar(self) -> None:
+        agora = time.monotonic()
+        inicio = max(agora, self.proximo)
+        self.proximo = inicio + self.intervalo
+        if inicio > agora:
+            await asyncio.sleep(inicio - agora)
+
+
+_limite_google = _LimiteTaxa(BUSCAS_GOOGLE_POR_SEGUNDO)
+
+
+async def _buscar_queries(
+    queries: List[str],
+    google_collector: GoogleNewsCollector,
+    semaforo: Optional[asyncio.Semaphore] = None
+) -> List[Dict]:
+    """
+    Executa as buscas no Google News em paralelo (são independentes) e junta
+    os resultados. A taxa é limitada por _limite_google; se `semaforo` for
+    informado, limita também as buscas simultâneas.
+    """
+    async def buscar(query: str) -> List[Dict]:
+        if semaforo is None:
+            await _limite_google.aguardar()
+            return await google_collector.buscar_noticias(query, extrair_conteudo=False)
+        async with semaforo:
+            await _limite_google.aguardar()
+            return await google_collector.buscar_noticias(query, extrair_conteudo=False)
+    
+    resultados = await asyncio.gather(*[buscar(q) for q in queries], return_exceptions=True)
+    
+    todas_noticias = []
+    for query, resultado in zip(queries, resultados):
+        if isinstance(resultado, Exception):
+            logger.warning(f"Erro ao buscar '{query}': {resultado}")
+        else:
+            todas_noticias.extend(resultado)
+    return todas_noticias
 
 
 async def coletar_noticias_estado(
     estado: str,
     google_collector: GoogleNewsCollector,
     relevance_engine: RelevanceEngine,
-    limite: int = 3
+    semaforo: Optional[asyncio.Semaphore] = None
 ) -> List[Dict]:
     """
-    Coleta as notícias mais importantes a nível de ESTADO.
+    Coleta as notícias candidatas a nível de ESTADO, já pontuadas.
     (governo estadual, assembleia legislativa, política estadual)
+    As mais importantes são escolhidas depois, por _selecionar.
     
     Args:
         estado: Sigla do estado
         google_collector: Instância do coletor do Google News
         relevance_engine: Engine de relevância
-        limite: Número máximo de notícias a retornar (padrão: 3)
+        semaforo: Limita as buscas simultâneas no Google News (opcional)
         
     Returns:
-        Lista com as notícias mais importantes do estado
+        Lista de notícias candidatas do estado
     """
     nome_estado = NOMES_ESTADOS.get(estado, estado)
     logger.info(f"Buscando notícias do ESTADO: {nome_estado} ({estado})...")
@@ -130,50 +216,25 @@ async def coletar_noticias_estado(
         f"política estadual {nome_estado}",
     ]
     
-    todas_noticias = []
-    
-    for query in queries:
-        try:
-            noticias = await google_collector.buscar_noticias(query, extrair_conteudo=False)
-            todas_noticias.extend(noticias)
-            await asyncio.sleep(1)  # Rate limiting
-        except Exception as e:
-            logger.warning(f"Erro ao buscar '{query}': {e}")
+    todas_noticias = await _buscar_queries(queries, google_collector, semaforo)
     
     if not todas_noticias:
         logger.info(f"Nenhuma notícia encontrada para o estado {nome_estado}")
         return []
     
     # Remove duplicatas por URL
-    urls_vistas = set()
-    noticias_unicas = []
-    for noticia in todas_noticias:
-        url = noticia.get("url", "")
-        if url and url not in urls_vistas:
-            urls_vistas.add(url)
-            noticias_unicas.append(noticia)
+    noticias_unicas = _deduplicar(todas_noticias)
     
     # Processa relevância
     noticias_processadas = relevance_engine.processar_noticias(noticias_unicas)
     
-    # Ordena por relevância e pega as top N
-    noticias_ordenadas = sorted(
-        noticias_processadas, 
-        key=lambda x: x.get("relevancia_total", 0), 
-        reverse=True
-    )
-    
-    top_noticias = noticias_ordenadas[:limite]
-    
     # Adiciona metadados - tipo='estado' SEM cidade (nível estadual)
-    for noticia in top_noticias:
+    for noticia in noticias_processadas:
         noticia["tipo"] = "estado"
         noticia["estado"] = estado
         # Não define cidade - é notícia a nível de estado
     
-    logger.info(f"Selecionadas {len(top_noticias)} notícias do estado {nome_estado}")
-    
-    return top_noticias
+    return noticias_processadas
 
 
 async def coletar_noticias_cidade(
@@ -181,21 +242,22 @@ async def coletar_noticias_cidade(
     capital: str,
     google_collector: GoogleNewsCollector,
     relevance_engine: RelevanceEngine,
-    limite: int = 3
+    semaforo: Optional[asyncio.Semaphore] = None
 ) -> List[Dict]:
     """
-    Coleta as notícias mais importantes a nível de CIDADE/CAPITAL.
+    Coleta as notícias candidatas a nível de CIDADE/CAPITAL, já pontuadas.
     (prefeitura, câmara municipal, política municipal)
+    As mais importantes são escolhidas depois, por _selecionar.
     
     Args:
         estado: Sigla do estado
         capital: Nome da capital
         google_collector: Instância do coletor do Google News
         relevance_engine: Engine de relevância
-        limite: Número máximo de notícias a retornar (padrão: 3)
+        semaforo: Limita as buscas simultâneas no Google News (opcional)
         
     Returns:
-        Lista com as notícias mais importantes da cidade
+        Lista de notícias candidatas da cidade
     """
     logger.info(f"Buscando notícias da CIDADE: {capital} ({estado})...")
     
@@ -206,50 +268,77 @@ async def coletar_noticias_cidade(
         f"política municipal {capital}",
     ]
     
-    todas_noticias = []
-    
-    for query in queries:
-        try:
-            noticias = await google_collector.buscar_noticias(query, extrair_conteudo=False)
-            todas_noticias.extend(noticias)
-            await asyncio.sleep(1)  # Rate limiting
-        except Exception as e:
-            logger.warning(f"Erro ao buscar '{query}': {e}")
+    todas_noticias = await _buscar_queries(queries, google_collector, semaforo)
     
     if not todas_noticias:
         logger.info(f"Nenhuma notícia encontrada para {capital}")
         return []
     
     # Remove duplicatas por URL
-    urls_vistas = set()
-    noticias_unicas = []
-    for noticia in todas_noticias:
-        url = noticia.get("url", "")
-        if url and url not in urls_vistas:
-            urls_vistas.add(url)
-            noticias_unicas.append(noticia)
+    noticias_unicas = _deduplicar(todas_noticias)
     
     # Processa relevância
     noticias_processadas = relevance_engine.processar_noticias(noticias_unicas)
     
-    # Ordena por relevância e pega as top N
-    noticias_ordenadas = sorted(
-        noticias_processadas, 
-        key=lambda x: x.get("relevancia_total", 0), 
-        reverse=True
-    )
-    
-    top_noticias = noticias_ordenadas[:limite]
-    
     # Adiciona metadados - tipo='cidade' COM cidade (nível municipal)
-    for noticia in top_noticias:
+    for noticia in noticias_processadas:
         noticia["tipo"] = "cidade"
         noticia["estado"] = estado
         noticia["cidade"] = capital
     
-    logger.info(f"Selecionadas {len(top_noticias)} notícias da cidade {capital}")
+    return noticias_processadas
+
+
+def _stats_vazias() -> Dict[str, int]:
+    return {
+        "estados_processados": 0,
+        "noticias_estado_coletadas": 0,
+        "noticias_estado_inseridas": 0,
+        "noticias_cidade_coletadas": 0,
+        "noticias_cidade_inseridas": 0,
+        "erros": 0
+    }
+
+
+async def coletar_estado(
+    estado: str,
+    nome_estado: str,
+    capital: str,
+    google_collector: GoogleNewsCollector,
+    relevance_engine: RelevanceEngine,
+    semaforo: Optional[asyncio.Semaphore] = None
+) -> Optional[Tuple[List[Dict], List[Dict]]]:
+    """
+    Coleta as candidatas de um estado (nível estado e capital).
     
-    return top_noticias
+    Returns:
+        (candidatas do estado, candidatas da capital), ou None em caso de erro
+    """
+    try:
+        logger.info(f"\n--- Processando {nome_estado} ({estado}) ---")
+        
+        # Coleta notícias a nível de ESTADO
+        noticias_estado = await coletar_noticias_estado(
+            estado=estado,
+            google_collector=google_collector,
+            relevance_engine=relevance_engine,
+            semaforo=semaforo
+        )
+        
+        # Coleta notícias a nível de CIDADE/CAPITAL
+        noticias_cidade = await coletar_noticias_cidade(
+            estado=estado,
+            capital=capital,
+            google_collector=google_collector,
+            relevance_engine=relevance_engine,
+            semaforo=semaforo
+        )
+        
+        return noticias_estado, noticias_cidade
+        
+    except Exception as e:
+        logger.error(f"Erro ao processar {nome_estado} ({estado}): {e}")
+        return None
 
 
 async def main():
@@ -268,84 +357,68 @@ async def main():
         return
     
     logger.info(f"\nEstados únicos encontrados: {len(estados_unicos)}")
-    for estado in sorted(estados_unicos):
-        capital = CAPITAIS_ESTADOS.get(estado, "Desconhecida")
-        nome = NOMES_ESTADOS.get(estado, estado)
+    for estado, nome, capital in estados_unicos:
         logger.info(f"  - {estado} ({nome}): Capital = {capital}")
     
     # 2. Inicializa coletores
     google_collector = GoogleNewsCollector()
     relevance_engine = RelevanceEngine()
+    # Rate limiting: no máximo 3 buscas simultâneas no Google News
+    semaforo = asyncio.Semaphore(3)
     
-    # 3. Estatísticas
-    stats = {
-        "estados_processados": 0,
-        "noticias_estado_coletadas": 0,
-        "noticias_estado_inseridas": 0,
-        "noticias_cidade_coletadas": 0,
-        "noticias_cidade_inseridas": 0,
-        "erros": 0
-    }
-    
+    # 3. Processa os estados em paralelo (no máximo 5 por vez)
     logger.info("\n" + "=" * 60)
     logger.info("INICIANDO COLETA DE NOTÍCIAS")
     logger.info("=" * 60)
     
-    for estado in sorted(estados_unicos):
-        capital = CAPITAIS_ESTADOS.get(estado)
-        nome_estado = NOMES_ESTADOS.get(estado, estado)
-        
-        if not capital:
-            logger.warning(f"Capital não encontrada para o estado: {estado}")
+    semaforo_estados = asyncio.Semaphore(MAX_ESTADOS_SIMULTANEOS)
+    
+    async def coletar_com_limite(
+        estado: str, nome: str, capital: str
+    ) -> Optional[Tuple[List[Dict], List[Dict]]]:
+        async with semaforo_estados:
+            return await coletar_estado(estado, nome, capital, google_collector, relevance_engine, semaforo)
+    
+    async with asyncio.TaskGroup() as tg:
+        tarefas = [tg.create_task(coletar_com_limite(*linha)) for linha in estados_unicos]
+    
+    # Seleção depois de todas as coletas, na ordem das siglas (estado e depois
+    # capital, estado a estado): a deduplicação entre estados não depende da
+    # ordem em que as tarefas terminaram, então reexecuções escolhem as mesmas notícias
+    stats = _stats_vazias()
+    selecionadas: Set[str] = set()
+    top_estados: List[Dict] = []
+    top_cidades: List[Dict] = []
+    for (estado, nome_estado, capital), tarefa in zip(estados_unicos, tarefas):
+        candidatas = tarefa.result()
+        if candidatas is None:
             stats["erros"] += 1
             continue
+        candidatas_estado, candidatas_cidade = candidatas
         
-        try:
-            logger.info(f"\n--- Processando {nome_estado} ({estado}) ---")
-            
-            # 3a. Coleta notícias a nível de ESTADO
-            noticias_estado = await coletar_noticias_estado(
-                estado=estado,
-                google_collector=google_collector,
-                relevance_engine=relevance_engine,
-                limite=3
-            )
-            
-            stats["noticias_estado_coletadas"] += len(noticias_estado)
-            
-            if noticias_estado:
-                noticias_serializadas = [_serialize_for_db(n) for n in noticias_estado]
-                inserted = db.insert_noticias_batch(noticias_serializadas)
-                stats["noticias_estado_inseridas"] += inserted
-                logger.info(f"  [ESTADO] Inseridas {inserted} notícias")
-            
-            await asyncio.sleep(1)
-            
-            # 3b. Coleta notícias a nível de CIDADE/CAPITAL
-            noticias_cidade = await coletar_noticias_cidade(
-                estado=estado,
-                capital=capital,
-                google_collector=google_collector,
-                relevance_engine=relevance_engine,
-                limite=3
-            )
-            
-            stats["noticias_cidade_coletadas"] += len(noticias_cidade)
-            
-            if noticias_cidade:
-                noticias_serializadas = [_serialize_for_db(n) for n in noticias_cidade]
-                inserted = db.insert_noticias_batch(noticias_serializadas)
-                stats["noticias_cidade_inseridas"] += inserted
-                logger.info(f"  [CIDADE] Inseridas {inserted} notícias de {capital}")
-            
-            stats["estados_processados"] += 1
-            
-            # Delay entre estados
-            await asyncio.sleep(2)
-            
-        except Exception as e:
-            logger.error(f"Erro ao processar {nome_estado} ({estado}): {e}")
-            stats["erros"] += 1
+        top_estado = _selecionar(candidatas_estado, 3, selecionadas)
+        logger.info(f"Selecionadas {len(top_estado)} notícias do estado {nome_estado}")
+        top_cidade = _selecionar(candidatas_cidade, 3, selecionadas)
+        logger.info(f"Selecionadas {len(top_cidade)} notícias da cidade {capital}")
+        
+        top_estados.extend(top_estado)
+        top_cidades.extend(top_cidade)
+        stats["estados_processados"] += 1
+    
+    stats["noticias_estado_coletadas"] = len(top_estados)
+    stats["noticias_cidade_coletadas"] = len(top_cidades)
+    
+    # Um insert em lote por nível (as URLs já são únicas entre estados)
+    if top_estados:
+        stats["noticias_estado_inseridas"] = await asyncio.to_thread(
+            db.insert_noticias_batch, [_serialize_for_db(n) for n in top_estados]
+        )
+        logger.info(f"  [ESTADO] Inseridas {stats['noticias_estado_inseridas']} notícias")
+    if top_cidades:
+        stats["noticias_cidade_inseridas"] = await asyncio.to_thread(
+            db.insert_noticias_batch, [_serialize_for_db(n) for n in top_cidades]
+        )
+        logger.info(f"  [CIDADE] Inseridas {stats['noticias_cidade_inseridas']} notícias")
     
     # 4. Resumo final
     logger.info("\n" + "=" * 60)
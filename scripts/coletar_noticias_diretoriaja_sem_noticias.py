@@ -4,6 +4,7 @@ que ainda não possuem notícias cadastradas.
 """
 import asyncio
 import logging
+import random
 import sys
 from pathlib import Path
 
@@ -20,6 +21,41 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Políticos processados ao mesmo tempo (pequeno, para respeitar as fontes de
+# notícias e o pool de conexões do Supabase)
+MAX_POLITICOS_SIMULTANEOS = 4
+
+# Linhas acumuladas (de vários políticos) por upsert em noticias
+LOTE_INSERT = 200
+
+
+class _LoteNoticias:
+    """
+    Acumula as notícias serializadas de vários políticos e grava em upserts
+    de até LOTE_INSERT linhas, em vez de um upsert por político. Usado só no
+    event loop do script (as tarefas não rodam em threads).
+    """
+
+    def __init__(self, tamanho: int = LOTE_INSERT):
+        self.tamanho = tamanho
+        self.pendentes = []
+        self.inseridas = 0
+
+    async def adicionar(self, noticias) -> None:
+        self.pendentes.extend(noticias)
+        if len(self.pendentes) >= self.tamanho:
+            await self.descarregar()
+
+    async def descarregar(self) -> None:
+        if not self.pendentes:
+            return
+        # Troca a lista antes do await: outras tarefas continuam acumulando
+        lote, self.pendentes = self.pendentes, []
+        # Mesma URL em dois políticos: o upsert (on_conflict=url) não aceita a
+        # mesma chave duas vezes no mesmo comando; mantém a última, como antes
+        lote = list({n.get("url") or id(n): n for n in lote}.values())
+        self.inseridas += await asyncio.to_thread(db.insert_noticias_batch, lote)
+
 
 async def get_politicos_diretoriaja_sem_noticias():
     """
@@ -30,51 +66,42 @@ async def get_politicos_diretoriaja_sem_noticias():
     
     logger.info(f"Total de políticos com usar_diretoriaja=TRUE: {len(politicos_diretoriaja)}")
     
-    # Filtra apenas os que não têm notícias
-    politicos_sem_noticias = []
+    # Filtra apenas os que não têm notícias (uma consulta para todos)
+    uuids = [p["uuid"] for p in politicos_diretoriaja if p.get("uuid")]
+    com_noticias = db.get_politicos_com_noticias(uuids)
     
-    for politico in politicos_diretoriaja:
-        uuid = politico.get("uuid")
-        if not uuid:
-            continue
-        
-        # Verifica se tem notícias
-        response = db.client.table("noticias").select("id", count="exact").eq("politico_id", uuid).limit(1).execute()
-        
-        if response.count == 0:
-            politicos_sem_noticias.append(politico)
-    
-    return politicos_sem_noticias
+    return [
+        politico for politico in politicos_diretoriaja
+        if politico.get("uuid") and politico["uuid"] not in com_noticias
+    ]
 
 
-async def coletar_noticias_para_politicos(politicos):
+async def processar_politico(politico, semaforo: asyncio.Semaphore, lote: _LoteNoticias):
     """
-    Coleta notícias para uma lista de políticos.
+    Coleta as notícias de um político e as envia ao `lote` de inserção (no
+    máximo MAX_POLITICOS_SIMULTANEOS ao mesmo tempo, controlado por `semaforo`).
+    
+    Returns:
+        Estatísticas do político (mesmas chaves de coletar_noticias_para_politicos)
     """
-    stats = {
-        "politicos_processados": 0,
-        "noticias_coletadas": 0,
-        "erros": 0
-    }
+    stats = {"politicos_processados": 0, "noticias_coletadas": 0, "erros": 0}
+    
+    nome = politico.get("name")
+    if not nome:
+        return stats
     
-    for politico in politicos:
+    async with semaforo:
         try:
             politico_id = politico["id"]
             uuid = politico["uuid"]
-            nome = politico.get("name")
             cidade = politico.get("cidade")
             estado = politico.get("estado")
             funcao = politico.get("funcao")
             
-            if not nome:
-                continue
-            
-            logger.info(f"\n{'='*60}")
-            logger.info(f"Processando: {nome}")
-            logger.info(f"  - Cidade: {cidade or 'N/A'}")
-            logger.info(f"  - Estado: {estado or 'N/A'}")
-            logger.info(f"  - Função: {funcao or 'N/A'}")
-            logger.info(f"  - UUID: {uuid}")
+            logger.info(
+                f"Processando: {nome} (cidade: {cidade or 'N/A'}, estado: {estado or 'N/A'}, "
+                f"função: {funcao or 'N/A'}, UUID: {uuid})"
+            )
             
             # Coleta notícias do político
             noticias = await news_aggregator.coletar_noticias_politico(
@@ -90,20 +117,50 @@ async def coletar_noticias_para_politicos(politicos):
                     n_serializada["politico_id"] = uuid
                     noticias_para_insert.append(n_serializada)
                 
-                inserted = db.insert_noticias_batch(noticias_para_insert)
-                stats["noticias_coletadas"] += inserted
-                logger.info(f"  -> Inseridas {inserted} notícias para {nome}")
+                await lote.adicionar(noticias_para_insert)
+                logger.info(f"  -> {len(noticias_para_insert)} notícias coletadas para {nome}")
             else:
                 logger.info(f"  -> Nenhuma notícia encontrada para {nome}")
             
             stats["politicos_processados"] += 1
             
-            # Delay entre políticos para não sobrecarregar
-            await asyncio.sleep(2)
-            
         except Exception as e:
-            logger.error(f"Erro ao processar político {politico.get('name')}: {e}")
+            logger.error(f"Erro ao processar político {nome}: {e}")
+            stats["erros"] += 1
+        
+        # Pausa curta (com jitter) antes de liberar a vaga, para não sobrecarregar as fontes
+        await asyncio.sleep(random.uniform(0.5, 1.5))
+    
+    return stats
+
+
+async def coletar_noticias_para_politicos(politicos):
+    """
+    Coleta notícias para uma lista de políticos, em paralelo (no máximo
+    MAX_POLITICOS_SIMULTANEOS por vez).
+    """
+    stats = {
+        "politicos_processados": 0,
+        "noticias_coletadas": 0,
+        "erros": 0
+    }
+    
+    semaforo = asyncio.Semaphore(MAX_POLITICOS_SIMULTANEOS)
+    lote = _LoteNoticias()
+    resultados = await asyncio.gather(
+        *[processar_politico(p, semaforo, lote) for p in politicos],
+        return_exceptions=True
+    )
+    await lote.descarregar()
+    stats["noticias_coletadas"] = lote.inseridas
+    
+    for politico, resultado in zip(politicos, resultados):
+        if isinstance(resultado, Exception):
+            logger.error(f"Erro ao processar político {politico.get('name')}: {resultado}")
             stats["erros"] += 1
+            continue
+        for chave, valor in resultado.items():
+            stats[chave] += valor
     
     return stats
 
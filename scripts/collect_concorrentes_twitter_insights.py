@@ -26,15 +26,18 @@ Uso:
 from __future__ import annotations
 
 import argparse
+import asyncio
+import importlib.util
 import json
 import os
 import re
-import time
 from datetime import datetime, timezone, timedelta
+from itertools import islice
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
+from postgrest.types import ReturningMethod
 from supabase import create_client
 
 try:
@@ -42,6 +45,36 @@ try:
 except Exception:  # pragma: no cover
     load_dotenv = None
 
+# HTTP/2 exige o pacote h2 (httpx[http2]); sem ele o client fica em HTTP/1.1
+HTTP2_DISPONIVEL = importlib.util.find_spec("h2") is not None
+
+
+# Padrões usados na limpeza de tweets e na montagem das queries (compilados uma vez)
+_TCO_RE = re.compile(r"\s*https://t\.co/\w+\s*")
+_LEADING_MENTIONS_RE = re.compile(r"^((?:@\w+\s*)+)")
+_MENTION_RE = re.compile(r"@\w+")
+_WS_RE = re.compile(r"\s+")
+_TITLE_PREFIX_RE = re.compile(
+    r"^(dr\.?|dra\.?|prof\.?|dep\.?|sen\.?|vereador|vereadora|deputado|deputada|senador|senadora)\s+",
+    re.I,
+)
+_INT_SEP_RE = re.compile(r"[,\.\s]")
+
+# Chaves candidatas (em ordem de preferência) de cada campo nos outputs do Apify
+_TWEET_ID_KEYS = ("id", "postId", "post_id", "tweetId", "tweet_id")
+_TWEET_TEXT_KEYS = ("full_text", "text", "postText", "fullText", "content")
+_AUTHOR_OBJ_USERNAME_KEYS = ("screen_name", "screenName", "username", "userName", "handle")
+_AUTHOR_OBJ_NAME_KEYS = ("name", "displayName", "fullName")
+_AUTHOR_USERNAME_KEYS = ("screen_name", "screenName", "username", "authorUsername")
+_AUTHOR_NAME_KEYS = ("authorName", "author_name", "userName", "name")
+_TWEET_URL_KEYS = ("url", "twitterUrl", "postUrl", "tweet_url", "link")
+_LIKES_KEYS = ("favorite_count", "favouriteCount", "favoriteCount", "likeCount", "likes")
+_REPOSTS_KEYS = ("retweet_count", "repostCount", "retweetCount", "retweets")
+_REPLIES_KEYS = ("reply_count", "replyCount", "replies", "commentCount")
+_QUOTES_KEYS = ("quote_count", "quoteCount", "quotes")
+_VIEWS_KEYS = ("view_count", "viewCount", "views", "impressionCount")
+_POSTED_AT_KEYS = ("timestamp", "createdAt", "created_at", "date", "postedAt", "publishedAt")
+
 
 def ensure_env_loaded(project_root: Path) -> None:
     if load_dotenv is not None:
@@ -69,9 +102,12 @@ def _parse_int_like(v: Any) -> Optional[int]:
         s = v.strip()
         if not s:
             return None
+        # isdecimal (e não isdigit): "²" é dígito mas int() o rejeita
+        if s.isdecimal():
+            return int(s)
         # remove separadores comuns (1,234 / 1.234 / 1 234)
-        s = re.sub(r"[,\.\s]", "", s)
-        if s.isdigit():
+        s = _INT_SEP_RE.sub("", s)
+        if s.isdecimal():
             try:
                 return int(s)
             except Exception:
@@ -80,19 +116,22 @@ def _parse_int_like(v: Any) -> Optional[int]:
 
 
 def pick_int(d: Dict[str, Any], *keys: str) -> Optional[int]:
+    get = d.get
     for k in keys:
-        v = d.get(k)
-        parsed = _parse_int_like(v)
+        parsed = _parse_int_like(get(k))
         if parsed is not None:
             return parsed
     return None
 
 
 def pick_str(d: Dict[str, Any], *keys: str, default: str = "") -> str:
+    get = d.get
     for k in keys:
-        v = d.get(k)
-        if isinstance(v, str) and v.strip():
-            return v.strip()
+        v = get(k)
+        if isinstance(v, str):
+            v = v.strip()
+            if v:
+                return v
     return default
 
 
@@ -104,18 +143,18 @@ def clean_tweet_text(text: str) -> str:
     """
     if not text:
         return ""
-    text = re.sub(r"\s*https://t\.co/\w+\s*", " ", text)
-    match = re.match(r"^((?:@\w+\s*)+)", text)
+    text = _TCO_RE.sub(" ", text)
+    match = _LEADING_MENTIONS_RE.match(text)
     if match:
         mentions_part = match.group(1)
         rest = text[len(mentions_part) :].strip()
-        mentions = re.findall(r"@\w+", mentions_part)
+        mentions = _MENTION_RE.findall(mentions_part)
         if len(mentions) > 2:
             kept = " ".join(mentions[:2])
             text = f"{kept} [...] {rest}".strip()
         elif rest:
             text = f"{mentions_part.strip()} {rest}".strip()
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _WS_RE.sub(" ", text).strip()
     return text
 
 
@@ -128,12 +167,7 @@ def build_search_queries(name: str, twitter_username: str) -> List[str]:
     tw = (twitter_username or "").strip().lstrip("@")
 
     # remove prefixos comuns no começo do nome
-    name_clean = re.sub(
-        r"^(dr\.?|dra\.?|prof\.?|dep\.?|sen\.?|vereador|vereadora|deputado|deputada|senador|senadora)\s+",
-        "",
-        name,
-        flags=re.I,
-    ).strip()
+    name_clean = _TITLE_PREFIX_RE.sub("", name).strip()
 
     queries: List[str] = []
     if tw:
@@ -169,33 +203,33 @@ def normalize_tweet_to_mention(
     """
     Normaliza o output do actor xtdata/twitter-x-scraper para o formato da tabela social_mentions.
     """
-    tweet_id = pick_str(tweet, "id", "postId", "post_id", "tweetId", "tweet_id")
-    raw_content = pick_str(tweet, "full_text", "text", "postText", "fullText", "content")
-    content = clean_tweet_text(raw_content)
+    tweet_id = pick_str(tweet, *_TWEET_ID_KEYS)
+    content = clean_tweet_text(pick_str(tweet, *_TWEET_TEXT_KEYS))
 
     author_name = ""
     author_username = ""
-    if isinstance(tweet.get("author"), dict):
-        author_obj = tweet["author"]
-        author_username = pick_str(author_obj, "screen_name", "screenName", "username", "userName", "handle")
-        author_name = pick_str(author_obj, "name", "displayName", "fullName")
+    author_obj = tweet.get("author")
+    if isinstance(author_obj, dict):
+        author_username = pick_str(author_obj, *_AUTHOR_OBJ_USERNAME_KEYS)
+        author_name = pick_str(author_obj, *_AUTHOR_OBJ_NAME_KEYS)
     if not author_username:
-        author_username = pick_str(tweet, "screen_name", "screenName", "username", "authorUsername")
+        author_username = pick_str(tweet, *_AUTHOR_USERNAME_KEYS)
     if not author_name:
-        author_name = pick_str(tweet, "authorName", "author_name", "userName", "name")
+        author_name = pick_str(tweet, *_AUTHOR_NAME_KEYS)
 
-    url = pick_str(tweet, "url", "twitterUrl", "postUrl", "tweet_url", "link")
+    url = pick_str(tweet, *_TWEET_URL_KEYS)
     if not url and tweet_id and author_username:
         url = f"https://x.com/{author_username}/status/{tweet_id}"
 
-    likes = pick_int(tweet, "favorite_count", "favouriteCount", "favoriteCount", "likeCount", "likes") or 0
-    reposts = pick_int(tweet, "retweet_count", "repostCount", "retweetCount", "retweets") or 0
-    replies = pick_int(tweet, "reply_count", "replyCount", "replies", "commentCount") or 0
-    quotes = pick_int(tweet, "quote_count", "quoteCount", "quotes") or 0
-    views = pick_int(tweet, "view_count", "viewCount", "views", "impressionCount") or 0
+    # pick_int devolve int ou None
+    likes = pick_int(tweet, *_LIKES_KEYS) or 0
+    reposts = pick_int(tweet, *_REPOSTS_KEYS) or 0
+    replies = pick_int(tweet, *_REPLIES_KEYS) or 0
+    quotes = pick_int(tweet, *_QUOTES_KEYS) or 0
+    views = pick_int(tweet, *_VIEWS_KEYS) or 0
 
-    engagement = int(likes) + (int(reposts) * 2) + int(replies) + int(quotes)
-    posted_at = pick_str(tweet, "timestamp", "createdAt", "created_at", "date", "postedAt", "publishedAt")
+    engagement = likes + (reposts * 2) + replies + quotes
+    posted_at = pick_str(tweet, *_POSTED_AT_KEYS)
 
     metadata = {
         "source": "apify",
@@ -204,7 +238,7 @@ def normalize_tweet_to_mention(
         "politico_twitter": politico_tw,
         "views": views,
         "quotes": quotes,
-        "raw_keys": list(tweet.keys())[:30],
+        "raw_keys": list(islice(tweet, 30)),
     }
 
     return {
@@ -217,9 +251,9 @@ def normalize_tweet_to_mention(
         "assunto": None,
         "assunto_detalhe": None,
         "sentimento": None,
-        "likes": int(likes),
-        "reposts": int(reposts),
-        "replies": int(replies),
+        "likes": likes,
+        "reposts": reposts,
+        "replies": replies,
         "engagement_score": float(engagement),
         "posted_at": posted_at or None,
         "metadata": metadata,
@@ -228,8 +262,8 @@ def normalize_tweet_to_mention(
     }
 
 
-def fetch_mentions_from_apify(
-    apify: ApifyClient,
+async def fetch_mentions_from_apify(
+    apify: AsyncApifyClient,
     *,
     actor_id: str,
     politico_uuid: Optional[str],
@@ -258,14 +292,14 @@ def fetch_mentions_from_apify(
         if search_mode == "latest":
             actor_input["searchMode"] = "live"
 
-        tweets = apify.run_sync_get_items(actor_id, actor_input, limit=int(max_items), timeout_s=float(timeout_s))
+        tweets = await apify.run_sync_get_items(actor_id, actor_input, limit=int(max_items), timeout_s=float(timeout_s))
         for t in tweets:
             tid = pick_str(t, "id", "tweetId", "tweet_id", "postId")
             if tid and tid not in seen_ids:
                 seen_ids.add(tid)
                 all_tweets.append(t)
 
-        time.sleep(0.3)
+        await asyncio.sleep(0.3)
 
     mentions = [
         normalize_tweet_to_mention(t, politico_uuid=politico_uuid, politico_name=politico_name, politico_tw=politico_tw)
@@ -276,18 +310,26 @@ def fetch_mentions_from_apify(
     return mentions
 
 
-class ApifyClient:
-    """Cliente mínimo para Apify (run-sync-get-dataset-items)."""
+class AsyncApifyClient:
+    """
+    Cliente mínimo (async) para Apify (run-sync-get-dataset-items). Um único
+    client com keep-alive (HTTP/2 se o h2 estiver instalado) é compartilhado
+    pelos concorrentes processados em paralelo.
+    """
 
     def __init__(self, token: str, base_url: str = "https://api.apify.com") -> None:
         self._token = token
         self._base_url = base_url.rstrip("/")
-        self._http = httpx.Client(timeout=httpx.Timeout(310.0, connect=30.0))
+        self._http = httpx.AsyncClient(
+            timeout=httpx.Timeout(310.0, connect=30.0),
+            http2=HTTP2_DISPONIVEL,
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
 
-    def close(self) -> None:
-        self._http.close()
+    async def aclose(self) -> None:
+        await self._http.aclose()
 
-    def run_sync_get_items(
+    async def run_sync_get_items(
         self,
         actor_id: str,
         actor_input: Dict[str, Any],
@@ -297,7 +339,7 @@ class ApifyClient:
     ) -> List[Dict[str, Any]]:
         url = f"{self._base_url}/v2/acts/{actor_id}/run-sync-get-dataset-items"
         try:
-            r = self._http.post(
+            r = await self._http.post(
                 url,
                 params={"token": self._token, "format": "json", "limit": str(limit)},
                 json=actor_input,
@@ -320,31 +362,75 @@ class ApifyClient:
 
 
 def fetch_concorrentes(supabase: Any) -> List[Dict[str, Any]]:
-    """Retorna concorrentes cadastrados em public.concorrentes."""
+    """
+    Retorna concorrentes cadastrados em public.concorrentes.
+
+    Paginação por chave (id) em vez de OFFSET: cada página começa logo após a
+    última linha da anterior, sem reler as linhas já vistas. A chave é só o id
+    (não nulo e único); created_at pode ser NULL e quebraria o filtro.
+    """
     page_size = 1000
-    offset = 0
+    last_id: Optional[Any] = None
     out: List[Dict[str, Any]] = []
 
     while True:
-        resp = (
+        query = (
             supabase.table("concorrentes")
-            .select("id,name,twitter_username,politico_id")
-            .order("created_at", desc=False)
+            .select("id,name,twitter_username,politico_id,created_at")
+            .order("id", desc=False)
             .limit(page_size)
-            .offset(offset)
-            .execute()
         )
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        resp = query.execute()
         rows = getattr(resp, "data", None) or []
         if not rows:
             break
         out.extend([r for r in rows if isinstance(r, dict)])
         if len(rows) < page_size:
             break
-        offset += page_size
+        last_id = rows[-1]["id"]
 
     return out
 
 
+def save_mentions(supabase: Any, mentions: List[Dict[str, Any]], *, politico_uuid: str) -> None:
+    """
+    Persiste as menções coletadas em social_mentions num único upsert. Se o
+    lote falhar, tenta menção a menção (ignorando as que falharem).
+    """
+    # garante politico_id (pode ser NULL); uma linha por mention_id, pois o
+    # upsert não aceita a mesma chave duas vezes no mesmo comando
+    rows = list({
+        m.get("mention_id"): {**m, "politico_id": politico_uuid or None}
+        for m in mentions
+    }.values())
+    if not rows:
+        return
+
+    table = supabase.table("social_mentions")
+    try:
+        table.upsert(
+            rows,
+            on_conflict="politico_id,plataforma,mention_id",
+            returning=ReturningMethod.minimal,
+        ).execute()
+        return
+    except Exception:
+        pass
+
+    for m in rows:
+        try:
+            table.upsert(
+                m,
+                on_conflict="politico_id,plataforma,mention_id",
+                returning=ReturningMethod.minimal,
+            ).execute()
+        except Exception:
+            # se falhar (ex.: duplicata/constraint), ignora
+            pass
+
+
 def fetch_top_mentions(
     supabase: Any,
     *,
@@ -368,8 +454,8 @@ def fetch_top_mentions(
     return getattr(resp, "data", None) or []
 
 
-def fetch_followers_count_via_apify(
-    apify: ApifyClient,
+async def fetch_followers_count_via_apify(
+    apify: AsyncApifyClient,
     *,
     twitter_actor_id: str,
     twitter_username: str,
@@ -393,7 +479,7 @@ def fetch_followers_count_via_apify(
         "getRetweeters": False,
         "includeUnavailableUsers": False,
     }
-    items = apify.run_sync_get_items(twitter_actor_id, actor_input, limit=5, timeout_s=120.0)
+    items = await apify.run_sync_get_items(twitter_actor_id, actor_input, limit=5, timeout_s=120.0)
     if not items:
         return None, {"reason": "no_items"}
 
@@ -429,7 +515,7 @@ def fetch_followers_count_via_apify(
     return followers, meta
 
 
-def main() -> None:
+async def main() -> None:
     parser = argparse.ArgumentParser(description="Coleta insights de Twitter/X para concorrentes")
     parser.add_argument("--apply", action="store_true", help="Se setado, grava no Supabase; senão, dry-run.")
     parser.add_argument(
@@ -471,7 +557,7 @@ def main() -> None:
         "--sleep",
         type=float,
         default=1.0,
-        help="Delay entre concorrentes (segundos).",
+        help="Pausa de cada concorrente antes de liberar a vaga de paralelismo (segundos).",
     )
     parser.add_argument(
         "--timeout",
@@ -479,6 +565,12 @@ def main() -> None:
         default=120.0,
         help="Timeout por chamada ao Apify (segundos).",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Máximo de concorrentes processados em paralelo (default: 8).",
+    )
     args = parser.parse_args()
 
     project_root = Path(__file__).resolve().parents[1]
@@ -495,9 +587,9 @@ def main() -> None:
         raise SystemExit("Faltam SUPABASE_URL/SUPABASE_KEY no ambiente.")
 
     supabase = create_client(supabase_url, supabase_key)
-    apify: Optional[ApifyClient] = None
+    apify: Optional[AsyncApifyClient] = None
     if apify_token:
-        apify = ApifyClient(apify_token, base_url=apify_base_url)
+        apify = AsyncApifyClient(apify_token, base_url=apify_base_url)
 
     logs_dir = project_root / "logs"
     logs_dir.mkdir(parents=True, exist_ok=True)
@@ -516,7 +608,7 @@ def main() -> None:
     }
 
     try:
-        concorrentes = fetch_concorrentes(supabase)
+        concorrentes = await asyncio.to_thread(fetch_concorrentes, supabase)
         concorrentes = concorrentes[: int(args.limit_concorrentes)]
         stats["concorrentes_total"] = len(concorrentes)
 
@@ -525,9 +617,12 @@ def main() -> None:
         print(f"[INFO] Janela menções: {int(args.days_back)} dias")
         print(f"[INFO] Apify: {'SIM' if apify is not None else 'NÃO (APIFY_TOKEN ausente)'}")
         print(f"[INFO] Fetch Twitter via Apify: {'NÃO' if args.no_fetch_twitter else 'SIM'}")
+        print(f"[INFO] Concorrentes em paralelo: {int(args.concurrency)}")
         print()
 
-        for idx, c in enumerate(concorrentes, 1):
+        semaforo = asyncio.Semaphore(max(1, int(args.concurrency)))
+
+        async def processar_concorrente(idx: int, c: Dict[str, Any]) -> None:
             concorrente_id = (c.get("id") or "").strip()
             politico_uuid = (c.get("politico_id") or "").strip()
             name = (c.get("name") or "").strip()
@@ -542,14 +637,18 @@ def main() -> None:
 
             if not concorrente_id:
                 stats["errors"].append({"concorrente": name, "error": "concorrente.id ausente"})
-                continue
+                return
 
+            async with semaforo:
+                await _processar(concorrente_id, politico_uuid, name, tw)
+
+        async def _processar(concorrente_id: str, politico_uuid: str, name: str, tw: str) -> None:
             # 1) Menções (preferência: extração via Twitter/Apify; fallback: social_mentions)
             top_mentions: List[Dict[str, Any]] = []
 
             if apify is not None and not args.no_fetch_twitter:
                 try:
-                    mentions_live = fetch_mentions_from_apify(
+                    mentions_live = await fetch_mentions_from_apify(
                         apify,
                         actor_id=twitter_search_actor,
                         politico_uuid=politico_uuid or None,
@@ -563,24 +662,15 @@ def main() -> None:
 
                     # opcional: persistir menções no Supabase (social_mentions)
                     if args.apply and args.save_mentions and mentions_live:
-                        for m in mentions_live:
-                            # garante politico_id (pode ser NULL) e collected_at
-                            if not politico_uuid:
-                                m["politico_id"] = None
-                            try:
-                                supabase.table("social_mentions").upsert(
-                                    m,
-                                    on_conflict="politico_id,plataforma,mention_id",
-                                ).execute()
-                            except Exception:
-                                # se falhar (ex.: duplicata/constraint), ignora
-                                pass
+                        await asyncio.to_thread(save_mentions, supabase, mentions_live, politico_uuid=politico_uuid)
                 except Exception as e:
                     stats["errors"].append({"concorrente_id": concorrente_id, "error": f"apify_mentions: {str(e)}"})
 
             if not top_mentions:
                 if politico_uuid:
-                    top_mentions = fetch_top_mentions(supabase, politico_uuid=politico_uuid, days_back=int(args.days_back), limit=3)
+                    top_mentions = await asyncio.to_thread(
+                        fetch_top_mentions, supabase, politico_uuid=politico_uuid, days_back=int(args.days_back), limit=3
+                    )
                 else:
                     top_mentions = []
 
@@ -589,7 +679,7 @@ def main() -> None:
             followers_meta: Dict[str, Any] = {}
             if apify is not None and not looks_empty(tw):
                 try:
-                    followers_count, followers_meta = fetch_followers_count_via_apify(
+                    followers_count, followers_meta = await fetch_followers_count_via_apify(
                         apify,
                         twitter_actor_id=twitter_user_actor,
                         twitter_username=tw,
@@ -627,20 +717,31 @@ def main() -> None:
 
             if args.apply:
                 try:
-                    supabase.table("concorrente_twitter_insights").upsert(
-                        row,
-                        on_conflict="concorrente_id,mentions_window_days,computed_date",
-                    ).execute()
+                    await asyncio.to_thread(
+                        supabase.table("concorrente_twitter_insights").upsert(
+                            row,
+                            on_conflict="concorrente_id,mentions_window_days,computed_date",
+                        ).execute
+                    )
                     stats["snapshots_upserted"] += 1
                 except Exception as e:
                     stats["errors"].append({"concorrente_id": concorrente_id, "error": str(e)})
 
             stats["concorrentes_processed"] += 1
-            time.sleep(float(args.sleep))
+            # Pausa antes de liberar a vaga no semáforo
+            await asyncio.sleep(float(args.sleep))
+
+        resultados = await asyncio.gather(
+            *[processar_concorrente(idx, c) for idx, c in enumerate(concorrentes, 1)],
+            return_exceptions=True,
+        )
+        for c, resultado in zip(concorrentes, resultados):
+            if isinstance(resultado, Exception):
+                stats["errors"].append({"concorrente_id": c.get("id"), "error": str(resultado)})
 
     finally:
         if apify is not None:
-            apify.close()
+            await apify.aclose()
 
     stats["finished_at"] = datetime.now(timezone.utc).isoformat()
     stats["audit_file"] = str(audit_path)
@@ -653,5 +754,5 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
 
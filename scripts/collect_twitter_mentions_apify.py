@@ -37,6 +37,17 @@ except Exception:  # pragma: no cover
     load_dotenv = None
 
 
+# Padrões usados na limpeza de tweets e na montagem das queries (compilados uma vez)
+_TCO_RE = re.compile(r"\s*https://t\.co/\w+\s*")
+_LEADING_MENTIONS_RE = re.compile(r"^((?:@\w+\s*)+)")
+_MENTION_RE = re.compile(r"@\w+")
+_WS_RE = re.compile(r"\s+")
+_TITLE_PREFIX_RE = re.compile(
+    r"^(dr\.?|dra\.?|prof\.?|dep\.?|sen\.?|vereador|vereadora|deputado|deputada|senador|senadora)\s+",
+    re.I,
+)
+
+
 def ensure_env_loaded(project_root: Path) -> None:
     if load_dotenv is not None:
         load_dotenv(project_root / ".env", override=False)
@@ -86,18 +97,18 @@ def clean_tweet_text(text: str) -> str:
         return ""
     
     # Remove URLs t.co no final
-    text = re.sub(r'\s*https://t\.co/\w+\s*', ' ', text)
+    text = _TCO_RE.sub(' ', text)
     
     # Encontra menções no início do texto
     # Pattern: começa com @mentions separados por espaço
-    match = re.match(r'^((?:@\w+\s*)+)', text)
+    match = _LEADING_MENTIONS_RE.match(text)
     
     if match:
         mentions_part = match.group(1)
         rest_of_text = text[len(mentions_part):].strip()
         
         # Extrai todas as menções
-        mentions = re.findall(r'@\w+', mentions_part)
+        mentions = _MENTION_RE.findall(mentions_part)
         
         # Mantém no máximo 2 menções no início
         if len(mentions) > 2:
@@ -107,7 +118,7 @@ def clean_tweet_text(text: str) -> str:
             text = f"{mentions_part.strip()} {rest_of_text}"
     
     # Remove espaços extras
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WS_RE.sub(' ', text).strip()
     
     return text
 
@@ -122,12 +133,7 @@ def build_search_queries(politico: Dict[str, Any]) -> List[str]:
     twitter_username = (politico.get("twitter_username") or "").strip()
     
     # Remove títulos comuns do nome
-    name_clean = re.sub(
-        r"^(dr\.?|dra\.?|prof\.?|dep\.?|sen\.?|vereador|vereadora|deputado|deputada|senador|senadora)\s+",
-        "",
-        name,
-        flags=re.I
-    ).strip()
+    name_clean = _TITLE_PREFIX_RE.sub("", name).strip()
     
     queries = []
     
@@ -0,0 +1,33 @@
+-- Contagem de posts de Instagram de um político (usada por app/database.py)
+-- Prioriza a tabela unificada social_media_posts (plataforma='instagram') e,
+-- se ela não tiver posts do político, conta na tabela legada instagram_posts.
+-- Tudo numa única chamada, em vez de duas consultas de contagem.
+--
+-- Como aplicar:
+-- 1) Supabase SQL Editor: cole e rode este SQL
+-- 2) (Opcional) Supabase CLI migrations: crie migration e aplique
+
+create or replace function public.count_ig_posts(p_uuid uuid)
+returns bigint
+language plpgsql
+stable
+as $$
+declare
+  c bigint;
+begin
+  select count(*) into c
+  from public.social_media_posts
+  where politico_id = p_uuid
+    and plataforma = 'instagram';
+
+  if c > 0 then
+    return c;
+  end if;
+
+  return (
+    select count(*)
+    from public.instagram_posts
+    where politico_id = p_uuid
+  );
+end;
+$$;
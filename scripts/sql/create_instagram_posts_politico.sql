@@ -0,0 +1,43 @@
+-- Top posts de Instagram de um político numa única chamada (usada por app/database.py)
+-- Mesma regra do app: a tabela unificada social_media_posts (plataforma='instagram')
+-- tem preferência; a legada instagram_posts só é lida se a unificada não tiver
+-- posts do político. Evita a segunda ida ao banco no fallback.
+-- Retorna um array JSON (as duas tabelas têm colunas diferentes).
+--
+-- Como aplicar:
+-- 1) Supabase SQL Editor: cole e rode este SQL
+-- 2) (Opcional) Supabase CLI migrations: crie migration e aplique
+
+create or replace function public.instagram_posts_politico(
+  p_uuid uuid,
+  p_limit integer default 10
+)
+returns jsonb
+language sql
+stable
+as $$
+  select coalesce(
+    (
+      select jsonb_agg(to_jsonb(s) order by s.engagement_score desc)
+      from (
+        select sp.*
+        from public.social_media_posts sp
+        where sp.politico_id = p_uuid
+          and sp.plataforma = 'instagram'
+        order by sp.engagement_score desc
+        limit p_limit
+      ) s
+    ),
+    (
+      select jsonb_agg(to_jsonb(i) order by i.engagement_score desc)
+      from (
+        select ip.*
+        from public.instagram_posts ip
+        where ip.politico_id = p_uuid
+        order by ip.engagement_score desc
+        limit p_limit
+      ) i
+    ),
+    '[]'::jsonb
+  );
+$$;
@@ -0,0 +1,36 @@
+-- Estatísticas de Instagram de um político (usada por app/database.py)
+-- Agrega no banco os mesmos números que o endpoint /politicos/{id}/instagram/stats
+-- calculava em Python: os p_limit posts de maior engagement_score da tabela
+-- legada instagram_posts, somados numa única linha + o post de maior engajamento.
+--
+-- Como aplicar:
+-- 1) Supabase SQL Editor: cole e rode este SQL
+-- 2) (Opcional) Supabase CLI migrations: crie migration e aplique
+
+create or replace function public.instagram_stats(
+  p_uuid uuid,
+  p_limit integer default 100
+)
+returns jsonb
+language sql
+stable
+as $$
+  with top as (
+    select p.*
+    from public.instagram_posts p
+    where p.politico_id = p_uuid
+    order by p.engagement_score desc
+    limit p_limit
+  )
+  select jsonb_build_object(
+    'total_posts', (select count(*) from top),
+    'total_likes', (select coalesce(sum(likes), 0) from top),
+    'total_comments', (select coalesce(sum(comments), 0) from top),
+    'top_post', (
+      select to_jsonb(t)
+      from top t
+      order by t.engagement_score desc
+      limit 1
+    )
+  );
+$$;
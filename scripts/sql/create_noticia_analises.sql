@@ -0,0 +1,18 @@
+-- Análises técnicas (OpenAI) de notícias já geradas (usada por app/database.py)
+-- O endpoint /noticias/{id}/analise grava aqui cada resumo gerado, para não
+-- repetir a chamada à OpenAI para a mesma notícia (nem depois que o cache em
+-- Redis expira). Apagada junto com a notícia.
+--
+-- Como aplicar:
+-- 1) Supabase SQL Editor: cole e rode este SQL
+-- 2) (Opcional) Supabase CLI migrations: crie migration e aplique
+
+create table if not exists public.noticia_analises (
+  noticia_id uuid primary key references public.noticias(id) on delete cascade,
+  resumo_tecnico text null,
+  porque_pontuou jsonb not null default '[]'::jsonb,
+  hipoteses jsonb not null default '[]'::jsonb,
+  alertas jsonb not null default '[]'::jsonb,
+  modelo text null,
+  gerado_em timestamptz not null default now()
+);
@@ -0,0 +1,22 @@
+-- Índices compostos para as listagens de notícias de app/database.py
+-- (filtro + ORDER BY relevancia_total DESC + LIMIT resolvidos direto no índice,
+-- sem filtrar e ordenar a tabela).
+--
+-- Como aplicar:
+-- 1) Supabase SQL Editor: rode cada comando separadamente
+--    (CREATE INDEX CONCURRENTLY não pode rodar dentro de uma transação)
+-- 2) (Opcional) Supabase CLI migrations: crie migration e aplique
+
+-- Database.get_noticias_politico / count_noticias_politico / get_noticias_diversificadas
+create index concurrently if not exists noticias_pol_rel_idx
+  on public.noticias (politico_id, relevancia_total desc);
+
+-- Database.get_noticias_nivel_estado (tipo='estado', sem cidade)
+create index concurrently if not exists noticias_tipo_estado_rel_idx
+  on public.noticias (tipo, estado, relevancia_total desc)
+  where cidade is null;
+
+-- Database.get_noticias_capital (tipo='cidade', com cidade)
+create index concurrently if not exists noticias_tipo_estado_rel_cidade_idx
+  on public.noticias (tipo, estado, relevancia_total desc)
+  where cidade is not null;
@@ -0,0 +1,246 @@
+-- Funções (RPC) de leitura de notícias usadas por app/database.py
+--
+-- Como aplicar:
+-- 1) Supabase SQL Editor: cole e rode este SQL
+-- 2) (Opcional) Supabase CLI migrations: crie migration e aplique
+--
+-- Enquanto as funções não existirem no banco, o backend usa o caminho antigo
+-- (consulta direta + processamento em Python).
+
+-- Chave de diversificação desnormalizada (mesma regra de
+-- Database._diversificar_noticias_por_fonte) + índice que entrega, por
+-- político, as notícias já agrupadas por fonte e ordenadas por relevância.
+alter table public.noticias
+  add column if not exists diversity_key text
+  generated always as (coalesce(fonte_nome, fonte_id::text, 'desconhecida')) stored;
+
+create index if not exists noticias_pol_diversity_rel_idx
+  on public.noticias (politico_id, diversity_key, relevancia_total desc);
+
+-- Notícias de um político diversificadas por fonte (round-robin entre fontes).
+-- Equivale a Database._diversificar_noticias_por_fonte:
+-- - uma notícia por URL (a de maior relevância)
+-- - a rodada N traz a N-ésima melhor notícia de cada fonte
+-- - dentro da rodada, fontes ordenadas pela sua melhor notícia
+create or replace function public.get_noticias_diversificadas(
+  p_uuid uuid,
+  p_min_score numeric default 0,
+  p_limit integer default 20
+)
+returns setof public.noticias
+language sql
+stable
+as $$
+  with unicas as (
+    select distinct on (n.url) n
+    from public.noticias n
+    where n.politico_id = p_uuid
+      and n.relevancia_total >= p_min_score
+    order by n.url, n.relevancia_total desc
+  ),
+  ranked as (
+    select
+      u.n,
+      row_number() over (
+        partition by (u.n).diversity_key
+        order by (u.n).relevancia_total desc
+      ) as rn,
+      max((u.n).relevancia_total) over (
+        partition by (u.n).diversity_key
+      ) as melhor_da_fonte
+    from unicas u
+  )
+  select (r.n).*
+  from ranked r
+  order by r.rn, r.melhor_da_fonte desc, (r.n).relevancia_total desc
+  limit p_limit;
+$$;
+
+-- Top N notícias (por relevância) de cada estado, para os painéis de
+-- capitais (p_cidade_null = false, tipo 'cidade') e estados
+-- (p_cidade_null = true, tipo 'estado'). Retorna um array JSON com no máximo
+-- p_limit notícias por estado, ordenadas por estado e relevância, sem as
+-- colunas conteudo_completo e diversity_key (como FIELDS_NOTICIAS_CARD).
+-- O tipo de retorno mudou (era setof noticias): recria a função.
+drop function if exists public.noticias_top_n_por_estado(text, boolean, integer);
+
+create or replace function public.noticias_top_n_por_estado(
+  p_tipo text,
+  p_cidade_null boolean,
+  p_limit integer default 3
+)
+returns jsonb
+language sql
+stable
+as $$
+  select coalesce(
+    jsonb_agg(to_jsonb(t.n) - 'conteudo_completo' - 'diversity_key' order by (t.n).estado, t.rn),
+    '[]'::jsonb
+  )
+  from (
+    select
+      n,
+      row_number() over (partition by n.estado order by n.relevancia_total desc) as rn
+    from public.noticias n
+    where n.tipo = p_tipo
+      and n.estado is not null
+      and (
+        (p_cidade_null and n.cidade is null)
+        or (not p_cidade_null and n.cidade is not null)
+      )
+  ) t
+  where t.rn <= p_limit;
+$$;
+
+-- Estados distintos com notícias de estado/cidade (PostgREST não expõe DISTINCT).
+create index if not exists noticias_tipo_estado_idx
+  on public.noticias (tipo, estado)
+  where estado is not null;
+
+create or replace function public.estados_com_noticias()
+returns table (estado text)
+language sql
+stable
+as $$
+  select distinct n.estado::text
+  from public.noticias n
+  where n.tipo in ('estado', 'cidade')
+    and n.estado is not null
+  order by 1;
+$$;
+
+-- Troca atômica dos trending topics de uma categoria: o DELETE e o INSERT
+-- rodam na mesma transação, então leitores nunca veem a categoria vazia.
+-- p_topics: array JSON de objetos com colunas de portal_trending_topics
+-- (rank, title, subtitle, ...). São inseridas todas as colunas que aparecem nos
+-- objetos (as demais ficam com o default da tabela); category vem de p_category.
+-- Retorna o total inserido.
+create or replace function public.replace_trending_topics(
+  p_category text,
+  p_topics jsonb
+)
+returns integer
+language plpgsql
+as $$
+declare
+  colunas text;
+  valores text;
+  inseridos integer := 0;
+begin
+  delete from public.portal_trending_topics
+  where category = p_category;
+
+  select string_agg(quote_ident(c.column_name), ', ' order by c.ordinal_position),
+         string_agg('t.' || quote_ident(c.column_name), ', ' order by c.ordinal_position)
+  into colunas, valores
+  from information_schema.columns c
+  where c.table_schema = 'public'
+    and c.table_name = 'portal_trending_topics'
+    and c.column_name <> 'category'
+    and exists (
+      select 1
+      from jsonb_array_elements(coalesce(p_topics, '[]'::jsonb)) e
+      where e ? c.column_name
+    );
+
+  if colunas is null then
+    return 0;
+  end if;
+
+  execute format(
+    'insert into public.portal_trending_topics (%s, category)
+     select %s, $1
+     from jsonb_populate_recordset(null::public.portal_trending_topics, $2) t',
+    colunas, valores
+  ) using p_category, p_topics;
+
+  get diagnostics inseridos = row_count;
+  return inseridos;
+end;
+$$;
+
+-- Página de notícias de um político + total, numa única chamada (id inteiro ->
+-- uuid, contagem e linhas). As linhas vêm sem conteudo_completo, como nas
+-- listagens (FIELDS_NOTICIAS_CARD) e, com p_diversificar, na mesma ordem de
+-- get_noticias_diversificadas. Retorna null se o político não existir.
+create or replace function public.noticias_politico_page(
+  p_id integer,
+  p_min numeric default 0,
+  p_limit integer default 20,
+  p_diversificar boolean default true
+)
+returns jsonb
+language sql
+stable
+as $$
+  select jsonb_build_object(
+    'uuid', p.uuid,
+    'count', (
+      select count(*)
+      from public.noticias n
+      where n.politico_id = p.uuid
+        and n.relevancia_total >= p_min
+    ),
+    'rows', case
+      when p_diversificar then (
+        select coalesce(
+          jsonb_agg(to_jsonb(d) - 'conteudo_completo' - 'diversity_key' - 'ordinality' order by d.ordinality),
+          '[]'::jsonb
+        )
+        from public.get_noticias_diversificadas(p.uuid, p_min, p_limit) with ordinality d
+      )
+      else (
+        select coalesce(
+          jsonb_agg(to_jsonb(s) - 'conteudo_completo' - 'diversity_key' order by s.relevancia_total desc),
+          '[]'::jsonb
+        )
+        from (
+          select n.*
+          from public.noticias n
+          where n.politico_id = p.uuid
+            and n.relevancia_total >= p_min
+          order by n.relevancia_total desc
+          limit p_limit
+        ) s
+      )
+    end
+  )
+  from public.politico p
+  where p.id = p_id;
+$$;
+
+-- Notícias diversificadas de vários políticos (ids inteiros) numa única chamada:
+-- até p_limit por político (mesma seleção de get_noticias_diversificadas),
+-- tudo ordenado por relevância. Usada em /politicos/{id}/concorrentes/noticias.
+create or replace function public.get_noticias_politicos_batch(
+  p_ids integer[],
+  p_limit integer default 10,
+  p_min_score numeric default 0
+)
+returns setof public.noticias
+language sql
+stable
+as $$
+  select d.*
+  from public.politico p
+  cross join lateral public.get_noticias_diversificadas(p.uuid, p_min_score, p_limit) d
+  where p.id = any(p_ids)
+  order by d.relevancia_total desc nulls last;
+$$;
+
+-- Políticos (uuids) da lista que têm ao menos uma notícia, numa única chamada
+-- (um EXISTS por uuid no índice de noticias.politico_id). Usada por
+-- Database.get_politicos_com_noticias.
+create or replace function public.politicos_com_noticias(p_uuids uuid[])
+returns table (politico_id uuid)
+language sql
+stable
+as $$
+  select u.id
+  from unnest(p_uuids) as u(id)
+  where exists (
+    select 1
+    from public.noticias n
+    where n.politico_id = u.id
+  );
+$$;
@@ -0,0 +1,178 @@
+-- Contadores por político (notícias, posts de Instagram, menções sociais)
+-- usados por app/database.py nos resumos, no lugar de três COUNT(*) por
+-- requisição. Mantidos por triggers (por statement) nas quatro tabelas
+-- contadas, que recalculam só os políticos afetados: ficam em dia também com
+-- as escritas dos scripts em scripts/. O scheduler roda o recálculo completo
+-- (refresh_politico_counters) uma vez por dia, na limpeza, como reconciliação.
+--
+-- Como aplicar:
+-- 1) Supabase SQL Editor: cole e rode este SQL
+-- 2) (Opcional) Supabase CLI migrations: crie migration e aplique
+--
+-- Depois de criar, rode uma vez: select public.refresh_politico_counters();
+
+create table if not exists public.politico_counters (
+  politico_id uuid primary key references public.politico(uuid) on delete cascade,
+  noticias bigint not null default 0,
+  instagram_posts bigint not null default 0,
+  social_mentions bigint not null default 0,
+  updated_at timestamptz not null default now()
+);
+
+-- Recalcula os contadores de todos os políticos (um GROUP BY por tabela).
+-- Mesmas regras das contagens do app:
+-- - noticias: relevancia_total >= 0 (count_noticias_politico)
+-- - instagram_posts: tabela unificada; se vazia para o político, a legada (count_ig_posts)
+-- Retorna o total de políticos atualizados.
+create or replace function public.refresh_politico_counters()
+returns integer
+language plpgsql
+as $$
+declare
+  atualizados integer;
+begin
+  insert into public.politico_counters (politico_id, noticias, instagram_posts, social_mentions, updated_at)
+  select
+    p.uuid,
+    coalesce(n.total, 0),
+    case when coalesce(u.total, 0) > 0 then u.total else coalesce(l.total, 0) end,
+    coalesce(m.total, 0),
+    now()
+  from public.politico p
+  left join (
+    select politico_id, count(*) as total
+    from public.noticias
+    where relevancia_total >= 0
+    group by politico_id
+  ) n on n.politico_id = p.uuid
+  left join (
+    select politico_id, count(*) as total
+    from public.social_media_posts
+    where plataforma = 'instagram'
+    group by politico_id
+  ) u on u.politico_id = p.uuid
+  left join (
+    select politico_id, count(*) as total
+    from public.instagram_posts
+    group by politico_id
+  ) l on l.politico_id = p.uuid
+  left join (
+    select politico_id, count(*) as total
+    from public.social_mentions
+    group by politico_id
+  ) m on m.politico_id = p.uuid
+  where p.uuid is not null
+  on conflict (politico_id) do update
+    set noticias = excluded.noticias,
+        instagram_posts = excluded.instagram_posts,
+        social_mentions = excluded.social_mentions,
+        updated_at = excluded.updated_at;
+
+  get diagnostics atualizados = row_count;
+  return atualizados;
+end;
+$$;
+
+-- Recalcula os contadores só dos políticos informados (usado pelos triggers).
+-- Mesmas regras de refresh_politico_counters; usa os índices por politico_id.
+create or replace function public.refresh_politico_counters_for(p_uuids uuid[])
+returns integer
+language plpgsql
+as $$
+declare
+  atualizados integer;
+begin
+  insert into public.politico_counters (politico_id, noticias, instagram_posts, social_mentions, updated_at)
+  select
+    p.uuid,
+    (
+      select count(*) from public.noticias n
+      where n.politico_id = p.uuid and n.relevancia_total >= 0
+    ),
+    coalesce(
+      nullif((
+        select count(*) from public.social_media_posts s
+        where s.politico_id = p.uuid and s.plataforma = 'instagram'
+      ), 0),
+      (select count(*) from public.instagram_posts i where i.politico_id = p.uuid)
+    ),
+    (select count(*) from public.social_mentions m where m.politico_id = p.uuid),
+    now()
+  from public.politico p
+  where p.uuid = any(p_uuids)
+  on conflict (politico_id) do update
+    set noticias = excluded.noticias,
+        instagram_posts = excluded.instagram_posts,
+        social_mentions = excluded.social_mentions,
+        updated_at = excluded.updated_at;
+
+  get diagnostics atualizados = row_count;
+  return atualizados;
+end;
+$$;
+
+-- Trigger por statement: junta os politico_id das linhas inseridas/alteradas/
+-- removidas (transition tables `novas`/`antigas`) e recalcula só esses
+-- políticos, uma vez por statement (um upsert em lote = um recálculo).
+create or replace function public.politico_counters_trigger()
+returns trigger
+language plpgsql
+as $$
+declare
+  uuids uuid[];
+begin
+  if tg_op = 'INSERT' then
+    select array_agg(distinct politico_id) into uuids
+    from novas where politico_id is not null;
+  elsif tg_op = 'DELETE' then
+    select array_agg(distinct politico_id) into uuids
+    from antigas where politico_id is not null;
+  else
+    select array_agg(distinct x.politico_id) into uuids
+    from (
+      select politico_id from novas
+      union
+      select politico_id from antigas
+    ) x
+    where x.politico_id is not null;
+  end if;
+
+  if uuids is not null then
+    perform public.refresh_politico_counters_for(uuids);
+  end if;
+  return null;
+end;
+$$;
+
+-- Transition tables exigem um trigger por evento.
+do $$
+declare
+  tabela text;
+begin
+  foreach tabela in array array['noticias', 'social_media_posts', 'instagram_posts', 'social_mentions']
+  loop
+    execute format('drop trigger if exists %I on public.%I', tabela || '_counters_ins', tabela);
+    execute format('drop trigger if exists %I on public.%I', tabela || '_counters_upd', tabela);
+    execute format('drop trigger if exists %I on public.%I', tabela || '_counters_del', tabela);
+
+    execute format(
+      'create trigger %I after insert on public.%I
+       referencing new table as novas
+       for each statement execute function public.politico_counters_trigger()',
+      tabela || '_counters_ins', tabela
+    );
+    execute format(
+      'create trigger %I after update on public.%I
+       referencing old table as antigas new table as novas
+       for each statement execute function public.politico_counters_trigger()',
+      tabela || '_counters_upd', tabela
+    );
+    execute format(
+      'create trigger %I after delete on public.%I
+       referencing old table as antigas
+       for each statement execute function public.politico_counters_trigger()',
+      tabela || '_counters_del', tabela
+    );
+  end loop;
+end;
+$$;
@@ -0,0 +1,17 @@
+-- Índices parciais para a paginação por chave (id > último id, order by id)
+-- de Database.get_politicos_ativos e Database.get_politicos_diretoriaja.
+-- Cada índice cobre exatamente o WHERE da consulta, então cada página vira um
+-- range scan no índice (sem filtrar a tabela inteira e ordenar depois).
+--
+-- Como aplicar:
+-- 1) Supabase SQL Editor: rode cada comando separadamente
+--    (CREATE INDEX CONCURRENTLY não pode rodar dentro de uma transação)
+-- 2) (Opcional) Supabase CLI migrations: crie migration e aplique
+
+create index concurrently if not exists politico_active_id_idx
+  on public.politico (active, id)
+  where active = true;
+
+create index concurrently if not exists politico_usar_diretoriaja_id_idx
+  on public.politico (usar_diretoriaja, id)
+  where usar_diretoriaja = true;
@@ -0,0 +1,102 @@
+-- Resumo completo de um político numa única chamada (usada por app/database.py)
+-- Monta no banco o mesmo JSON do endpoint /politicos/{id}/resumo: dados do
+-- político, top notícias, top Instagram, concorrentes, notícias da cidade /
+-- estado / capital e os totais. Retorna null se o político não existir.
+--
+-- Depende de get_noticias_diversificadas (create_noticias_rpcs.sql),
+-- instagram_posts_politico (create_instagram_posts_politico.sql) e
+-- count_ig_posts (create_count_ig_posts.sql). Os totais vêm de
+-- politico_counters (create_politico_counters.sql) quando o político já tem
+-- contadores; senão, são contados na hora.
+--
+-- Como aplicar:
+-- 1) Supabase SQL Editor: cole e rode este SQL
+-- 2) (Opcional) Supabase CLI migrations: crie migration e aplique
+
+create or replace function public.politico_resumo(p_id integer)
+returns jsonb
+language sql
+stable
+as $$
+  select jsonb_build_object(
+    'politico', to_jsonb(p),
+
+    -- get_noticias_politico(limit=5, min_score=30), diversificadas por fonte
+    'top_noticias', (
+      select coalesce(
+        jsonb_agg(to_jsonb(d) - 'conteudo_completo' - 'diversity_key' - 'ordinality' order by d.ordinality),
+        '[]'::jsonb
+      )
+      from public.get_noticias_diversificadas(p.uuid, 30, 5) with ordinality d
+    ),
+
+    -- Tabela unificada primeiro; se vazia, a legada
+    'top_instagram', public.instagram_posts_politico(p.uuid, 5),
+
+    'concorrentes', (
+      select coalesce(jsonb_agg(to_jsonb(c)), '[]'::jsonb)
+      from public.politico_concorrentes pc
+      join public.politico c on c.id = pc.concorrente_id
+      where pc.politico_id = p.id
+    ),
+
+    -- tipo livre, filtrado pelo nome da cidade do político
+    'noticias_cidade', (
+      select coalesce(jsonb_agg(to_jsonb(n) - 'conteudo_completo' - 'diversity_key' order by n.relevancia_total desc), '[]'::jsonb)
+      from (
+        select *
+        from public.noticias
+        where p.cidade is not null
+          and cidade = p.cidade
+        order by relevancia_total desc
+        limit 5
+      ) n
+    ),
+
+    -- tipo='estado' sem cidade (governo, assembleia)
+    'noticias_estado', (
+      select coalesce(jsonb_agg(to_jsonb(n) - 'conteudo_completo' - 'diversity_key' order by n.relevancia_total desc), '[]'::jsonb)
+      from (
+        select *
+        from public.noticias
+        where p.estado is not null
+          and tipo = 'estado'
+          and estado = p.estado
+          and cidade is null
+        order by relevancia_total desc
+        limit 3
+      ) n
+    ),
+
+    -- tipo='cidade' com cidade preenchida (prefeitura, câmara)
+    'noticias_capital', (
+      select coalesce(jsonb_agg(to_jsonb(n) - 'conteudo_completo' - 'diversity_key' order by n.relevancia_total desc), '[]'::jsonb)
+      from (
+        select *
+        from public.noticias
+        where p.estado is not null
+          and tipo = 'cidade'
+          and estado = p.estado
+          and cidade is not null
+        order by relevancia_total desc
+        limit 3
+      ) n
+    ),
+
+    'total_noticias', coalesce(pc.noticias, (
+      select count(*)
+      from public.noticias n
+      where n.politico_id = p.uuid
+        and n.relevancia_total >= 0
+    )),
+    'total_posts_instagram', coalesce(pc.instagram_posts, public.count_ig_posts(p.uuid)),
+    'total_mencoes', coalesce(pc.social_mentions, (
+      select count(*)
+      from public.social_mentions m
+      where m.politico_id = p.uuid
+    ))
+  )
+  from public.politico p
+  left join public.politico_counters pc on pc.politico_id = p.uuid
+  where p.id = p_id;
+$$;
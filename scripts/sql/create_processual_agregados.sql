@@ -0,0 +1,96 @@
+-- Agregados (GROUP BY) da consulta processual (usados por app/database.py)
+-- Contagens por tribunal/tipo de processos, por eleição de doações e
+-- candidaturas, calculadas no banco sobre todos os registros que atendem aos
+-- filtros: só o histograma trafega, não as linhas.
+--
+-- Como aplicar:
+-- 1) Supabase SQL Editor: cole e rode este SQL
+-- 2) (Opcional) Supabase CLI migrations: crie migration e aplique
+
+-- {"por_tribunal": {tribunal: n}, "por_tipo": {tipo: n}}
+create or replace function public.processos_agregados(
+  p_uuid uuid,
+  p_tribunal text default null,
+  p_tipo text default null,
+  p_status text default null
+)
+returns jsonb
+language sql
+stable
+as $$
+  with filtrados as (
+    select
+      coalesce(pj.tribunal::text, 'outros') as tribunal,
+      coalesce(pj.tipo::text, 'outros') as tipo
+    from public.processos_judiciais pj
+    where pj.politico_id = p_uuid
+      and (p_tribunal is null or pj.tribunal = p_tribunal)
+      and (p_tipo is null or pj.tipo = p_tipo)
+      and (p_status is null or pj.status = p_status)
+  )
+  select jsonb_build_object(
+    'por_tribunal', (
+      select coalesce(jsonb_object_agg(tribunal, n), '{}'::jsonb)
+      from (select tribunal, count(*) as n from filtrados group by tribunal) t
+    ),
+    'por_tipo', (
+      select coalesce(jsonb_object_agg(tipo, n), '{}'::jsonb)
+      from (select tipo, count(*) as n from filtrados group by tipo) t
+    )
+  );
+$$;
+
+-- Doações feitas (cpf_doador) e/ou recebidas (cpf_candidato) de um CPF:
+-- {"por_eleicao": {eleicao: n}, "valor_total": soma}
+create or replace function public.doacoes_agregados(
+  p_cpf text,
+  p_feitas boolean default true,
+  p_recebidas boolean default true,
+  p_eleicao text default null
+)
+returns jsonb
+language sql
+stable
+as $$
+  with filtradas as (
+    select coalesce(d.eleicao::text, 'outros') as eleicao, coalesce(d.valor, 0) as valor
+    from public.doacoes_eleitorais d
+    where (
+        (p_feitas and d.cpf_doador = p_cpf)
+        or (p_recebidas and d.cpf_candidato = p_cpf)
+      )
+      and (p_eleicao is null or d.eleicao::text = p_eleicao)
+  )
+  select jsonb_build_object(
+    'por_eleicao', (
+      select coalesce(jsonb_object_agg(eleicao, n), '{}'::jsonb)
+      from (select eleicao, count(*) as n from filtradas group by eleicao) t
+    ),
+    'valor_total', (select round(coalesce(sum(valor), 0)::numeric, 2) from filtradas)
+  );
+$$;
+
+create index if not exists doacoes_eleitorais_cpf_doador_idx
+  on public.doacoes_eleitorais (cpf_doador);
+
+create index if not exists doacoes_eleitorais_cpf_candidato_idx
+  on public.doacoes_eleitorais (cpf_candidato);
+
+-- {eleicao: n} das candidaturas de um político
+create or replace function public.candidaturas_por_eleicao(
+  p_uuid uuid,
+  p_eleicao text default null
+)
+returns jsonb
+language sql
+stable
+as $$
+  select coalesce(jsonb_object_agg(eleicao, n), '{}'::jsonb)
+  from (
+    select coalesce(c.eleicao::text, 'outros') as eleicao, count(*) as n
+    from public.candidaturas c
+    where c.politico_id = p_uuid
+      and (p_eleicao is null or c.eleicao::text = p_eleicao)
+    group by 1
+  ) t;
+$$;
@@ -0,0 +1,68 @@
+-- Principais assuntos de um político com sentimento predominante e um exemplo
+-- (usada por app/database.py, endpoint /politicos/{id}/assuntos)
+-- Uma única consulta: o exemplo de cada assunto vem de um LATERAL JOIN em
+-- social_mentions, em vez de uma consulta por assunto.
+--
+-- Como aplicar:
+-- 1) Supabase SQL Editor: cole e rode este SQL
+-- 2) (Opcional) Supabase CLI migrations: crie migration e aplique
+
+-- Menção mais recente de um assunto (exemplo) sem ordenar a tabela
+create index if not exists social_mentions_pol_assunto_posted_idx
+  on public.social_mentions (politico_id, assunto, posted_at desc);
+
+create or replace function public.top_assuntos_politico(
+  p_uuid uuid,
+  p_limite integer default 10
+)
+returns table (
+  assunto text,
+  total_mencoes bigint,
+  mencoes_positivas bigint,
+  mencoes_negativas bigint,
+  mencoes_neutras bigint,
+  engagement_total double precision,
+  sentimento_predominante text,
+  exemplo text
+)
+language sql
+stable
+as $$
+  select
+    t.assunto::text,
+    t.total,
+    t.pos,
+    t.neg,
+    t.neu,
+    t.eng,
+    -- Mesmo desempate de antes: positivo > negativo > neutro
+    case
+      when t.pos >= t.neg and t.pos >= t.neu then 'positivo'
+      when t.neg >= t.pos and t.neg >= t.neu then 'negativo'
+      else 'neutro'
+    end,
+    coalesce(nullif(ex.assunto_detalhe::text, ''), left(nullif(ex.conteudo::text, ''), 120))
+  from (
+    select
+      mt.assunto,
+      coalesce(mt.total_mencoes, 0)::bigint as total,
+      coalesce(mt.mencoes_positivas, 0)::bigint as pos,
+      coalesce(mt.mencoes_negativas, 0)::bigint as neg,
+      coalesce(mt.mencoes_neutras, 0)::bigint as neu,
+      coalesce(mt.engagement_total, 0)::double precision as eng,
+      row_number() over (order by mt.total_mencoes desc) as ordem
+    from public.mention_topics mt
+    where mt.politico_id = p_uuid
+    order by mt.total_mencoes desc
+    limit p_limite
+  ) t
+  left join lateral (
+    select m.assunto_detalhe, m.conteudo
+    from public.social_mentions m
+    where m.politico_id = p_uuid
+      and m.assunto = t.assunto
+    order by m.posted_at desc
+    limit 1
+  ) ex on true
+  order by t.ordem;
+$$;